@@ -0,0 +1,4 @@
+""" Lidaco benchmarks
+
+Run one with e.g. ``python -m benchmarks.netcdf4_append`` from the repository root.
+"""
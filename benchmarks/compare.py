@@ -0,0 +1,75 @@
+"""
+Puts two benchmarks.suite result files side by side.
+
+For every case (sample, writer, mode) of both files, prints the time, rows/s and peak RSS of each
+version and their ratio, flagging the cases slower or bigger than --threshold.
+
+Usage: python -m benchmarks.compare <before.json> <after.json> [--threshold 1.10]
+"""
+import argparse
+import json
+
+
+def load(file_path):
+    with open(file_path) as f:
+        results = json.load(f)
+    return results['label'], {(r['sample'], r['writer'], r['mode']): r for r in results['results']}
+
+
+def ratio(before, after):
+    if before is None or after is None or before == 0:
+        return None
+    return after / before
+
+
+def format_ratio(value):
+    return 'x{:.2f}'.format(value) if value is not None else '-'
+
+
+def format_mb(value):
+    return '{:.1f}'.format(value / 2 ** 20) if value is not None else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('before', help='results of the reference version')
+    parser.add_argument('after', help='results of the version compared to it')
+    parser.add_argument('--threshold', type=float, default=1.10,
+                        help='time or peak RSS ratio flagged as a regression (default: 1.10)')
+    args = parser.parse_args()
+
+    before_label, before = load(args.before)
+    after_label, after = load(args.after)
+
+    print('{:<36} {:>10} {:>10} {:>7} {:>11} {:>11} {:>9} {:>9} {:>7}'.format(
+        'case ({} -> {})'.format(before_label, after_label)[:36], 'time (s)', 'time (s)', 'ratio',
+        'rows/s', 'rows/s', 'RSS (MB)', 'RSS (MB)', 'ratio'))
+
+    regressions = 0
+    for key in sorted(set(before) | set(after)):
+        name = ' '.join(key)
+        b, a = before.get(key), after.get(key)
+
+        if b is None or a is None:
+            print('{:<36} only in {}'.format(name, args.after if b is None else args.before))
+            continue
+
+        if b['error'] is not None or a['error'] is not None:
+            failed = [f for f, r in ((args.before, b), (args.after, a)) if r['error'] is not None]
+            print('{:<36} failed in {}'.format(name, ', '.join(failed)))
+            continue
+
+        time_ratio = ratio(b['seconds'], a['seconds'])
+        rss_ratio = ratio(b['peak_rss'], a['peak_rss'])
+        flagged = any(r is not None and r > args.threshold for r in (time_ratio, rss_ratio))
+        regressions += flagged
+
+        print('{:<36} {:>10.3f} {:>10.3f} {:>7} {:>11.0f} {:>11.0f} {:>9} {:>9} {:>7}{}'.format(
+            name, b['seconds'], a['seconds'], format_ratio(time_ratio), b['rows_per_s'] or 0, a['rows_per_s'] or 0,
+            format_mb(b['peak_rss']), format_mb(a['peak_rss']), format_ratio(rss_ratio), '  <--' if flagged else ''))
+
+    print('{} case(s) slower or bigger than x{:.2f}'.format(regressions, args.threshold))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Cost of loading the hierarchical .yaml configurations.
+
+Loads every station configuration of the samples (Kassel, NTNU, ...) --stations times over, as the
+batch and watch commands do, with the pure Python yaml loader, the loader used by Config (the C one when
+PyYAML was built with libyaml), the parsed files cache of Config shared by the stations, and the
+compiled configuration files (see Config.compiled).
+
+Usage: python -m benchmarks.config_loading [--repeat 20]
+"""
+from glob import glob
+from os import path
+import argparse
+import tempfile
+import time
+
+import yaml
+
+from lidaco.common.Logger import Logger
+from lidaco.core import Config as config_module
+from lidaco.core.Config import Config
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+
+# station configurations: the .yaml files importing others, outside the imported directories
+STATIONS = sorted(glob(path.join(ROOT, 'samples', '*', 'config*.yaml')) +
+                  glob(path.join(ROOT, 'samples', '*', 'configs', 'NEWA_*.yaml')))
+
+
+def loadable(config_files):
+    """
+    :return: the configuration files loading without errors, e.g. without missing imports
+    """
+    result = []
+    for config_file in config_files:
+        try:
+            Config(path.dirname(config_file), configs=root_configs(config_file))
+            result.append(config_file)
+        except SystemExit:
+            pass
+    return result
+
+
+def root_configs(config_file):
+    return {'imports': [path.basename(config_file)], 'parameters': {'input': {}, 'output': {}}}
+
+
+def load_all(stations, repeat, loader, cached, cache_dir_path=None):
+    """
+    Loads every station 'repeat' times.
+    :param stations: station configuration files
+    :param loader: yaml loader class
+    :param cached: False to parse every file each time it is read
+    :param cache_dir_path: directory of the compiled configuration files, None to load the .yaml files
+    :return: seconds
+    """
+    config_module.Loader = loader
+    Config.parsed_files = {}
+
+    start = time.perf_counter()
+    for i in range(repeat):
+        for config_file in stations:
+            if not cached:
+                Config.parsed_files = {}
+
+            context = path.dirname(config_file)
+            if cache_dir_path is None:
+                Config(context, configs=root_configs(config_file))
+            else:
+                cache_path = Config.compiled_path(config_file, cache_dir_path)
+                Config.compiled(context, root_configs(config_file), cache_path)
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=20, help='times every station is loaded (default: 20)')
+    args = parser.parse_args()
+
+    loader = config_module.Loader
+
+    # the 'Loading configurations' messages (and the errors of the stations skipped) are dropped
+    Logger.capture()
+    try:
+        stations = loadable(STATIONS)
+
+        with tempfile.TemporaryDirectory() as cache_dir_path:
+            # the compiled configuration files are written by a first run, as by a first conversion
+            load_all(stations, 1, loader, True, cache_dir_path)
+
+            cases = [
+                ('FullLoader', load_all(stations, args.repeat, yaml.FullLoader, False)),
+                (loader.__name__, load_all(stations, args.repeat, loader, False)),
+                (loader.__name__ + ' + parsed files cache', load_all(stations, args.repeat, loader, True)),
+                ('compiled configurations', load_all(stations, args.repeat, loader, True, cache_dir_path)),
+            ]
+    finally:
+        config_module.Loader = loader
+        Logger.release()
+
+    print('{} stations, skipped: {}'.format(len(stations), ', '.join(
+        path.relpath(s, ROOT) for s in STATIONS if s not in stations) or '-'))
+    print('{:<36} {:>9} {:>14}'.format('configurations loaded with', 'time (s)', 'ms / station'))
+    for name, seconds in cases:
+        print('{:<36} {:>9.3f} {:>14.2f}'.format(name, seconds, 1000 * seconds / (len(stations) * args.repeat)))
+
+
+if __name__ == '__main__':
+    main()
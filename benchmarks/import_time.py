@@ -0,0 +1,97 @@
+"""
+Start-up cost of the command line and of the readers / writers.
+
+Times, each in a fresh process, 'lidaco --version', 'lidaco --list-formats', importing Builder and
+loading every reader and writer of the ModuleLoader catalogue, and lists the heavy packages (numpy,
+pandas, netCDF4, lxml) each one imported. A case importing a heavy package it does not need, i.e. the
+command line importing any or a reader / writer importing one missing from its catalogue entry, is
+flagged, and fails the run with --check.
+
+Usage: python -m benchmarks.import_time [--repeat 5] [--check]
+"""
+from os import path
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from lidaco.core.ModuleLoader import ModuleLoader
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+LIDACO = path.join(ROOT, 'bin', 'lidaco')
+HEAVY = ['numpy', 'pandas', 'netCDF4', 'lxml']
+
+
+def cases():
+    """
+    :return: [(name, command line arguments, heavy packages it may import)]
+    """
+    result = [
+        ('lidaco --version', [LIDACO, '--version'], []),
+        ('lidaco --list-formats', [LIDACO, '--list-formats'], []),
+        ('import ModuleLoader', ['-c', 'import lidaco.core.ModuleLoader'], []),
+        ('import Builder', ['-c', 'import lidaco.core.Builder'], []),
+    ]
+
+    for kind, modules in (('reader', '..readers.'), ('writer', '..writers.')):
+        for name, (description, requires, installed) in ModuleLoader.available(modules).items():
+            if installed:
+                code = 'from lidaco.core.ModuleLoader import ModuleLoader; ModuleLoader.load({!r}, {!r})'
+                result.append(('{} {}'.format(kind, name), ['-c', code.format(modules, name)], requires))
+
+    return result
+
+
+def run(arguments, importtime=False):
+    """
+    Runs python with arguments in a fresh process.
+    :return: (wall time in seconds, stderr)
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT] + [p for p in [os.environ.get('PYTHONPATH')] if p]))
+    options = ['-X', 'importtime'] if importtime else []
+
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable] + options + arguments, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE, universal_newlines=True)
+    seconds = time.perf_counter() - start
+
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    return seconds, completed.stderr
+
+
+def imported(stderr):
+    """
+    :param stderr: output of python -X importtime
+    :return: the heavy packages imported
+    """
+    names = set(line.split('|')[-1].strip() for line in stderr.splitlines() if line.startswith('import time:'))
+    return [package for package in HEAVY if package in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=5, help='runs per case, the fastest is kept (default: 5)')
+    parser.add_argument('--check', action='store_true', help='exit with an error if a case is flagged')
+    args = parser.parse_args()
+
+    print('{:<26} {:>9}  {}'.format('case', 'time (s)', 'heavy packages imported'))
+
+    flagged = 0
+    for name, arguments, allowed in cases():
+        seconds = min(run(arguments)[0] for i in range(max(1, args.repeat)))
+        packages = imported(run(arguments, importtime=True)[1])
+        unexpected = [package for package in packages if package not in allowed]
+        flagged += len(unexpected) > 0
+
+        print('{:<26} {:>9.3f}  {}{}'.format(name, seconds, ', '.join(packages) or '-',
+                                             '  <-- not needed: ' + ', '.join(unexpected) if unexpected else ''))
+
+    print('{} case(s) importing packages they do not need'.format(flagged))
+    if args.check and flagged > 0:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Input discovery time on a large directory tree.
+
+Compares the former os.walk listing with Discovery, cold (every directory listed) with one and
+with several threads, and warm (listings taken from the cache file of a previous run).
+Without --input, a synthetic tree of empty _wind.txt files is created in a temporary directory.
+The gain of the threads and of the cache grows with the latency of the file system (e.g. a NAS).
+
+Usage: python -m benchmarks.input_discovery [--input <archive>] [--dirs 200] [--files 500] [--threads 8]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from lidaco.core.Discovery import Discovery
+
+
+def accepts_file(filename):
+    return filename.endswith('wind.txt') & (len(filename) > 14)
+
+
+def os_walk(dir_path):
+    files = []
+    for folder, d, filenames in os.walk(dir_path):
+        for filename in filenames:
+            if accepts_file(filename):
+                files.append(os.path.join(folder, filename))
+    return files
+
+
+def create_tree(root, dirs, files):
+    for i in range(dirs):
+        day = os.path.join(root, '2016', '{:02d}'.format(i // 28 + 1), '{:02d}'.format(i % 28 + 1))
+        os.makedirs(day)
+        for j in range(files):
+            open(os.path.join(day, '2016{:04d}{:06d}_wind.txt'.format(i, j)), 'w').close()
+    return root
+
+
+def measure(name, list_files):
+    start = time.perf_counter()
+    count = len(list_files())
+    print('{:<22} {:>9} {:>9.3f}'.format(name, count, time.perf_counter() - start))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--input', default=None, help='directory tree to list (default: a synthetic tree)')
+    parser.add_argument('--dirs', type=int, default=200, help='synthetic tree: number of directories (default: 200)')
+    parser.add_argument('--files', type=int, default=500, help='synthetic tree: files per directory (default: 500)')
+    parser.add_argument('--threads', type=int, default=8, help='directories listed at once (default: 8)')
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        input_path = args.input or create_tree(os.path.join(tmp_dir, 'input'), args.dirs, args.files)
+        # directories modified in the last seconds are never taken from the cache
+        time.sleep(3)
+
+        print('{:<22} {:>9} {:>9}'.format('discovery', 'files', 'time (s)'))
+        measure('os.walk', lambda: os_walk(input_path))
+        measure('scandir, 1 thread', lambda: Discovery(threads=1).files(input_path, accepts_file))
+        measure('scandir, {} threads'.format(args.threads),
+                lambda: Discovery(threads=args.threads).files(input_path, accepts_file))
+
+        cache_dir = os.path.join(tmp_dir, 'cache')
+        os.makedirs(cache_dir)
+        Discovery(threads=args.threads, cache_dir=cache_dir).files(input_path, accepts_file)
+        measure('cached listings', lambda: Discovery(threads=args.threads, cache_dir=cache_dir)
+                .files(input_path, accepts_file))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
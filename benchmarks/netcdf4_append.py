@@ -0,0 +1,78 @@
+"""
+Per-append cost of the NetCDF4 writer lifecycle.
+
+Compares reopening the output file for every appended input file (and rewriting the
+"meta-data" attributes and variables each time) with keeping one dataset handle open
+for the whole output block, as Builder.build_block does.
+
+Usage: python -m benchmarks.netcdf4_append [--appends 144] [--rows 600] [--gates 77]
+"""
+import argparse
+import tempfile
+import time
+import numpy as np
+
+from lidaco.writers.NetCDF4 import NetCDF4
+
+ATTRIBUTES = {'attribute_{}'.format(i): 'value {}'.format(i) for i in range(40)}
+CONSTANTS = ['yaw', 'pitch', 'roll', 'position_x', 'position_y', 'position_z']
+
+
+def write_metadata(dataset):
+    for key, value in ATTRIBUTES.items():
+        setattr(dataset, key, value)
+
+    for name in CONSTANTS:
+        if name not in dataset.variables:
+            variable = dataset.createVariable(name, 'f4')
+            variable[:] = 0
+            variable.units = 'degrees'
+
+
+def write_records(dataset, rows, gates, appending):
+    if not appending:
+        dataset.createDimension('range', gates)
+        dataset.createDimension('time', None)
+        dataset.createVariable('time', 'f8', ('time',))
+        dataset.createVariable('VEL', 'f4', ('time', 'range'))
+
+    ntime = len(dataset.dimensions['time'])
+    dataset.variables['time'][ntime:] = np.arange(ntime, ntime + rows)
+    dataset.variables['VEL'][ntime:, :] = np.random.random((rows, gates))
+
+
+def reopen_per_append(dir_path, appends, rows, gates):
+    writer = NetCDF4(dir_path, 'reopen')
+    for i in range(appends):
+        with writer.appending(i > 0) as dataset:
+            write_metadata(dataset)
+            write_records(dataset, rows, gates, i > 0)
+
+
+def one_handle_per_block(dir_path, appends, rows, gates):
+    writer = NetCDF4(dir_path, 'one_handle')
+    with writer.appending(False) as dataset:
+        write_metadata(dataset)
+        for i in range(appends):
+            write_records(dataset, rows, gates, i > 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--appends', type=int, default=144, help='input files per output block (default: 144)')
+    parser.add_argument('--rows', type=int, default=600, help='time records per input file (default: 600)')
+    parser.add_argument('--gates', type=int, default=77, help='range gates (default: 77)')
+    args = parser.parse_args()
+
+    print('{:<22} {:>10} {:>16}'.format('lifecycle', 'total (s)', 'per append (ms)'))
+    with tempfile.TemporaryDirectory() as dir_path:
+        for name, lifecycle in [('reopen per append', reopen_per_append),
+                                ('one handle per block', one_handle_per_block)]:
+            start = time.perf_counter()
+            lifecycle(dir_path, args.appends, args.rows, args.gates)
+            elapsed = time.perf_counter() - start
+            print('{:<22} {:>10.3f} {:>16.2f}'.format(name, elapsed, 1000 * elapsed / args.appends))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Write throughput and file size of the NetCDF4 writer storage policies.
+
+Converts a Windscanner sample file (appended --appends times to one output file) with
+each storage policy, see lidaco.writers.NetCDF4.StoragePolicy.
+
+Usage: python -m benchmarks.storage_policies [--input samples/Windscanner/20161211135000_wind.txt] [--appends 10]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from lidaco.core.Config import Config
+from lidaco.readers.Windscanner import Windscanner
+from lidaco.writers.NetCDF4 import NetCDF4
+
+POLICIES = [
+    ('library default', None),
+    ('zlib 1', {'zlib': True, 'complevel': 1}),
+    ('zlib 4 + shuffle', {'zlib': True, 'complevel': 4, 'shuffle': True}),
+    ('4096 x full', {'chunking': {'default': {'time': 4096}}}),
+    ('zlib 4, 4096 x full', {'zlib': True, 'complevel': 4, 'chunking': {'default': {'time': 4096}}}),
+    ('zlib 4, 4096 x full, 64MB cache', {'zlib': True, 'complevel': 4, 'chunk_cache': 64 * 2 ** 20,
+                                         'chunking': {'default': {'time': 4096}}}),
+]
+
+
+def convert(input_filepath, dir_path, storage, appends):
+    writer = NetCDF4(dir_path, 'storage')
+    writer.set_configs(Config('', configs={'parameters': {'output': {'storage': storage}}}))
+    reader = Windscanner()
+    parameters = {'attributes': {'beam_sweeping': 'true'}}
+
+    with writer.appending(False) as dataset:
+        for i in range(appends):
+            reader.read_to(dataset, input_filepath, parameters, i > 0)
+
+    return writer.file_path()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--input', default=os.path.join('samples', 'Windscanner', '20161211135000_wind.txt'),
+                        help='Windscanner _wind.txt file (its _system.txt must be next to it)')
+    parser.add_argument('--appends', type=int, default=10, help='times the input file is appended (default: 10)')
+    args = parser.parse_args()
+
+    input_mb = args.appends * os.path.getsize(args.input) / 2 ** 20
+
+    print('{:<34} {:>9} {:>9} {:>11}'.format('policy', 'time (s)', 'MB/s', 'size (MB)'))
+    with tempfile.TemporaryDirectory() as dir_path:
+        for name, storage in POLICIES:
+            start = time.perf_counter()
+            output = convert(args.input, dir_path, storage, args.appends)
+            elapsed = time.perf_counter() - start
+            print('{:<34} {:>9.3f} {:>9.2f} {:>11.2f}'.format(name, elapsed, input_mb / elapsed,
+                                                               os.path.getsize(output) / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
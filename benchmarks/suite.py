@@ -0,0 +1,238 @@
+"""
+End to end benchmark of every bundled sample over every writer.
+
+For each sample dataset (see SAMPLES) and writer (NetCDF4, NcML, MetadataCard), runs Builder.build
+('build' mode), and the reader's read_to alone on each input file / file group ('read_to' mode,
+without opening the output files and writing the "meta-data" configurations). Every run is
+made in a fresh process, to measure its peak resident memory. Reports rows/s, input MB/s, peak
+RSS and output size, and writes the results to a JSON file that benchmarks.compare puts side by
+side with the results of another version.
+
+With --synthetic, the samples are converted with their configurations but from the synthetic input files
+written by 'python -m benchmarks.synthetic all <directory>' (see SAMPLE_FORMATS), e.g. to benchmark 1 GB inputs.
+
+Usage: python -m benchmarks.suite [--output results.json] [--label v0.0.11] [--repeat 3]
+       [--samples Windscanner WP5] [--writers NetCDF4] [--modes build] [--synthetic /tmp/synthetic]
+"""
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from os import path
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+KASSEL = path.join(ROOT, 'samples', 'Kassel_Experiment')
+
+# name => (configuration file, input directory). The input directory overrides the configured one,
+# e.g. the Windows paths of the Kassel configurations.
+SAMPLES = {
+    'Windscanner': (path.join(ROOT, 'samples', 'Windscanner', 'config.yaml'), path.join(ROOT, 'samples', 'Windscanner')),
+    'Galion': (path.join(ROOT, 'samples', 'Galion', 'config.yaml'), path.join(ROOT, 'samples', 'Galion')),
+    'WP1': (path.join(KASSEL, 'configs', 'NEWA_Kassel_WP1_10min.yaml'), path.join(KASSEL, 'data', 'WP1', 'sta')),
+    'WP2': (path.join(KASSEL, 'configs', 'NEWA_Kassel_WP2_10min.yaml'), path.join(KASSEL, 'data', 'WP2')),
+    'WP3': (path.join(KASSEL, 'configs', 'NEWA_Kassel_WP3_10min.yaml'), path.join(KASSEL, 'data', 'WP3', 'sta')),
+    'WP4': (path.join(KASSEL, 'configs', 'NEWA_Kassel_WP4_10min.yaml'), path.join(KASSEL, 'data', 'WP4', '10min')),
+    'WP5': (path.join(KASSEL, 'configs', 'NEWA_Kassel_WP5_10min.yaml'), path.join(KASSEL, 'data', 'WP5')),
+    'WP6': (path.join(KASSEL, 'configs', 'NEWA_Kassel_WP6.yaml'), path.join(KASSEL, 'data', 'WP6')),
+    'WS1': (path.join(KASSEL, 'configs', 'NEWA_Kassel_WS1.yaml'), path.join(KASSEL, 'data', 'WS1')),
+}
+
+# name => format of the sample, i.e. the subdirectory of its synthetic input files
+SAMPLE_FORMATS = {
+    'Windscanner': 'Windscanner',
+    'Galion': 'Galion',
+    'WP1': 'Windcubev2',
+    'WP2': 'Triton',
+    'WP3': 'Windcubev1',
+    'WP4': 'ZephIR300',
+    'WP5': 'AQ500',
+    'WP6': 'WLS70',
+    'WS1': 'Windscanner',
+}
+
+WRITERS = ['NetCDF4', 'NcML', 'MetadataCard']
+MODES = ['build', 'read_to']
+
+
+def peak_rss():
+    """
+    :return: peak resident memory of this process in bytes, None where the resource module is missing
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # kilobytes on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if platform.system() == 'Darwin' else maxrss * 1024
+
+
+def directory_size(dir_path):
+    return sum(path.getsize(path.join(folder, f)) for folder, d, files in os.walk(dir_path) for f in files)
+
+
+def input_files(builder, reader, input_path):
+    """
+    :return: (file groups, their size in bytes)
+    """
+    files = reader.fetch_input_files(input_path, builder.discovery())
+    size = 0
+    for group in files:
+        complete_path = builder.group_path(reader, group, input_path)
+        for f in [complete_path] if isinstance(complete_path, str) else complete_path:
+            size += path.getsize(f)
+    return files, size
+
+
+def read_to(builder, reader, files, input_path, output_path):
+    """
+    Calls the reader's read_to on each file / file group, each to its own output file.
+    :return: (seconds spent in read_to, time records written)
+    """
+    seconds, rows = 0.0, 0
+
+    for i, group in enumerate(files):
+        writer = builder.module_loader.get_writer()(output_path, 'read_to_{}'.format(i))
+        writer.set_configs(builder.configs)
+        complete_path = builder.group_path(reader, group, input_path)
+
+        with writer.appending(False) as dataset:
+            start = time.perf_counter()
+            reader.read_to(dataset, complete_path, builder.configs, False)
+            seconds += time.perf_counter() - start
+            rows += builder.count_rows(dataset)
+
+    return seconds, rows
+
+
+def run_case(sample, writer, mode, synthetic=None):
+    """
+    Worker process entry point: runs one sample with one writer in one mode.
+    :param synthetic: directory of synthetic input files (see benchmarks.synthetic), None to read the sample's
+    :return: result dict
+    """
+    from lidaco.common.Logger import Logger
+    from lidaco.core.Builder import Builder
+
+    config_file, input_path = SAMPLES[sample]
+    if synthetic is not None:
+        input_path = path.join(synthetic, SAMPLE_FORMATS[sample])
+    output_path = tempfile.mkdtemp()
+    result = {'sample': sample, 'writer': writer, 'mode': mode, 'seconds': None, 'rows': 0, 'input_bytes': 0,
+              'output_bytes': 0, 'rows_per_s': None, 'mb_per_s': None, 'peak_rss': None, 'error': None}
+
+    # the messages of the conversion, and what the readers print, are dropped
+    Logger.capture()
+    try:
+        with redirect_stdout(io.StringIO()):
+            builder = Builder(config_file=config_file, input_path=input_path, output_path=output_path,
+                              output_format=writer)
+            reader = builder.module_loader.get_reader()()
+            reader.set_configs(builder.configs)
+            files, result['input_bytes'] = input_files(builder, reader, input_path)
+
+            if mode == 'build':
+                start = time.perf_counter()
+                result['rows'] = builder.build()['rows']
+                result['seconds'] = time.perf_counter() - start
+            else:
+                result['seconds'], result['rows'] = read_to(builder, reader, files, input_path, output_path)
+
+        result['output_bytes'] = directory_size(output_path)
+        if result['seconds'] > 0:
+            result['rows_per_s'] = result['rows'] / result['seconds']
+            result['mb_per_s'] = result['input_bytes'] / 2 ** 20 / result['seconds']
+    except (Exception, SystemExit) as e:
+        result['error'] = str(e) or type(e).__name__
+    finally:
+        Logger.release()
+        shutil.rmtree(output_path, ignore_errors=True)
+
+    result['peak_rss'] = peak_rss()
+    return result
+
+
+def run(sample, writer, mode, repeat, synthetic=None):
+    """
+    Runs a case 'repeat' times, each in a fresh process.
+    :return: the result of the fastest run, with the highest peak RSS of all the runs
+    """
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for i in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results.append(executor.submit(run_case, sample, writer, mode, synthetic).result())
+
+    timed = [r for r in results if r['seconds'] is not None and r['error'] is None]
+    best = min(timed, key=lambda r: r['seconds']) if len(timed) > 0 else results[-1]
+    rss = [r['peak_rss'] for r in results if r['peak_rss'] is not None]
+    return dict(best, peak_rss=max(rss) if len(rss) > 0 else None)
+
+
+def git_label():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_result(result):
+    if result['error'] is not None:
+        print('{:<12} {:<13} {:<8} failed: {}'.format(result['sample'], result['writer'], result['mode'],
+                                                     result['error']))
+        return
+
+    rss = result['peak_rss'] / 2 ** 20 if result['peak_rss'] is not None else float('nan')
+    print('{:<12} {:<13} {:<8} {:>9.3f} {:>9} {:>11.0f} {:>8.2f} {:>9.1f} {:>10.2f}'.format(
+        result['sample'], result['writer'], result['mode'], result['seconds'], result['rows'],
+        result['rows_per_s'] or 0, result['mb_per_s'] or 0, rss, result['output_bytes'] / 2 ** 20))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--output', default='benchmark-results.json', help='results file (default: benchmark-results.json)')
+    parser.add_argument('--label', default=None, help='name of the version benchmarked (default: the git commit)')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per case, the fastest is kept (default: 1)')
+    parser.add_argument('--samples', nargs='+', default=list(SAMPLES), choices=list(SAMPLES), help='samples to run')
+    parser.add_argument('--writers', nargs='+', default=WRITERS, choices=WRITERS, help='writers to run')
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES, help='modes to run')
+    parser.add_argument('--synthetic', default=None,
+                        help='directory written by "python -m benchmarks.synthetic all", read instead of the samples')
+    args = parser.parse_args()
+
+    print('{:<12} {:<13} {:<8} {:>9} {:>9} {:>11} {:>8} {:>9} {:>10}'.format(
+        'sample', 'writer', 'mode', 'time (s)', 'rows', 'rows/s', 'MB/s', 'RSS (MB)', 'out (MB)'))
+
+    results = []
+    for sample in args.samples:
+        for writer in args.writers:
+            for mode in args.modes:
+                result = run(sample, writer, mode, max(1, args.repeat), args.synthetic)
+                print_result(result)
+                results.append(result)
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'label': args.label or git_label(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'inputs': args.synthetic or 'samples',
+            'results': results,
+        }, f, indent=2)
+
+    print('Wrote', args.output)
+
+
+if __name__ == '__main__':
+    main()
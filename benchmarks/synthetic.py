@@ -0,0 +1,881 @@
+"""
+Synthetic input files of every instrument format, to stress-test the readers and the benchmarks at sizes
+the bundled samples do not reach (1 GB and more).
+
+The files are laid out like the bundled samples: file names, headers, column order, separators, decimal
+marks, timestamp formats and line endings. The values are random but plausible. Corrupt records, cut short
+after their timestamp as by a write interrupted mid-line, can be mixed in (--corrupt).
+
+The Galion reader takes the number of range gates from the configuration ('n_gates', 42 in
+samples/Galion/configs/scenario.yaml): generate Galion files with the same --gates.
+
+Usage: python -m benchmarks.synthetic <format | all> <output directory> [--duration 1D | --size 1GB]
+       [--interval 10min] [--gates 10] [--files 1] [--corrupt 0.001] [--filetype sta] [--start 2016-11-24]
+       [--seed 0]
+"""
+from contextlib import ExitStack
+from os import path
+import argparse
+import math
+import os
+import re
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# epochs of the Windscanner timestamps and of the ZephIR 'Timestamp (s)' column (as in the samples)
+LABVIEW_EPOCH = pd.Timestamp('1904-01-01')
+ZEPHIR_EPOCH = pd.Timestamp('1999-08-08')
+
+# records formatted at once
+CHUNK_SIZE = 4096
+
+WINDCUBE_V1_HEADER = r'''Version=3.1.66
+ID System=WLS7-72
+ID Client=NEWA
+Localisation=Elmarshausen
+GPS Localisation=51°20'52.64"N 9°10'48.97"E 272.6m
+Comments=Meas_ID:080
+Measurements informations :
+********************
+ScanAngle(°)=27.80
+NumberOfAveragedShots=10000
+RollAngle(°)=0.00
+HeadingAngle(°)=-0.40
+Altitudes(m)=	{altitudes}
+PitchAngle(°)=0.10
+CNRThreshold=-21
+WiperCNRThreshold=-19.0
+WiperAltitude(m)=100.0
+WiperDuration(ms)=1000.0
+Wavelength(nm)=1543.00
+Angle BetweenTwoPositions(°)=90
+DirectionOffset(°)=0.000
+Algorithm Parameters :
+********************
+Algorithm=MLE
+MAOFrequency(Hz)=67850000.000
+CutOffFrequency(Hz)=90000000.000
+WindowLength(s)=0.000000E+0
+IndexRange0=72
+PathLaserPulse=C:\Documents and Settings\user\Desktop\TOOLS\CalibDist\pulse_laser.sig
+NumberOfSamples_LaserPulse=74
+BeginIndex_LaserPulse=0
+BeginIndex_NoiseReference=0
+NumberOfNoiseWindowsByProfile=1
+VrThreshold (m/s)=)1.700
+SigmaFreqThreshold (m/s)=)0.750
+Acquisition Parameters :
+********************
+SamplingInterval=4.000000E-9
+NumberOfSamples=1024
+VerticalCoupling=AC, 50 Ohm
+Offset=0.000
+FullScale=0.200
+NumberOfSegments=100
+TriggerSource=External
+TriggerCoupling=DC, 50 Ohm (Ext. trig. only)
+TriggerSlope=Positive
+TriggerLevel1=3000
+TriggerLevel2=0
+DelayLine=4.000000E-7
+AbsoluteInitialPosition(°)=91890
+RelativeInitialPosition(°)=90
+InitialDate/Time={start}
+Gain=32.797000
+InitialLD1(mA)=IC1=320
+InitialLD2(mA)=IC2=2200'''
+
+WINDCUBE_V2_HEADER = r'''Version=1.1.13
+ID System=WLS7-164
+ID Client=IWES
+Location=NEWA-WP1-Oberelsungen
+GPS Location=Lat:51.377877N, Long:9.212825E
+Comments=
+FCR Option=OFF
+timezone=UTC+0
+********************
+Windcube Parameters (internal use only)
+********************
+Sampling Frequency (Hz)=250000000.000
+Ref Frequency (Hz)=68000000.000
+Pulses / Line of Sight=20000
+Samples / Pulse=1024
+Reflected Pulse Start=62
+Reflected Pulse End=136
+Ref pulse samples nb=1
+Nb High Pass Filter Points=5
+FFT Window Width=50
+Laser Diode  Current (mA)=1900
+LOS=
+Init Drive Position (°)=90
+Pulse Repetition Rate (Hz)=30000.000
+Pulse Duration (s)=0.000000175
+Trigger Delay Time=0.000000400
+Wavelength (nm)=1543.000
+ScanAngle (°)=28.000
+DirectionOffset (°)=-84.000
+Declination (°)=-78.800
+PitchAngle (°)=0.100
+RollAngle (°)=-0.100
+CNRThreshold=-23.000
+VrThreshold (m/s)=1.700
+SigmaFreqThreshold (m/s)=0.750
+WiperCNRThreshold=-19.000
+WiperAltitude (m)=100
+WiperDuration (ms)=100.000
+Altitudes (m)=	{altitudes}
+********************'''
+
+ZEPHIR_HEADER = 'CSV Converter: v1,114;Filter: v1,026;Averager: v1,009;File system version: v4;Unit: 317;' \
+                'Time sync: UTC +1,0 hrs;Time stamps indicate the beginning of the averaging period;' \
+                '38m is a fixed reference measurement;The GPS field contains latitude and longitude coordinates ' \
+                'in decimal degrees (positive sign indicates North or East);ZephIR window height above ground: ' \
+                '3,0m;Measurement heights: {heights}'
+
+WLS70_HEADER = ''' :BUFR: # EDITION = 3
+    0 # MBUFR Error code
+ :SEC1:
+    0 # BUFR MASTER TABLE
+   46 # ORIGINATING CENTER:
+    0 # ORIGINATING SUBCENTER
+    0 # UPDATE SEQUENCE NUMBER
+    4 # DATA CATEGORY: Single level upper-air data (other than satellite)
+    0 # DATA SUBCATEGORY
+    0 # LOCAL DATA SUBCATEGORY
+   11 # BUFR MASTER TABLE VERSION NUMBER
+    0 # LOCAL TABLE VERSION NUMBER
+{start.year:5d} # YEAR
+{start.month:5d} # MONTH
+{start.day:5d} # DAY
+{start.hour:5d} # HOUR
+{start.minute:5d} # MINUTE
+ :SEC3:
+{subsets:8d}
+    15 # Num.descriptors
+     1 # Flag for Compressed data (1=compressed 0=uncompressed)
+      004001 #     004001-Year
+      004002 #     004002-Month
+      004003 #     004003-Day
+      004004 #     004004-Hour
+      004005 #     004005-Minute
+      004006 #     004006-Seconde
+      012101 #     012101-Temperature
+      002135 #     002135-Antenna elevation
+      007007 #     007007-Height
+      021030 #     021030-Signal to noise ratio
+      011002 #     011012-Wind speed
+      011001 #     011011-Wind direction
+      011003 #     011003-U-component
+      011004 #     011004-V-component
+      011005 #     011005-W-component
+  :SEC4:
+   15 # N. VARIABLES !!!
+
+'''
+
+# range gate heights of the WLS70 sample, more gates are 100 m apart
+WLS70_HEIGHTS = [100, 120, 140, 160, 180, 200] + list(range(250, 1001, 50)) + list(range(1100, 2001, 100))
+
+AQ500_HEADER = '''[BOF]
+[BOH]
+Station site name=Escheberg_AJ03        \x00
+AQ500 Program version=9S24\x00
+Antenna orientation(deg)=98 \x00
+Output power(W)=250 \x00
+Number of levels={levels}
+Lowest level(LL m)={lowest}
+Highest level(HL m)={highest}
+Interval(m)={step}
+Data average time(min)={minutes}
+Measurement mode=1
+ASCIICode.Decimal=46
+ASCIICode.Data field separator=44
+No data=9999
+Data field 1: Date and Time(YYYYMMDD hh:mm)
+Data field 2: Battery voltage(V * 100)
+Data field 3: Temperature sensor(deg C * 10)=True
+Data field 4: Humidity sensor(%RH)=True
+Data field 5: Pressure sensor(Hp)=False
+Data field {fields[0]}: Speed m/s(LL to HL)
+Data field {fields[1]}: Dir degrees(LL to HL)
+Data field {fields[2]}: Std-Speed m/s(LL to HL)
+Data field {fields[3]}: Vertical velocity(w) m/s(LL to HL)
+Data field {fields[4]}: Std-w m/s(LL to HL)
+Data field {fields[5]}: Quality(S/N*10)(LL to HL)
+[EOH]
+[BOD]
+'''
+
+
+def levels(first, step, count):
+    return [first + step * i for i in range(count)]
+
+
+def format_rows(row_format, values, prefixes=None, decimal='.'):
+    """
+    Formats records, one %-format per record.
+    :param row_format: %-format of the values of a record
+    :param values: 2-D array (records x values)
+    :param prefixes: text put before each record, e.g. its formatted timestamp
+    :param decimal: decimal mark of the values
+    :return: list of str
+    """
+    rows = [row_format % tuple(row) for row in values.tolist()]
+    if decimal != '.':
+        rows = [row.replace('.', decimal) for row in rows]
+    if prefixes is not None:
+        rows = [prefix + row for prefix, row in zip(prefixes, rows)]
+    return rows
+
+
+def format_times(times, time_format, digits=6):
+    """
+    :param times: DatetimeIndex
+    :param time_format: strftime format
+    :param digits: digits of the fraction of a second, if time_format ends with %f
+    :return: list of str
+    """
+    stamps = times.strftime(time_format)
+    return list(stamps) if digits == 6 else [stamp[:digits - 6] for stamp in stamps]
+
+
+def interleave(*columns):
+    """
+    :param columns: arrays (records x gates)
+    :return: array (records x gates * len(columns)) holding the columns of the first gate, then of the second...
+    """
+    return np.stack(columns, axis=2).reshape(columns[0].shape[0], -1)
+
+
+def parse_size(size):
+    """
+    :param size: bytes (int or digits), or e.g. '512KB', '64MB', '1GB'
+    :return: bytes
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*([KMG]B)?\s*', str(size), re.IGNORECASE)
+    if match is None:
+        raise ValueError('Bad size: "{}"'.format(size))
+    if match.group(2) is None:
+        return int(match.group(1))
+    return int(match.group(1)) * 1024 ** ('KMG'.index(match.group(2)[0].upper()) + 1)
+
+
+class Generator:
+    """
+    Writes the input files of an instrument format: a header, the records and a footer. A record is the text
+    of one timestamp, one line or several (e.g. a Galion scan, a gate per line).
+    """
+    interval = '10min'  # default time between records
+    gates = 10  # default number of range gates (altitudes, levels)
+    separator = ';'
+    newline = '\n'
+    encoding = 'latin-1'
+    time_fields = 1  # leading fields of a record up to its timestamp, kept by corrupt records
+
+    def __init__(self, gates=None, rng=None, filetype=None):
+        """
+        :param gates: number of range gates, default: the format's
+        :param rng: numpy random Generator
+        :param filetype: file type of the formats writing several, e.g. 'sta' or 'rtd'
+        """
+        self.gates = gates or type(self).gates
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.filetype = filetype
+
+    def filenames(self, start, end):
+        """
+        :param start: timestamp of the first record of the file
+        :param end: timestamp after the last record
+        :return: file names, the file holding the records first, then its companion files (e.g. _system.txt)
+        """
+        return [self.filename(start, end)]
+
+    def headers(self, start, count):
+        """
+        :param start: timestamp of the first record of the file
+        :param count: number of records of the file
+        :return: the header of each file, see filenames
+        """
+        return [self.header(start, count)]
+
+    def records(self, times, first):
+        """
+        :param times: DatetimeIndex of the records
+        :param first: index in the file of the first record
+        :return: a list of records (str, without their last line ending) per file, see filenames
+        """
+        return [self.rows(times, first)]
+
+    def footers(self):
+        return [self.footer()]
+
+    def filename(self, start, end):
+        raise NotImplementedError
+
+    def header(self, start, count):
+        return ''
+
+    def rows(self, times, first):
+        raise NotImplementedError
+
+    def footer(self):
+        return ''
+
+    def corrupt(self, record):
+        """
+        Cuts a record short after its timestamp, at a field separator.
+        :param record: record text
+        :return: corrupt record text
+        """
+        fields = record.split(self.separator)
+        cut = self.rng.integers(self.time_fields, max(self.time_fields + 1, len(fields) - 1))
+        return self.separator.join(fields[:cut])
+
+    def wind(self, count):
+        """
+        :param count: number of records
+        :return: (horizontal wind speed, direction, vertical wind speed), arrays (records x gates)
+        """
+        shape = (count, self.gates)
+        return self.rng.gamma(4.0, 1.5, shape), self.rng.uniform(0, 360, shape), self.rng.normal(0, 0.3, shape)
+
+
+class Windscanner(Generator):
+    """
+    _wind.txt (a line of sight per record: counters, start and end time in seconds since 1904-01-01, azimuth
+    and elevation, then the range, radial velocity, CNR and width of each gate) and its _system.txt (time,
+    position and attitude of the scanner), named after the time the files were closed.
+    """
+    interval = '1s'
+    gates = 77
+    newline = '\r\n'
+    encoding = 'ascii'
+    time_fields = 5
+
+    def filenames(self, start, end):
+        name = end.strftime('%Y%m%d%H%M%S')
+        return [name + '_wind.txt', name + '_system.txt']
+
+    def headers(self, start, count):
+        return ['', '']
+
+    def records(self, times, first):
+        count = len(times)
+        index = np.arange(first, first + count)
+        seconds = ((times - LABVIEW_EPOCH) / pd.Timedelta(1, 's')).to_numpy()
+        milliseconds = ((times - times.normalize()) / pd.Timedelta(1, 'ms')).to_numpy().astype(np.int64)
+
+        # a range height indicator scan: the elevation sweeps up and down, 0.5 degree per record
+        phase = index * 0.5 % 116
+        elevation = 2 + np.where(phase < 58, phase, 116 - phase)
+
+        ranges = np.broadcast_to(np.array(levels(100, 25, self.gates), dtype=float), (count, self.gates))
+        velocity = self.rng.normal(3.0, 1.0, (count, self.gates))
+        cnr = -17 - 0.05 * np.arange(self.gates) + self.rng.normal(0, 0.5, (count, self.gates))
+        width = self.rng.uniform(0.2, 1.2, (count, self.gates))
+
+        wind_values = np.column_stack([index + 271, milliseconds, milliseconds + 49, seconds, seconds + 0.985,
+                                       np.full(count, 37.1), elevation, interleave(ranges, velocity, cnr, width)])
+        wind_rows = format_rows('0;%d;%d;%d;%.3f;%.3f;%.3f;%.3f;' + ';'.join(['%d;%.3f;%.3f;%.3f'] * self.gates),
+                                wind_values)
+
+        attitude = np.column_stack([milliseconds + 60, self.rng.normal(0.16, 0.01, (count, 2))])
+        system_rows = format_rows('%d;{};512145.6972N;091142.6101E;439.229105;0.00;%.2f;%.2f;0.00',
+                                  attitude)
+        system_rows = [row.format(stamp) for row, stamp in zip(system_rows, format_times(times, '%d%m%y;%H%M%S.%f', 2))]
+
+        return [wind_rows, system_rows]
+
+    def footers(self):
+        return ['', '']
+
+
+class Windcube(Generator):
+    """
+    Windcube .sta (10 minute statistics) or .rtd (real time data, a line of sight per record) file: a header of
+    the lidar parameters, of which the altitudes, then tab separated records with a block of columns per
+    altitude, each block followed by an empty column.
+    """
+    separator = '\t'
+    header_size_key = None
+    header_template = None
+    system = None
+    time_formats = None
+
+    def __init__(self, gates=None, rng=None, filetype=None):
+        super().__init__(gates, rng, filetype or 'sta')
+        if self.filetype not in ('sta', 'rtd'):
+            raise ValueError('Unknown Windcube file type: "{}"'.format(self.filetype))
+        self.interval = '10min' if self.filetype == 'sta' else '1s'
+        self.altitudes = levels(40, 20, self.gates)
+
+    def filename(self, start, end):
+        return '{}_{}.{}'.format(self.system, start.strftime('%Y_%m_%d__%H_%M_%S'), self.filetype)
+
+    def header(self, start, count):
+        lines = self.header_lines(start)
+        columns = self.columns()
+        return self.newline.join(['{}={}'.format(self.header_size_key, len(lines))] + lines + [columns, ''])
+
+    def header_lines(self, start):
+        return self.header_template.format(altitudes='\t'.join(str(a) for a in self.altitudes)).split('\n')
+
+    def join_blocks(self, leading, blocks):
+        # every block is followed by an empty column
+        return '\t'.join(leading + [block + '\t' for block in blocks])
+
+    def columns(self):
+        raise NotImplementedError
+
+
+class Windcubev1(Windcube):
+    header_size_key = 'HeaderLength'
+    header_template = WINDCUBE_V1_HEADER
+    system = 'WLS7-72'
+
+    def header_lines(self, start):
+        return self.header_template.format(altitudes='\t'.join(str(a) for a in self.altitudes),
+                                           start=start.strftime('%d/%m/%Y %H:%M:%S.00')).split('\n')
+
+    def columns(self):
+        if self.filetype == 'sta':
+            names = ['Vhm{}', 'dVh{}', 'VhMax{}', 'VhMin{}', 'Azim{}', 'um{}', 'du{}', 'vm{}', 'dv{}', 'wm{}', 'dw{}',
+                     'CNRm', 'dCNR', 'CNRmax', 'CNRmin', 'spectral_broadening', 'dspectral_broadening', 'Avail.{}']
+            leading = ['Date', 'WiperCount', 'Tm']
+        else:
+            names = ['Vh-{}', 'Azi {}', 'u-{}', 'v-{}', 'w-{}', 'CNR-{}', 'RWS-{}', 'RWSD-{}']
+            leading = ['Date', 'Position', 'Temperature (°C)', 'Wiper']
+
+        return self.join_blocks(leading, ['\t'.join(name.format(gate) for name in names)
+                                          for gate in range(1, self.gates + 1)])
+
+    def rows(self, times, first):
+        count = len(times)
+        speed, direction, vertical = self.wind(count)
+
+        if self.filetype == 'sta':
+            u, v = -speed * np.sin(np.radians(direction)), -speed * np.cos(np.radians(direction))
+            spread = self.rng.uniform(0.3, 1.0, (count, self.gates))
+            cnr = self.rng.normal(-10, 5, (count, self.gates))
+            values = np.column_stack([np.zeros(count), self.rng.normal(1.5, 0.1, count), interleave(
+                speed, spread, speed + 2 * spread, np.maximum(speed - 2 * spread, 0), direction,
+                u, spread, v, spread, vertical, spread / 3, cnr, spread * 3, cnr + 4, cnr - 8,
+                self.rng.uniform(0.7, 1.3, (count, self.gates)), spread / 3,
+                self.rng.uniform(50, 100, (count, self.gates)))])
+            block = '%.2f\t%.2f\t%.2f\t%.2f\t%.1f\t%.3f\t%.3f\t%.3f\t%.3f\t%.3f\t%.3f\t%.2f\t%.2f\t%.2f\t%.2f\t' \
+                    '%.3f\t%.3f\t%.2f'
+            stamps = format_times(times, '%d/%m/%Y %H:%M:%S\t')
+            return format_rows(self.join_blocks(['%d', '%.2f'], [block] * self.gates), values, stamps)
+
+        # Doppler beam swinging: four beams 90 degrees apart
+        position = (np.arange(first, first + count) % 4) * 90.0
+        u, v = -speed * np.sin(np.radians(direction)), -speed * np.cos(np.radians(direction))
+        values = np.column_stack([position, self.rng.normal(20, 1, count), interleave(
+            speed, np.broadcast_to(position[:, None], (count, self.gates)), u, v, vertical,
+            self.rng.normal(-15, 5, (count, self.gates)), self.rng.normal(0, 3, (count, self.gates)),
+            self.rng.uniform(0.2, 1.5, (count, self.gates)))])
+        block = '%.2f\t%.1f\t%.2f\t%.2f\t%.2f\t%.1f\t%.2f\t%.2f'
+        stamps = format_times(times, '%d/%m/%Y %H:%M:%S.%f', 2)
+        # the wiper state is text
+        return format_rows(self.join_blocks(['\t%.1f', '%.2f', 'Off'], [block] * self.gates), values, stamps)
+
+
+class Windcubev2(Windcube):
+    header_size_key = 'HeaderSize'
+    header_template = WINDCUBE_V2_HEADER
+    system = 'WLS7-164'
+
+    def columns(self):
+        if self.filetype == 'sta':
+            names = ['Wind Speed (m/s)', 'Wind Speed Dispersion (m/s)', 'Wind Speed min (m/s)', 'Wind Speed max (m/s)',
+                     'Wind Direction (°)', 'Z-wind (m/s)', 'Z-wind Dispersion (m/s)', 'CNR (dB)', 'CNR min (dB)',
+                     'Dopp Spect Broad (m/s)', 'Data Availability (%)']
+            leading = ['Timestamp (end of interval)', 'Int Temp (°C)', 'Ext Temp (°C)', 'Pressure (hPa)',
+                       'Rel Humidity (%)', 'Wiper count', 'Vbatt (V)']
+        else:
+            names = ['Wind Speed (m/s)', 'Wind Direction (°)', 'Radial Wind Speed (m/s)',
+                     'Radial Wind Speed Dispersion (m/s)', 'CNR (dB)', 'X-wind (m/s)', 'Y-wind (m/s)', 'Z-wind (m/s)']
+            leading = ['Timestamp', 'Position', 'Temperature', 'Wiper Count']
+
+        return self.join_blocks(leading, ['\t'.join('{}m {}'.format(altitude, name) for name in names)
+                                          for altitude in self.altitudes])
+
+    def rows(self, times, first):
+        count = len(times)
+        speed, direction, vertical = self.wind(count)
+
+        if self.filetype == 'sta':
+            spread = self.rng.uniform(0.1, 1.0, (count, self.gates))
+            cnr = self.rng.normal(-15, 4, (count, self.gates))
+            values = np.column_stack([self.rng.normal(24.6, 0.2, count), self.rng.normal(5, 3, count),
+                                      self.rng.normal(990, 5, count), self.rng.uniform(40, 100, count),
+                                      np.zeros(count), self.rng.normal(24, 0.2, count), interleave(
+                speed, spread, np.maximum(speed - 2 * spread, 0), speed + 2 * spread, direction, vertical,
+                spread / 5, cnr, cnr - 2, self.rng.uniform(1.0, 1.5, (count, self.gates)),
+                self.rng.uniform(50, 100, (count, self.gates)))])
+            block = '%.2f\t%.2f\t%.2f\t%.2f\t%.1f\t%.2f\t%.2f\t%.1f\t%.1f\t%.2f\t%d'
+            stamps = format_times(times, '%Y/%m/%d %H:%M\t')
+            return format_rows(self.join_blocks(['%.2f', '%.2f', '%.2f', '%.2f', '%d', '%.2f'],
+                                                [block] * self.gates), values, stamps)
+
+        # Doppler beam swinging: four beams 90 degrees apart, then the vertical beam
+        beam = np.arange(first, first + count) % 5
+        positions = np.array(['0', '90', '180', '270', 'V'])[beam]
+        u, v = -speed * np.sin(np.radians(direction)), -speed * np.cos(np.radians(direction))
+        values = np.column_stack([self.rng.normal(20, 1, count), np.zeros(count), interleave(
+            speed, direction, self.rng.normal(0, 3, (count, self.gates)), self.rng.uniform(0.2, 1.5, (count, self.gates)),
+            self.rng.normal(-15, 5, (count, self.gates)), u, v, vertical)])
+        block = '%.2f\t%.1f\t%.2f\t%.2f\t%.1f\t%.2f\t%.2f\t%.2f'
+        stamps = ['{}\t{}\t'.format(stamp, position)
+                  for stamp, position in zip(format_times(times, '%Y/%m/%d %H:%M:%S.%f', 2), positions)]
+        return format_rows(self.join_blocks(['%.2f', '%d'], [block] * self.gates), values, stamps)
+
+
+class ZephIR300(Generator):
+    """
+    ZephIR 300 10 minute averages (Wind10_*.ZPH.csv): a line of parameters, of which the measurement heights,
+    the column names, then ;-separated records with decimal commas and a block of columns per height.
+    """
+    time_fields = 2
+
+    def __init__(self, gates=None, rng=None, filetype=None):
+        super().__init__(gates, rng, filetype)
+        self.heights = levels(38, 20, self.gates)[::-1]
+
+    def filename(self, start, end):
+        return 'Wind10_317@Y{}.ZPH.csv'.format(start.strftime('%Y_M%m_D%d'))
+
+    def header(self, start, count):
+        names = ['Packets in Average at {}m', 'Wind Direction (deg) at {}m', 'Horizontal Wind Speed (m/s) at {}m',
+                 'Horizontal Wind Speed Min (m/s) at {}m', 'Horizontal Wind Speed Max (m/s) at {}m',
+                 'Horizontal Wind Speed Std. Dev. (m/s) at {}m', 'Vertical Wind Speed (m/s) at {}m', 'TI at {}m']
+        columns = ['Reference', 'Time and Date', 'Timestamp (s)', 'Info. Flags', 'Status Flags', 'Battery (V)',
+                   'Generator (V)', 'Upper Temp. (C)', 'Lower Temp. (C)', 'Pod Humidity (%)', 'GPS',
+                   'ZephIR Bearing (deg)', 'Tilt (deg)', 'Air Temp. (C)', 'Pressure (mbar)', 'Humidity (%)',
+                   'MET Wind Speed (m/s)', 'MET Direction (deg)', 'Proportion Of Packets With Rain (%)']
+        columns += [name.format(height) for height in self.heights for name in names] + ['Checksum']
+        heights = ' '.join('{}m'.format(height) for height in self.heights)
+        return self.newline.join([ZEPHIR_HEADER.format(heights=heights), ';'.join(columns), ''])
+
+    def rows(self, times, first):
+        count = len(times)
+        speed, direction, vertical = self.wind(count)
+        spread = self.rng.uniform(0.1, 0.8, (count, self.gates))
+
+        values = np.column_stack([
+            (times - ZEPHIR_EPOCH) / pd.Timedelta(1, 's'), self.rng.normal(11.8, 0.1, count),
+            self.rng.uniform(0, 1, count), self.rng.normal(40, 1, count), self.rng.normal(41, 1, count),
+            self.rng.uniform(10, 30, count), np.full(count, 311.066), np.ones(count), self.rng.normal(3, 2, count),
+            self.rng.normal(992, 5, count), self.rng.uniform(0, 100, count), speed[:, -1], direction[:, -1],
+            np.zeros(count), interleave(
+                np.full((count, self.gates), 36.0), direction, speed, np.maximum(speed - 2 * spread, 0),
+                speed + 2 * spread, spread, vertical, spread / np.maximum(speed, 0.1))])
+        row = '%d;I-net Shutter-Open;Modem;%.3f;%.3f;%d;%d;%d;51.31546 9.16535;%.3f;%d;%.3f;%.3f;%.3f;%.3f;%.3f;%d;' \
+              + ';'.join(['%d;%.3f;%.3f;%.3f;%.3f;%.3f;%.3f;%.8f'] * self.gates)
+        stamps = ['{};{};'.format(21980722 + i, stamp)
+                  for i, stamp in zip(range(first, first + count), format_times(times, '%d.%m.%Y %H:%M:%S'))]
+        rows = format_rows(row, values, stamps, decimal=',')
+        return ['{};{:08X}'.format(row, zlib.crc32(row.encode('latin-1'))) for row in rows]
+
+
+class Galion(Generator):
+    """
+    Galion .scn file: 6 lines of metadata, then a line per range gate of each scan: gate, Doppler velocity,
+    intensity, ray time, azimuth, elevation, pitch and roll.
+    """
+    interval = '12s'
+    gates = 42
+    separator = '\t'
+    newline = '\r\n'
+    time_fields = 4
+
+    def filename(self, start, end):
+        return '1352170_{}_{}.scn'.format(start.strftime('%d%m%y%H'), self.gates)
+
+    def header(self, start, count):
+        name = self.filename(start, None)
+        return self.newline.join([
+            'Filename:\tC:\\Lidar\\Data\\{}\\{}'.format(start.strftime('%Y\\%Y%m\\%Y%m%d\\%H'), name),
+            'Campaign code:\t2017 Perdigao Turb7',
+            'Campaign number:\t176',
+            'Rays in scan:\t32',
+            'Start time: \t{}'.format(start.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]),
+            'Range gate\tDoppler\tIntensity\tRay time\tAz\tEl\tPitch\tRoll',
+            ''])
+
+    def rows(self, times, first):
+        count = len(times)
+
+        # plan position indicator scans: the azimuth steps 3 degrees per scan
+        azimuth = (244.5 - 3 * np.arange(first, first + count)) % 360
+        values = np.column_stack([
+            self.rng.normal(0, 2, count * self.gates), self.rng.uniform(0.95, 1.1, count * self.gates),
+            np.repeat(azimuth, self.gates), np.full(count * self.gates, 9.0),
+            np.repeat(self.rng.normal(-0.093, 0.01, count), self.gates),
+            np.repeat(self.rng.normal(0.297, 0.01, count), self.gates)])
+        gates = np.tile(np.arange(self.gates), count)
+        stamps = np.repeat(format_times(times, '%Y-%m-%d %H:%M:%S.%f', 3), self.gates)
+        lines = format_rows('\t%.6f\t%.6f\t{}\t%.3f\t%.3f\t%.3f\t%.3f', values)
+        lines = ['{}{}'.format(gate, line.format(stamp)) for gate, line, stamp in zip(gates.tolist(), lines, stamps)]
+
+        return [self.newline.join(lines[i:i + self.gates]) for i in range(0, len(lines), self.gates)]
+
+    def corrupt(self, record):
+        # one line of the scan is cut short
+        lines = record.split(self.newline)
+        i = self.rng.integers(len(lines))
+        lines[i] = super().corrupt(lines[i])
+        return self.newline.join(lines)
+
+
+class WLS70(Generator):
+    """
+    WLS70 BUFR text dump: 39 header lines, then a subset of 17 lines per time and range gate (the subset number,
+    date and time, temperature, elevation, height, SNR, wind speed and direction, u, v, w, a blank line), then
+    an end line.
+    """
+    gates = 32
+
+    def __init__(self, gates=None, rng=None, filetype=None):
+        super().__init__(gates, rng, filetype)
+        self.heights = (WLS70_HEIGHTS + levels(2100, 100, self.gates))[:self.gates]
+
+    def filename(self, start, end):
+        return 'WLS70-001_{}_N0.txt'.format(start.strftime('%Y_%m_%d__%H_%M_%S'))
+
+    def header(self, start, count):
+        return WLS70_HEADER.format(start=start, subsets=count * self.gates + 1)
+
+    def rows(self, times, first):
+        count = len(times)
+        speed, direction, vertical = self.wind(count)
+        u, v = -speed * np.sin(np.radians(direction)), -speed * np.cos(np.radians(direction))
+
+        shape = (count, self.gates)
+        dates = np.column_stack([times.year, times.month, times.day, times.hour, times.minute, times.second])
+        values = np.stack([np.broadcast_to(self.rng.normal(12.3, 0.2, count)[:, None], shape), np.full(shape, 75.323),
+                           np.broadcast_to(np.array(self.heights, dtype=float), shape),
+                           self.rng.normal(-15, 8, shape), speed, direction, u, v, vertical], axis=2)
+
+        subsets = format_rows('%d\n%d\n%d\n%d\n%d\n%d\n', np.repeat(dates, self.gates, axis=0))
+        subsets = [subset + measurement for subset, measurement in
+                   zip(subsets, format_rows('\n'.join(['%.6f'] * 9) + '\n', values.reshape(-1, 9)))]
+        subsets = [':SUBSET {}:\n{}\n'.format(number, subset)
+                   for number, subset in zip(range(first * self.gates + 1, (first + count) * self.gates + 1), subsets)]
+
+        return [''.join(subsets[i:i + self.gates])[:-1] for i in range(0, len(subsets), self.gates)]
+
+    def corrupt(self, record):
+        # a measurement (SNR to w) of one of the subsets could not be decoded
+        lines = record.split('\n')
+        subset = self.rng.integers(self.gates)
+        lines[17 * subset + self.rng.integers(10, 16)] = '*****'
+        return '\n'.join(lines)
+
+    def footer(self):
+        return ' :7777:'
+
+
+class AQ500(Generator):
+    """
+    AQ500 sodar result file (YYMMDD_result.txt): a header of the levels and of the data fields, then
+    ,-separated records with a block of fields per level: speed, direction, speed std, w, w std and quality.
+    """
+    gates = 31
+    separator = ','
+    newline = '\r\n'
+
+    def filename(self, start, end):
+        return '{}_result.txt'.format(start.strftime('%y%m%d'))
+
+    def header(self, start, count):
+        fields = [','.join(str(6 + 6 * level + i) for level in range(self.gates)) for i in range(6)]
+        minutes = max(1, round(pd.Timedelta(self.interval) / pd.Timedelta(1, 'min')))
+        header = AQ500_HEADER.format(levels=self.gates, lowest=50, highest=50 + 5 * (self.gates - 1), step=5,
+                                     minutes=minutes, fields=fields)
+        return header.replace('\n', self.newline)
+
+    def rows(self, times, first):
+        count = len(times)
+        speed, direction, vertical = self.wind(count)
+        spread = self.rng.uniform(0.05, 0.9, (count, self.gates))
+
+        # 'No data=9999'
+        missing = np.where(self.rng.random((count, self.gates)) < 0.05, 9999, spread)
+
+        values = np.column_stack([self.rng.normal(1190, 5, count), self.rng.normal(120, 20, count),
+                                  np.zeros(count), self.rng.normal(720, 5, count), interleave(
+            speed, direction, missing, vertical, spread / 3, self.rng.uniform(80, 130, (count, self.gates)))])
+        stamps = ['{} {:2d}:{},'.format(day, hour, minute) for day, hour, minute in
+                  zip(format_times(times, '%Y%m%d'), times.hour, format_times(times, '%M'))]
+        return format_rows('%d,%d,%d,%d,' + ','.join(['%.2f,%d,%.2f,%.2f,%.2f,%d'] * self.gates), values, stamps)
+
+    def footer(self):
+        return self.newline.join(['[EOD]', '[EOF]', ''])
+
+
+class Triton(Generator):
+    """
+    Triton sodar export (TritonExport_*.csv): a title line, the logger serial number, the column names and
+    units, then ;-separated records with decimal commas: direction, speed, vertical speed and quality per
+    height, then the turbulence and its quality per height.
+    """
+    encoding = 'utf-8'
+
+    def __init__(self, gates=None, rng=None, filetype=None):
+        super().__init__(gates, rng, filetype)
+        self.heights = levels(40, 20, self.gates)
+
+    def filename(self, start, end):
+        return 'TritonExport_{}_synthetic.csv'.format(start.strftime('%Y-%m-%d-%H-%M-%S'))
+
+    def header(self, start, count):
+        columns = ['Date and Time']
+        units = ['<Intentionally blank>']
+        for height in self.heights:
+            columns += ['{}m Wind Direction'.format(height), '{}m Wind Speed'.format(height),
+                        '{}m Wind Vert'.format(height), 'Quality (Station Height {}m)'.format(height)]
+            units += ['°', 'm/s', 'm/s', '%']
+        columns += ['{}m Wind Turbulence'.format(height) for height in self.heights]
+        columns += ['Turbu. Quality (Station Height {}m)'.format(height) for height in self.heights]
+        units += ['<no units specified>'] * self.gates + ['%'] * self.gates
+
+        padding = ';' * (len(columns) - 1)
+        return self.newline.join(['Triton Wind Speed Data' + padding, 'Logger Serial Number: 358' + padding,
+                                  ';'.join(columns), ';'.join(units), ''])
+
+    def rows(self, times, first):
+        count = len(times)
+        speed, direction, vertical = self.wind(count)
+        quality = self.rng.uniform(85, 100, (count, self.gates))
+
+        values = np.column_stack([interleave(direction, speed, vertical, quality),
+                                  self.rng.uniform(0.05, 1.3, (count, self.gates)),
+                                  self.rng.uniform(10, 100, (count, self.gates))])
+        row = ';'.join(['%.1f;%.2f;%.2f;%d'] * self.gates + ['%.2f'] * self.gates + ['%d'] * self.gates)
+        return format_rows(row, values, format_times(times, '%d.%m.%Y %H:%M;'), decimal=',')
+
+
+FORMATS = {generator.__name__: generator for generator in
+           (Windscanner, Windcubev1, Windcubev2, ZephIR300, Galion, WLS70, AQ500, Triton)}
+
+
+def write_files(generator, output_path, start, count, interval, corrupt):
+    """
+    Writes a file (and its companion files) of consecutive records.
+    :param generator: Generator
+    :param output_path: output directory
+    :param start: timestamp of the first record
+    :param count: number of records
+    :param interval: time between records
+    :param corrupt: fraction of corrupt records
+    :return: list of file paths
+    """
+    file_paths = [path.join(output_path, name) for name in generator.filenames(start, start + count * interval)]
+
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(file_path, 'w', encoding=generator.encoding, newline=''))
+                 for file_path in file_paths]
+
+        for f, header in zip(files, generator.headers(start, count)):
+            f.write(header)
+
+        for first in range(0, count, CHUNK_SIZE):
+            times = pd.date_range(start + first * interval, periods=min(CHUNK_SIZE, count - first), freq=interval)
+            records = generator.records(times, first)
+
+            # the records of the main file are corrupted, its companion files stay valid
+            if corrupt > 0:
+                for i in np.flatnonzero(generator.rng.random(len(times)) < corrupt):
+                    records[0][i] = generator.corrupt(records[0][i])
+
+            for f, rows in zip(files, records):
+                f.write(generator.newline.join(rows) + generator.newline)
+
+        for f, footer in zip(files, generator.footers()):
+            f.write(footer)
+
+    return file_paths
+
+
+def record_size(name, gates, filetype, interval, start, seed, sample_size=256):
+    """
+    :return: average size in bytes of a record, over all the files of the format
+    """
+    generator = FORMATS[name](gates, np.random.default_rng(seed), filetype)
+    times = pd.date_range(start, periods=sample_size, freq=interval)
+    records = generator.records(times, 0)
+    return sum(len((record + generator.newline).encode(generator.encoding))
+               for rows in records for record in rows) / sample_size
+
+
+def generate(name, output_path, start='2016-11-24', duration='1D', size=None, interval=None, gates=None, files=1,
+             corrupt=0.0, filetype=None, seed=0):
+    """
+    Writes synthetic input files of an instrument format.
+    :param name: format, see FORMATS
+    :param output_path: output directory, created if missing
+    :param start: timestamp of the first record
+    :param duration: time covered by the records, e.g. '1D' (anything pandas.Timedelta takes)
+    :param size: total size of the files instead, approximately, e.g. '1GB'
+    :param interval: time between records, e.g. '1s', default: the format's
+    :param gates: number of range gates (altitudes, levels), default: the format's
+    :param files: number of consecutive files the records are split into
+    :param corrupt: fraction of corrupt records
+    :param filetype: 'sta' or 'rtd' for the Windcube formats, default: 'sta'
+    :param seed: random seed
+    :return: (file paths, number of records)
+    """
+    generator = FORMATS[name](gates, np.random.default_rng(seed), filetype)
+    interval = pd.Timedelta(interval or generator.interval)
+    generator.interval = interval
+    start = pd.Timestamp(start)
+
+    if size is not None:
+        count = math.ceil(parse_size(size) / record_size(name, gates, filetype, interval, start, seed))
+    else:
+        count = int(pd.Timedelta(duration) / interval)
+    count = max(1, count)
+
+    os.makedirs(output_path, exist_ok=True)
+    file_paths = []
+    per_file = math.ceil(count / max(1, files))
+    for first in range(0, count, per_file):
+        written = write_files(generator, output_path, start + first * interval, min(per_file, count - first),
+                              interval, corrupt)
+        if any(file_path in file_paths for file_path in written):
+            raise ValueError('The {} files of {} share a file name: use fewer files'.format(name, written[0]))
+        file_paths += written
+
+    return file_paths, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('format', choices=list(FORMATS) + ['all'],
+                        help='instrument format, all: every format, each in its own subdirectory')
+    parser.add_argument('output', help='output directory')
+    parser.add_argument('--start', default='2016-11-24', help='time of the first record (default: 2016-11-24)')
+    parser.add_argument('--duration', default='1D', help='time covered by the records (default: 1D)')
+    parser.add_argument('--size', default=None, help='approximate size of the files instead of --duration, e.g. 1GB')
+    parser.add_argument('--interval', default=None, help="time between records, e.g. 1s (default: the format's)")
+    parser.add_argument('--gates', type=int, default=None, help="range gates per record (default: the format's)")
+    parser.add_argument('--files', type=int, default=1, help='consecutive files the records are split into (default: 1)')
+    parser.add_argument('--corrupt', type=float, default=0.0, help='fraction of corrupt records (default: 0)')
+    parser.add_argument('--filetype', choices=['sta', 'rtd'], default=None, help='Windcube file type (default: sta)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    args = parser.parse_args()
+
+    names = list(FORMATS) if args.format == 'all' else [args.format]
+    for name in names:
+        output_path = path.join(args.output, name) if args.format == 'all' else args.output
+        file_paths, count = generate(name, output_path, args.start, args.duration, args.size, args.interval,
+                                     args.gates, args.files, args.corrupt, args.filetype, args.seed)
+        size = sum(path.getsize(file_path) for file_path in file_paths)
+        print('{:<12} {:>10} records {:>10.1f} MB  {}'.format(name, count, size / 2 ** 20, output_path))
+
+
+if __name__ == '__main__':
+    main()
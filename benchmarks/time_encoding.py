@@ -0,0 +1,78 @@
+"""
+Cost of the time coordinate formats.
+
+Compares the per-row path the readers used to take (timedelta + isoformat() for every row, written to a
+variable-length string variable) with the vectorized helpers of lidaco.common.Time, for the
+'iso8601' and the 'numeric' time_format: encoding, writing and reading the time variable back.
+
+Usage: python -m benchmarks.time_encoding [--rows 1000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import netCDF4 as nc
+
+from lidaco.common.Time import NUMERIC, ISO8601, encode_time, from_seconds
+
+
+def per_row_iso8601(seconds):
+    start_date = datetime(1904, 1, 1)
+    return np.array([(start_date + timedelta(seconds=int(value))).isoformat() + 'Z' for value in seconds])
+
+
+def vectorized(time_variable, seconds):
+    return encode_time(time_variable, from_seconds(seconds))
+
+
+def run(dir_path, name, datatype, encode, seconds):
+    file_path = os.path.join(dir_path, name + '.nc')
+
+    with nc.Dataset(file_path, 'w', format='NETCDF4') as dataset:
+        dataset.createDimension('time', None)
+        time_variable = dataset.createVariable('time', datatype, ('time',))
+
+        start = time.perf_counter()
+        values = encode(time_variable, seconds)
+        encoding = time.perf_counter() - start
+
+        start = time.perf_counter()
+        time_variable[:] = values
+        writing = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with nc.Dataset(file_path) as dataset:
+        dataset.variables['time'][:]
+    reading = time.perf_counter() - start
+
+    return encoding, writing, reading, os.path.getsize(file_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=1000000, help='time records (default: 1000000)')
+    args = parser.parse_args()
+
+    # one record per second since 2016-12-11, as LabVIEW seconds since 1904
+    seconds = 3564230400 + np.arange(args.rows, dtype=float)
+
+    cases = [
+        ('per-row iso8601', str, lambda variable, values: per_row_iso8601(values)),
+        ('vectorized ' + ISO8601, str, vectorized),
+        ('vectorized ' + NUMERIC, 'f8', vectorized),
+    ]
+
+    print('{:<22} {:>11} {:>10} {:>10} {:>10} {:>10}'.format(
+        'time format', 'encode (s)', 'write (s)', 'read (s)', 'rows/s', 'size (MB)'))
+
+    with tempfile.TemporaryDirectory() as dir_path:
+        for name, datatype, encode in cases:
+            encoding, writing, reading, size = run(dir_path, name.replace(' ', '_'), datatype, encode, seconds)
+            print('{:<22} {:>11.3f} {:>10.3f} {:>10.3f} {:>10.0f} {:>10.2f}'.format(
+                name, encoding, writing, reading, args.rows / (encoding + writing), size / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Parsing throughput of the Windscanner reader.
+
+Compares the former per-cell parser (split every row, transpose with zip, float() every cell) with
+Windscanner.load_files, which decodes the _wind.txt / _system.txt files into float arrays in one pass,
+on the _wind.txt files of a directory.
+
+Usage: python -m benchmarks.windscanner_parser [--input samples/Windscanner] [--repeat 20]
+"""
+import argparse
+import glob
+import os
+import time
+import numpy as np
+
+from lidaco.readers.Windscanner import Windscanner
+
+
+def per_cell(wind_file, system_file):
+    with open(wind_file) as f:
+        wind_file_data = [row.strip().split(';') for row in f.readlines()]
+    with open(system_file) as f:
+        system_file_data = [row.strip().split(';') for row in f.readlines()]
+
+    median_columns = int(np.median([len(row) for row in wind_file_data]))
+    wind_file_data = list(zip(*[row for row in wind_file_data if len(row) == median_columns]))
+    system_file_data = list(zip(*system_file_data))
+
+    index_columns = 4 - (len(wind_file_data) % 4)
+    for offset in (5, 6, 7):
+        list(zip(*[[float(value) for value in row] for row in wind_file_data[index_columns + offset::4]]))
+    for column in (4, 6, 7):
+        [float(value) for value in wind_file_data[column]]
+    for column in (7, 8):
+        [float(value) for value in system_file_data[column]]
+
+    return len(wind_file_data[0])
+
+
+def vectorized(wind_file, system_file):
+    wind_data, _ = Windscanner().load_files(wind_file, system_file)
+    return wind_data.shape[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--input', default=os.path.join('samples', 'Windscanner'),
+                        help='directory with _wind.txt and _system.txt files')
+    parser.add_argument('--repeat', type=int, default=20, help='times every file is parsed (default: 20)')
+    args = parser.parse_args()
+
+    wind_files = sorted(glob.glob(os.path.join(args.input, '*_wind.txt')))
+    files = [(f, f[:f.find('_wind.txt')] + '_system.txt') for f in wind_files]
+
+    print('{:<12} {:>9} {:>9} {:>12}'.format('parser', 'rows', 'time (s)', 'rows/s'))
+    for name, parse in [('per-cell', per_cell), ('vectorized', vectorized)]:
+        rows = 0
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for wind_file, system_file in files:
+                rows += parse(wind_file, system_file)
+        elapsed = time.perf_counter() - start
+        print('{:<12} {:>9} {:>9.3f} {:>12.0f}'.format(name, rows, elapsed, rows / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import sys
+from types import SimpleNamespace
 
 
 class Logger:
@@ -19,7 +20,7 @@ class Logger:
         'input_format_detected': 'Input format detected: {}.',
         'output_format_detected': 'Output format detected: {}.',
         'searching_in_path': 'Looking for input files in {}',
-        'found': 'Found {}.',
+        'discovered': 'Found {} input files in {} directories ({} listed, the others unchanged).',
         'started_r_files': 'Processing {} ...',
         'grouping': 'Grouping files...',
         'writing_file': 'Writing to {} {}.',
@@ -27,10 +28,45 @@ class Logger:
         'file_corrupt':'The file {} is corrupt. Corrupt data has been dropped.',
         'files_not_found': 'No valid files were found.',
         'loading_config': 'Loading configurations from {} .',
+        'loading_compiled_config': 'Loading the compiled configurations {} .',
+        'bad_compiled_config': 'Failed to read the compiled configurations {}, loading the .yaml files. Native error: {}',
+        'compiled_config_not_saved': 'Failed to save the compiled configurations {}. Native error: {}',
         'bad_config_file': 'Failed to load config file. ',
         'bad_config_formatting': 'Failed loading; {}',
         'missing_reader_param': 'The config {}, required by the "{}" reader is not set. ' +
                                 'Set it under in the .yaml files.',
+        'parallel_build': 'Converting {} output blocks with {} worker processes.',
+        'block_failed': 'Failed to write {}. Native error: {}',
+        'blocks_failed': '{} of {} output blocks failed.',
+        'loading_station': 'Loading station {} ...',
+        'stations_not_found': 'No configuration files were found.',
+        'parallel_batch': 'Converting {} stations with {} worker processes.',
+        'batch_header': '{:<48} {:>7} {:>7} {:>10} {:>9}',
+        'batch_row': '{:<48} {:>7} {:>7} {:>10} {:>9.2f}',
+        'batch_failed_row': '{:<48} failed after {:.2f} s: {}',
+        'bad_manifest': 'Failed to read the manifest {}, converting everything again. Native error: {}',
+        'block_up_to_date': '{} is up to date.',
+        'block_extended': 'Appending {1} new file(s) to {0}.',
+        'watching': 'Watching {} for new files (every {} s, files settle after {} s). Press Ctrl+C to stop.',
+        'watch_stopped': 'Stopped watching.',
+        'bad_timestamp_cache': 'Failed to read the timestamp cache {}, reading the timestamps again. Native error: {}',
+        'bad_listing_cache': 'Failed to read the listing cache {}, listing the input directories again. Native error: {}',
+        'bad_time_window': 'Bad time window {} "{}". Use a date / time such as "2016-12-11" or "2016-12-11 13:30".',
+        'time_window': 'Time window {} to {}: {} of {} input files.',
+        'bad_batch_size': 'Bad batch_size "{}". Use a number of records, or a size such as "64MB".',
+        'bad_time_format': 'Unknown time_format "{}". Use "iso8601" or "numeric".',
+        'bad_chunk_size': 'Bad chunk size {} "{}". Use a positive number of records (or "full" in chunking).',
+        'prefetch_unsupported': 'The {} reader writes the output itself: the input files are not prefetched.',
+        'prefetch_overlap': 'Prefetched {} input files with {} threads: parsing {:.2f} s, writing {:.2f} s, '
+                            'waiting for the parser {:.2f} s ({:.0f}% of the parsing overlapped).',
+        'profile_exported': 'Wrote the run profile to {}.',
+        'profile_stage_header': '{:<12} {:>7} {:>10} {:>10} {:>10} {:>10} {:>12}',
+        'profile_stage_row': '{:<12} {:>7} {:>10.3f} {:>10.3f} {:>10.2f} {:>10} {:>12.2f}',
+        'profile_inputs_title': 'Slowest {} inputs:',
+        'profile_inputs_header': '{:<60} {:>10} {:>10} {:>10} {:>10}',
+        'profile_inputs_row': '{:<60} {:>10.3f} {:>10.3f} {:>10.2f} {:>10}',
+        'formats_title': '{}',
+        'formats_row': '    {:<14} {:<46} {}',
         'done': 'Done.',
         'about': ''
                  + '   _ _     _                 \n'
@@ -42,6 +78,7 @@ class Logger:
     }
     verbose = False
     _debug = False
+    _records = None
 
     @staticmethod
     def set_args(args):
@@ -53,6 +90,42 @@ class Logger:
         Logger.verbose = args.verbose
         Logger._debug = args.debug
 
+    @staticmethod
+    def get_args():
+        """
+        Returns the current Logger arguments, e.g. to hand them to a worker process.
+        :return: namespace with 'verbose', 'debug' attributes
+        """
+        return SimpleNamespace(verbose=Logger.verbose, debug=Logger._debug)
+
+    @staticmethod
+    def capture():
+        """
+        Stores the following messages instead of printing them, until release() is called.
+        :return: void
+        """
+        Logger._records = []
+
+    @staticmethod
+    def release():
+        """
+        Stops capturing messages.
+        :return: the captured messages, as (prefix, message) tuples
+        """
+        records = Logger._records or []
+        Logger._records = None
+        return records
+
+    @staticmethod
+    def replay(records):
+        """
+        Prints messages captured elsewhere (e.g. by a worker process).
+        :param records: (prefix, message) tuples, as returned by release()
+        :return: void
+        """
+        for prefix, formatted_msg in records:
+            Logger.__output(prefix, formatted_msg)
+
     @staticmethod
     def __print_std_output(prefix, msg_name, *args):
         """
@@ -63,6 +136,13 @@ class Logger:
         :return: void
         """
         formatted_msg = args[0] if msg_name is None else Logger.messages[msg_name].format(*args)
+        if Logger._records is not None:
+            Logger._records.append((prefix, formatted_msg))
+        else:
+            Logger.__output(prefix, formatted_msg)
+
+    @staticmethod
+    def __output(prefix, formatted_msg):
         if prefix is None:
             print(formatted_msg)
         else:
@@ -0,0 +1,75 @@
+import io
+
+
+def parse_records(lines, delimiter, columns, time_column=None, time_format=None, decimal='.'):
+    """
+    Decodes delimited text records into typed columns in one pass (pandas' C parser).
+    Lines whose number of fields differs from the median (i.e. malformed lines) and cells
+    that are not numbers become NaN (NaT for the timestamps), so that one bad line does not
+    abort the file and the records stay aligned.
+    :param lines: data lines, without header and footer
+    :param delimiter: field delimiter, e.g. ',' or ';'
+    :param columns: {name: column index | [column indexes]} of the numeric columns to decode
+    :param time_column: index of the timestamp column, None if there is none
+    :param time_format: strptime format of the timestamps
+    :param decimal: decimal separator
+    :return: (datetime64 array of the timestamps or None, {name: float array}). A name mapped to
+    a list of columns gets a (records x columns) array, a name mapped to one column a (records,) array.
+    """
+    # imported here, so that importing the module (e.g. with the readers) does not import them
+    import numpy as np
+    import pandas as pd
+
+    indexes = {name: index if isinstance(index, int) else [int(i) for i in index] for name, index in columns.items()}
+    numeric_columns = sorted(set(i for index in indexes.values() for i in np.atleast_1d(index)))
+    usecols = numeric_columns + ([time_column] if time_column is not None else [])
+
+    if len(lines) == 0:
+        timestamps = np.array([], dtype='datetime64[ns]') if time_column is not None else None
+        return timestamps, {name: np.empty((0,) if isinstance(index, int) else (0, len(index)))
+                            for name, index in indexes.items()}
+
+    fields_in_line = np.array([line.count(delimiter) for line in lines]) + 1
+    n_fields = max(int(np.median(fields_in_line)), max(usecols) + 1)
+    valid = fields_in_line == int(np.median(fields_in_line))
+
+    # the malformed lines are replaced with empty fields rather than blank lines, which the parser drops at the end
+    if not valid.all():
+        empty = delimiter * (n_fields - 1)
+        lines = [line if ok else empty for line, ok in zip(lines, valid)]
+
+    table = pd.read_csv(io.StringIO('\n'.join(lines)), sep=delimiter, header=None, names=range(n_fields),
+                        usecols=usecols, dtype={time_column: str} if time_column is not None else None,
+                        decimal=decimal, skip_blank_lines=False, engine='c')
+
+    for i in numeric_columns:
+        if not pd.api.types.is_numeric_dtype(table[i]):
+            values = table[i].str.strip()
+            if decimal != '.':
+                values = values.str.replace(decimal, '.', regex=False)
+            table[i] = pd.to_numeric(values, errors='coerce')
+
+    timestamps = None
+    if time_column is not None:
+        timestamps = pd.to_datetime(table[time_column].str.strip(), format=time_format, errors='coerce').to_numpy()
+
+    return timestamps, {name: table[index].to_numpy(dtype=float) for name, index in indexes.items()}
+
+
+def read_records(file_path, delimiter, columns, header_lines=0, footer_lines=0, encoding=None, **kwargs):
+    """
+    Reads a delimited text file and decodes its records, see parse_records.
+    :param file_path: file path
+    :param delimiter: field delimiter
+    :param columns: see parse_records
+    :param header_lines: number of lines before the first record
+    :param footer_lines: number of lines after the last record
+    :param encoding: file encoding
+    :param kwargs: time_column, time_format, decimal, see parse_records
+    :return: see parse_records
+    """
+    with open(file_path, encoding=encoding) as f:
+        lines = f.read().splitlines()
+
+    lines = lines[header_lines:len(lines) - footer_lines]
+    return parse_records(lines, delimiter, columns, **kwargs)
@@ -0,0 +1,114 @@
+import numpy as np
+
+from .Logger import Logger
+
+ISO8601 = 'iso8601'
+NUMERIC = 'numeric'
+
+EPOCH = np.datetime64('1970-01-01T00:00:00', 'us')
+NUMERIC_UNITS = 'seconds since 1970-01-01 00:00:00'
+
+
+def time_format(configs):
+    """
+    Reads how the time coordinate is stored, from 'parameters: output: time_format:' in the .yaml files.
+    'iso8601' (default): ISO 8601 strings, yyyy-mm-ddThh:mm:ssZ.
+    'numeric': float64 seconds since 1970-01-01 UTC, with CF units and calendar.
+    :param configs: Config, or None
+    :return: 'iso8601' | 'numeric'
+    """
+    if configs is None or not configs.exists('parameters', 'output', 'time_format'):
+        return ISO8601
+
+    value = str(configs.get('parameters', 'output', 'time_format')).lower()
+    if value not in (ISO8601, NUMERIC):
+        Logger.error('bad_time_format', value)
+
+    return value
+
+
+def create_time_variable(output_dataset, configs, dimensions=('time',), name='time',
+                         long_name='Time UTC in ISO 8601 format yyyy-mm-ddThh:mm:ssZ'):
+    """
+    Creates the time coordinate variable in the configured time format.
+    :param output_dataset: dataset or group
+    :param configs: Config, or None for the default format
+    :param dimensions: variable dimensions
+    :param name: variable name
+    :param long_name: long_name of the ISO 8601 variable
+    :return: the variable
+    """
+    if time_format(configs) == NUMERIC:
+        time = output_dataset.createVariable(name, 'f8', dimensions)
+        time.units = NUMERIC_UNITS
+        time.calendar = 'standard'
+        time.standard_name = 'time'
+        time.long_name = 'Time UTC'
+    else:
+        time = output_dataset.createVariable(name, str, dimensions)
+        time.units = 's'
+        time.long_name = long_name
+
+    return time
+
+
+def to_datetime64(timestamps):
+    """
+    :param timestamps: datetime objects, pandas Timestamps or datetime64 values
+    :return: datetime64[us] array
+    """
+    return np.asarray(timestamps, dtype='datetime64[us]')
+
+
+def from_seconds(seconds, epoch='1904-01-01'):
+    """
+    Converts seconds since an epoch, e.g. LabVIEW timestamps, at once.
+    :param seconds: seconds since epoch, numbers or strings
+    :param epoch: epoch as an ISO 8601 string
+    :return: datetime64[us] array
+    """
+    seconds = np.asarray(seconds, dtype=float)
+    return np.datetime64(epoch, 'us') + np.round(seconds * 1e6).astype('timedelta64[us]')
+
+
+def to_iso8601(timestamps):
+    """
+    Formats timestamps as datetime.isoformat() + 'Z' does, at once: without fractional
+    seconds when they are whole seconds, with microseconds otherwise. NaT becomes an empty string.
+    :param timestamps: see to_datetime64
+    :return: array of strings
+    """
+    timestamps = to_datetime64(timestamps)
+    strings = np.datetime_as_string(timestamps, unit='us')
+
+    whole_seconds = timestamps.astype('datetime64[s]') == timestamps
+    if whole_seconds.all():
+        strings = np.datetime_as_string(timestamps, unit='s')
+    elif whole_seconds.any():
+        strings[whole_seconds] = np.datetime_as_string(timestamps[whole_seconds], unit='s')
+
+    strings = np.char.add(strings, 'Z')
+    strings[np.isnat(timestamps)] = ''
+    return strings
+
+
+def to_seconds(timestamps):
+    """
+    :param timestamps: see to_datetime64
+    :return: float64 array of seconds since 1970-01-01
+    """
+    return (to_datetime64(timestamps) - EPOCH) / np.timedelta64(1, 's')
+
+
+def encode_time(time, timestamps):
+    """
+    Encodes timestamps for a time variable created by create_time_variable, in its format.
+    The format is taken from the variable itself, so that appending to an existing file
+    keeps it consistent.
+    :param time: time variable
+    :param timestamps: see to_datetime64
+    :return: array to assign to the variable
+    """
+    if time.dtype == str:
+        return to_iso8601(timestamps)
+    return to_seconds(timestamps)
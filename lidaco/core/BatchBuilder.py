@@ -0,0 +1,146 @@
+from os import path
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+import os
+import time
+import traceback
+
+from ..common.Logger import Logger
+from .Builder import Builder
+
+
+class BatchBuilder:
+    """
+    Converts many stations (one main config.yaml file each) in one process.
+    The imported configuration files are parsed once (see Config.parsed_files) and
+    the reader/writer classes loaded once, shared by all the stations.
+
+    """
+
+    def __init__(self, config_files, context='', jobs=None, **args):
+        """
+        Loads a Builder for every configuration file.
+        :param config_files: configuration file paths or glob patterns
+        :param context: path to which relative paths are resolved
+        :param jobs: number of stations converted concurrently (0: one per cpu core)
+        :param args: remaining Builder arguments, applied to every station
+        :return: void
+        """
+        if jobs is None:
+            self.jobs = 1
+        elif jobs == 0:
+            self.jobs = os.cpu_count() or 1
+        else:
+            self.jobs = max(1, jobs)
+
+        self.stations = []
+
+        for config_file in self.expand(config_files, context):
+            Logger.log('loading_station', config_file)
+            builder = Builder(config_file=config_file, context=context, **args)
+            self.stations.append((config_file, builder))
+
+        if len(self.stations) == 0:
+            Logger.error('stations_not_found')
+
+    @staticmethod
+    def expand(config_files, context=''):
+        """
+        Expands the glob patterns in a list of configuration files.
+        :param config_files: configuration file paths or glob patterns
+        :param context: path to which relative paths are resolved
+        :return: sorted configuration file paths, relative to context
+        """
+        expanded = []
+        for pattern in config_files:
+            matches = sorted(glob(path.join(context, pattern)))
+
+            if len(matches) == 0:
+                Logger.warn('bad_config_path', pattern)
+
+            for match in matches:
+                config_file = path.relpath(match, context) if context else match
+                if config_file not in expanded:
+                    expanded.append(config_file)
+
+        return expanded
+
+    def build(self):
+        """
+        Converts all the stations, up to 'jobs' of them at the same time, and prints a summary table.
+        :return: [(config file, summary or None, wall time, error or None)], see Builder.build
+        """
+        jobs = min(self.jobs, len(self.stations))
+        results = []
+
+        if jobs > 1:
+            Logger.info('parallel_batch', len(self.stations), jobs)
+
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(build_station, builder, Logger.get_args())
+                           for _, builder in self.stations]
+
+                for (config_file, _), future in zip(self.stations, futures):
+                    summary, wall_time, records, error = future.result()
+                    Logger.replay(records)
+                    results.append((config_file, summary, wall_time, error))
+        else:
+            for config_file, builder in self.stations:
+                start = time.perf_counter()
+                try:
+                    summary, error = builder.build(), None
+                except (Exception, SystemExit) as e:
+                    Logger.debug(None, traceback.format_exc())
+                    summary, error = None, str(e) or type(e).__name__
+                results.append((config_file, summary, time.perf_counter() - start, error))
+
+        self.print_summary(results)
+        return results
+
+    @staticmethod
+    def print_summary(results):
+        """
+        Prints one line per station with its file groups, output blocks, time records and wall time.
+        :param results: see build
+        :return: void
+        """
+        Logger.log('separator')
+        Logger.log('batch_header', 'Station', 'Files', 'Blocks', 'Rows', 'Wall (s)')
+
+        for config_file, summary, wall_time, error in results:
+            if error is None:
+                Logger.log('batch_row', config_file, summary['files'], summary['blocks'],
+                           summary['rows'], wall_time)
+            else:
+                Logger.log('batch_failed_row', config_file, wall_time, error)
+
+        Logger.log('separator')
+
+
+def build_station(builder, logger_args):
+    """
+    Worker process entry point. Converts one station and collects the messages
+    printed meanwhile, so that they can be printed by the parent process.
+    :param builder: the station Builder
+    :param logger_args: the parent process Logger arguments
+    :return: (summary or None, wall time, captured messages, error message or None)
+    """
+    Logger.set_args(logger_args)
+    Logger.capture()
+    start = time.perf_counter()
+    summary = None
+    error = None
+
+    try:
+        builder.configs.merge({'parameters': {'workers': 1}})
+        summary = builder.build()
+    except (Exception, SystemExit) as e:
+        Logger.debug(None, traceback.format_exc())
+        error = str(e) or type(e).__name__
+
+    return summary, time.perf_counter() - start, Logger.release(), error
+
+
+def build(**args):
+    batch = BatchBuilder(**args)
+    return batch.build()
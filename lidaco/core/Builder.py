@@ -1,7 +1,10 @@
 from os import path
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import os
 import pathlib
-import pandas as pd
-from datetime import datetime
+import time
+import traceback
 
 from lidaco.core.Writer import Writer
 
@@ -11,6 +14,11 @@ from ..common.Utils import is_str
 from ..common.Logger import Logger
 from .ModuleLoader import ModuleLoader
 from .Config import Config
+from .Discovery import Discovery
+from .Manifest import Manifest
+from .Prefetcher import Prefetcher
+from .Profiler import Profiler
+from .TimestampCache import TimestampCache
 
 
 class Builder:
@@ -19,11 +27,12 @@ class Builder:
 
     """
 
-    module_loader = ModuleLoader()
+    module_loader = None
     logger = None
     input_dir_path = None
     configs = {}
     args = {}
+    profiler = None
 
     def __init__(self,
                  config_file=None,
@@ -32,14 +41,41 @@ class Builder:
                  output_format=None,
                  input_format=None,
                  context='',
+                 jobs=None,
+                 incremental=None,
+                 timestamp_cache=None,
+                 listing_cache=None,
+                 start=None,
+                 end=None,
+                 batch_size=None,
+                 prefetch=None,
+                 profile=None,
+                 profile_output=None,
+                 config_cache=None,
                  ):
         """
         Initialization block. Loads a main config.yaml file, a reader, a writer and the remaining
         "meta-data" configurations. Overrides main configurations with the terminal arguments.
         :param context: this executable path
         :param args: terminal arguments
+        :param jobs: number of worker processes, overrides 'parameters: workers:'
+        :param incremental: only convert new / changed input files, overrides 'parameters: incremental:'
+        :param timestamp_cache: keep the input files timestamps in a cache file, overrides 'parameters: timestamp_cache:'
+        :param listing_cache: keep the input directories listings in a cache file, overrides 'parameters: listing_cache:'
+        :param start: first time converted, overrides 'parameters: input: start:'
+        :param end: end of the time converted (excluded), overrides 'parameters: input: end:'
+        :param batch_size: read the input files in batches of this many records (or e.g. '64MB'),
+        overrides 'parameters: input: batch_size:'
+        :param prefetch: number of threads parsing the next input files while the current one is written,
+        overrides 'parameters: input: prefetch:'
+        :param profile: True to time the stages of the conversion, or the .json / .csv file to export
+        the profile to, overrides 'parameters: profile:'
+        :param profile_output: the .json / .csv file to export the profile to, overrides profile
+        :param config_cache: True to keep the merged configurations in a compiled file next to the config file,
+        or the directory to keep it in, see Config.compiled
         :return: void
         """
+        self.module_loader = ModuleLoader()
 
         absolute_path = path.join(context, config_file)
         import_dir_path = path.dirname(absolute_path)
@@ -64,10 +100,44 @@ class Builder:
         if input_format is not None:
             root_configs['parameters']['input']['format'] = input_format
 
+        if start is not None:
+            root_configs['parameters']['input']['start'] = start
+
+        if end is not None:
+            root_configs['parameters']['input']['end'] = end
+
+        if batch_size is not None:
+            root_configs['parameters']['input']['batch_size'] = batch_size
+
+        if prefetch is not None:
+            root_configs['parameters']['input']['prefetch'] = prefetch
+
+        if profile is not None:
+            root_configs['parameters']['profile'] = profile
+
+        if profile_output is not None:
+            root_configs['parameters']['profile'] = profile_output
+
         if output_format is not None:
             root_configs['parameters']['output']['format'] = output_format
 
-        self.configs = Config(import_dir_path, configs=root_configs)
+        if jobs is not None:
+            root_configs['parameters']['workers'] = jobs
+
+        if incremental is not None:
+            root_configs['parameters']['incremental'] = incremental
+
+        if timestamp_cache is not None:
+            root_configs['parameters']['timestamp_cache'] = timestamp_cache
+
+        if listing_cache is not None:
+            root_configs['parameters']['listing_cache'] = listing_cache
+
+        if config_cache:
+            cache_path = Config.compiled_path(absolute_path, None if config_cache is True else config_cache)
+            self.configs = Config.compiled(import_dir_path, root_configs, cache_path)
+        else:
+            self.configs = Config(import_dir_path, configs=root_configs)
 
         try:
             self.input_dir_path = path.join(context, self.params('input', 'path'))
@@ -135,73 +205,473 @@ class Builder:
                             setattr(temp_var, key, value)
 
 
-    def build(self):
+    def workers(self):
         """
-        Main loop - connects the reader with the writer.
-        Iterates over input data files / file groups:
-        - Reading meta attributes from "meta-data" configurations
-        :return:
+        Number of worker processes used to convert the output blocks.
+        Set it under 'parameters: workers:' in the .yaml files or with --jobs.
+        0 uses one worker per cpu core.
+        :return: int
         """
-        writer = None
-        out_complete = ''
+        workers = self.params('workers') if self.configs.exists('parameters', 'workers') else 1
+
+        if workers is None:
+            return 1
+
+        if int(workers) == 0:
+            return os.cpu_count() or 1
+
+        return max(1, int(workers))
+
+    def incremental(self):
+        """
+        Checks if the incremental mode is set, under 'parameters: incremental:' in the .yaml files
+        or with --incremental. In this mode a manifest of the converted input files is kept next to
+        the output files, and only the output blocks whose input files changed are converted.
+        :return: boolean
+        """
+        return bool(self.params('incremental')) if self.configs.exists('parameters', 'incremental') else False
+
+    def timestamp_cache(self):
+        """
+        Opens the cache of the input files first / last timestamps, if it is enabled under
+        'parameters: timestamp_cache:' in the .yaml files or with --timestamp-cache.
+        The cache file is kept in the output directory.
+        :return: TimestampCache or None
+        """
+        enabled = self.configs.exists('parameters', 'timestamp_cache') and bool(self.params('timestamp_cache'))
+        if not enabled:
+            return None
 
-        reader = self.module_loader.get_reader()()
-        reader.set_configs(self.configs)
-        reader.verify_parameters()
-        input_path = self.configs.get_resolved('parameters', 'input', 'path')
         output_path = self.configs.get_resolved('parameters', 'output', 'path')
         pathlib.Path(output_path).mkdir(parents=True, exist_ok=True)
-        
-        files = reader.fetch_input_files(input_path)
-        
-        first_of_batch_timestamp = pd.Timestamp('01-01-1904')
-        
+        return TimestampCache(output_path)
+
+    def discovery(self):
+        """
+        The Discovery listing the input directory tree. Directories matching the glob patterns
+        under 'parameters: input: prune:' are skipped, 'parameters: input: discovery_threads:'
+        directories are listed at once (default: 8). With 'parameters: listing_cache:' in the
+        .yaml files or --listing-cache, the listings are kept in the output directory, and only
+        the directories that changed since the last run are listed again.
+        :return: Discovery
+        """
+        prune = self.params('input', 'prune') if self.configs.exists('parameters', 'input', 'prune') else None
+        threads = self.params('input', 'discovery_threads') \
+            if self.configs.exists('parameters', 'input', 'discovery_threads') else 8
+        cache_dir = None
+
+        if self.configs.exists('parameters', 'listing_cache') and bool(self.params('listing_cache')):
+            cache_dir = self.configs.get_resolved('parameters', 'output', 'path')
+            pathlib.Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
+        return Discovery(prune, threads or 8, cache_dir)
+
+    def batch_size(self):
+        """
+        The 'parameters: input: batch_size:' parameter, or --batch-size: records per batch (e.g. 100000),
+        or a size in memory per batch (e.g. '64MB'). When set, the readers able to stream read their input
+        files batch by batch, appending each batch to the output file, see Reader.stream_to.
+        :return: int, str or None to read the input files at once
+        """
+        return self.params('input', 'batch_size') if self.configs.exists('parameters', 'input', 'batch_size') else None
+
+    def prefetcher(self, reader):
+        """
+        The Prefetcher parsing the next input files / file groups while the current one is written,
+        with 'parameters: input: prefetch:' (or --prefetch) threads. Only the readers returning a
+        DataBatch (see Reader.columnar) can parse apart from writing.
+        :param reader: the reader instance
+        :return: Prefetcher, or None to read and write each file / file group in turn
+        """
+        threads = self.params('input', 'prefetch') if self.configs.exists('parameters', 'input', 'prefetch') else None
+        if not threads:
+            return None
+
+        if not reader.columnar:
+            Logger.warn('prefetch_unsupported', type(reader).__name__)
+            return None
+
+        return Prefetcher(int(threads))
+
+    def profile_setting(self):
+        """
+        The 'parameters: profile:' parameter, or --profile: True to time the stages of the conversion
+        and print the totals and the 'parameters: profile_top:' (default: 10) slowest input files,
+        or the path of a .json / .csv file to export the profile to as well (--profile-output). See Profiler.
+        :return: False, True or a file path
+        """
+        return self.params('profile') if self.configs.exists('parameters', 'profile') else False
+
+    def profile(self, stage, item=None, bytes_read=0):
+        """
+        Measures a stage of the conversion when profiling, see Profiler.stage.
+        :return: context manager, giving the stage record
+        """
+        if self.profiler is None:
+            return nullcontext({})
+        return self.profiler.stage(stage, item, bytes_read)
+
+    def input_size(self, complete_path):
+        """
+        Size of an input file / file group when profiling, 0 otherwise.
+        :param complete_path: see group_path
+        :return: bytes
+        """
+        if self.profiler is None:
+            return 0
+
+        files = [complete_path] if isinstance(complete_path, str) else complete_path
+        return sum(os.path.getsize(f) for f in files if path.isfile(f))
+
+    def report_profile(self):
+        """
+        Prints the profile of the run and exports it if a file is set, see profile_setting.
+        :return: void
+        """
+        top = self.params('profile_top') if self.configs.exists('parameters', 'profile_top') else 10
+        self.profiler.print_summary(int(top))
+
+        setting = self.profile_setting()
+        if is_str(setting):
+            self.profiler.export(setting)
+
+    def parse_group(self, reader, group, input_path):
+        """
+        Parses a file / file group with a columnar reader.
+        :param reader: the reader instance
+        :param group: {'id': group id, 'files': file(s)}
+        :param input_path: input data directory
+        :return: DataBatch
+        """
+        complete_path = self.group_path(reader, group, input_path)
+        with self.profile('parse', group['id'], self.input_size(complete_path)):
+            return reader.read_batch(complete_path, self.configs)
+
+    def block_size(self):
+        """
+        The output_block_size parameter: files / file groups per output file (int), a time span
+        per output file (e.g. '1D'), or None for a single output file. Defaults to 1.
+        :return: int, str or None
+        """
+        return self.params('output_block_size') if self.configs.exists('parameters', 'output_block_size') else 1
+
+    def plan_blocks(self, reader, files, input_path):
+        """
+        Splits the input data files / file groups into output blocks, as defined by
+        the output_block_size parameter. Each block is written to one output file.
+        :param reader: the reader instance
+        :param files: file groups, as returned by reader.fetch_input_files
+        :param input_path: input data directory
+        :return: [{'name': output filename, 'groups': [groups]}]
+        """
+        blocks = []
+        obs = self.block_size()
+
+        if obs is None:
+            obs = len(files)
+
+        timestamps = None
+        if isinstance(obs, str):
+            # pandas is only imported for time based output blocks
+            import pandas as pd
+            first_of_batch_timestamp = pd.Timestamp('01-01-1904')
+            timestamps = self.timestamp_cache()
+
         for i, group in enumerate(files):
 
-            obs = self.configs.get('parameters', 'output_block_size') if self.configs.exists('parameters', 'output_block_size') else 1
-            
-            if obs is None:
-                obs = len(files)
-            
-            
             if isinstance(obs, int):
                 first_of_batch = (i % obs == 0)
-                
+
             elif isinstance(obs, str):
                 timedelta = pd.Timedelta(obs)
-                first_timestamp_of_file = reader.get_timestamp(path.join(input_path, group['id']))
+                file_path = path.join(input_path, group['id'])
+                with self.profile('timestamps', group['id']):
+                    if timestamps is not None:
+                        first_timestamp_of_file = timestamps.first(reader, file_path)
+                    else:
+                        first_timestamp_of_file = reader.get_timestamp(file_path)
                 first_timestamp_of_file_floored = pd.Timestamp(first_timestamp_of_file).floor(obs)
-                
+
                 first_of_batch = ((first_of_batch_timestamp + timedelta) < first_timestamp_of_file)
 
                 if first_of_batch:
                     first_of_batch_timestamp = first_timestamp_of_file_floored
 
-
             if first_of_batch:
-                output_name = reader.output_filename(group['id'])
-                writer = self.module_loader.get_writer()(output_path, output_name)
-                out_complete = writer.file_path()
+                blocks.append({'name': reader.output_filename(group['id']), 'groups': []})
 
-            Logger.log('started_r_files', group['files'])
+            blocks[-1]['groups'].append(group)
 
-            with writer.appending(not first_of_batch) as dataset:
-                Logger.log('writing_file', out_complete, '' if first_of_batch else '(appending)')
-                
+        if timestamps is not None:
+            timestamps.save()
+
+        return blocks
+
+    @staticmethod
+    def group_path(reader, group, input_path):
+        """
+        Complete path of a file / file group, as expected by reader.read_to.
+        :param reader: the reader instance
+        :param group: {'id': group id, 'files': file(s)}, see reader.fetch_input_files
+        :param input_path: input data directory
+        :return: a file path, or a tuple of file paths when the reader groups files.
+        """
+        if reader.data_grouping:
+            return tuple([path.join(input_path, f) for f in group['files']])
+        else:
+            return path.join(input_path, group['files'])
+
+    def pending_blocks(self, reader, blocks, manifest, input_path, output_path):
+        """
+        Incremental mode: drops the output blocks that are up to date and trims the blocks that only
+        got new input files at their end, so that those are appended to the existing output file.
+        :param reader: the reader instance
+        :param blocks: see plan_blocks
+        :param manifest: the output directory Manifest
+        :param input_path: input data directory
+        :param output_path: output directory
+        :return: the blocks to write, with their 'output' file path and 'inputs' file paths set.
+        A block with 'append' set is appended to its existing output file.
+        """
+        writer_class = self.module_loader.get_writer()
+        pending = []
+
+        for block in blocks:
+            output = writer_class(output_path, block['name']).file_path()
+            group_inputs = [list(self.group_path(reader, group, input_path)) if reader.data_grouping
+                            else [self.group_path(reader, group, input_path)] for group in block['groups']]
+            inputs = [f for files in group_inputs for f in files]
+
+            converted = manifest.plan(output, inputs, writer_class.resumable)
+
+            # the converted inputs must end at a group boundary
+            converted_groups = 0
+            while converted > 0 and converted_groups < len(group_inputs):
+                converted -= len(group_inputs[converted_groups])
+                converted_groups += 1
+
+            if converted != 0:
+                converted_groups = 0
+
+            block = dict(block, output=output, inputs=inputs)
+
+            if converted_groups == len(block['groups']):
+                Logger.info('block_up_to_date', output)
+            elif converted_groups > 0:
+                Logger.info('block_extended', output, len(block['groups']) - converted_groups)
+                pending.append(dict(block, groups=block['groups'][converted_groups:], append=True))
+            else:
+                pending.append(block)
+
+        return pending
+
+    def build_block(self, reader, block, input_path, output_path, parsed=None):
+        """
+        Writes one output block. The output dataset is opened once for the whole block and the
+        "meta-data" configurations are written once; the first file / file group creates the
+        output variables, the following ones are appended to them.
+        :param reader: the reader instance
+        :param block: {'name': output filename, 'groups': [groups]}, see plan_blocks. If 'append' is set,
+        the first file / file group is appended to an existing output file too.
+        :param input_path: input data directory
+        :param output_path: output directory
+        :param parsed: iterator of the DataBatches of the block's files / file groups, parsed ahead
+        by a Prefetcher. None to read them here.
+        :return: (output file path, number of time records written)
+        """
+        writer = self.module_loader.get_writer()(output_path, block['name'])
+        writer.set_configs(self.configs)
+        out_complete = writer.file_path()
+        append = block.get('append', False)
+        batch_size = self.batch_size()
+
+        with writer.appending(append) as dataset:
+            Logger.log('writing_file', out_complete, '(appending)' if append else '')
+            # the records already in an output file appended to are not counted
+            rows_start = self.count_rows(dataset)
+
+            with self.profile('metadata', out_complete):
                 self.read_attributes(dataset)
                 self.read_variables(dataset)
-                
-                if reader.data_grouping:
-                    complete_path = tuple([path.join(input_path, f) for f in group['files']])
+
+            for i, group in enumerate(block['groups']):
+                Logger.log('started_r_files', group['files'])
+
+                complete_path = self.group_path(reader, group, input_path)
+                rows_before = self.count_rows(dataset)
+
+                if reader.columnar:
+                    batch = next(parsed) if parsed is not None else self.parse_group(reader, group, input_path)
+                    with self.profile('write', group['id']) as record:
+                        writer.materialize(dataset, batch, append or i > 0)
                 else:
-                    complete_path = path.join(input_path, group['files'])
+                    with self.profile('read_to', group['id'], self.input_size(complete_path)) as record:
+                        if batch_size is not None:
+                            reader.stream_to(dataset, complete_path, self.configs, append or i > 0, batch_size)
+                        else:
+                            reader.read_to(dataset, complete_path, self.configs, append or i > 0)
+
+                record['rows'] = self.count_rows(dataset) - rows_before
+
+            rows = self.count_rows(dataset) - rows_start
+            closing = self.profiler.begin('close', out_complete) if self.profiler is not None else None
+
+        if closing is not None:
+            closing['bytes_written'] = os.path.getsize(out_complete) if path.isfile(out_complete) else 0
+            self.profiler.end(closing)
+
+        return out_complete, rows
+
+    @staticmethod
+    def count_rows(dataset):
+        """
+        Number of time records in a dataset.
+        :param dataset: a core data model / netcdf4 dataset object.
+        :return: int
+        """
+        return len(dataset.dimensions['time']) if 'time' in dataset.dimensions else 0
+
+    def build_parallel(self, blocks, workers, input_path, output_path, manifest=None, related_files=None):
+        """
+        Fans the output blocks out to a pool of worker processes. Each block is opened,
+        filled and closed by exactly one worker. The workers' messages are printed by
+        this process, block by block, in the same order as a serial build.
+        :param blocks: see plan_blocks
+        :param workers: number of worker processes
+        :param input_path: input data directory
+        :param output_path: output directory
+        :param manifest: the output directory Manifest, in incremental mode
+        :param related_files: function listing the related files of an input file, recorded in the manifest
+        :return: number of time records written
+        """
+        Logger.info('parallel_build', len(blocks), workers)
+        failed = 0
+        rows = 0
+
+        if manifest is not None:
+            for block in blocks:
+                manifest.start_block(block['output'])
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(build_block, self, block, input_path, output_path, Logger.get_args())
+                       for block in blocks]
+
+            for block, future in zip(blocks, futures):
+                out_complete, block_rows, records, error, profile = future.result()
+                Logger.replay(records)
+                if self.profiler is not None:
+                    self.profiler.merge(profile)
+                rows += block_rows
+
+                if error is not None:
+                    failed += 1
+                    Logger.warn('block_failed', out_complete, error)
+                elif manifest is not None:
+                    manifest.complete_block(block['output'], block['inputs'], related_files)
+
+        if failed > 0:
+            Logger.error('blocks_failed', failed, len(blocks))
+
+        return rows
+
+    def build(self, files=None):
+        """
+        Main loop - connects the reader with the writer.
+        Iterates over input data files / file groups:
+        - Reading meta attributes from "meta-data" configurations
+        :param files: the input files / file groups to convert, as Reader.fetch_input_files returns them,
+        None to convert every input file found (e.g. watch mode leaves the files still being written)
+        :return: summary {'files': file groups, 'blocks': output blocks, 'rows': time records}
+        """
+        reader = self.module_loader.get_reader()()
+        reader.set_configs(self.configs)
+        reader.verify_parameters()
+        input_path = self.configs.get_resolved('parameters', 'input', 'path')
+        output_path = self.configs.get_resolved('parameters', 'output', 'path')
+        pathlib.Path(output_path).mkdir(parents=True, exist_ok=True)
+
+        self.profiler = Profiler() if self.profile_setting() else None
+
+        if files is None:
+            with self.profile('discovery', input_path):
+                files = reader.fetch_input_files(input_path, self.discovery())
+
+        blocks = self.plan_blocks(reader, files, input_path)
+        manifest = None
+
+        if self.incremental():
+            manifest = Manifest(output_path)
+            blocks = self.pending_blocks(reader, blocks, manifest, input_path, output_path)
+
+        workers = min(self.workers(), len(blocks))
+        summary = {'files': len(files), 'blocks': len(blocks), 'rows': 0}
+
+        if workers > 1:
+            summary['rows'] = self.build_parallel(blocks, workers, input_path, output_path, manifest,
+                                                  reader.related_files)
+        else:
+            # the groups of all the blocks are parsed ahead in order, so that a block starts with its
+            # first group parsed already
+            prefetcher = self.prefetcher(reader)
+            parsed = None
+            start = time.perf_counter()
+
+            if prefetcher is not None:
+                groups = [group for block in blocks for group in block['groups']]
+                parsed = prefetcher.map(lambda group: self.parse_group(reader, group, input_path), groups)
 
+            for block in blocks:
+                if manifest is not None:
+                    manifest.start_block(block['output'])
 
-                reader.read_to(dataset, complete_path, self.configs, not first_of_batch)
+                summary['rows'] += self.build_block(reader, block, input_path, output_path, parsed)[1]
+
+                if manifest is not None:
+                    manifest.complete_block(block['output'], block['inputs'], reader.related_files)
+
+            if prefetcher is not None:
+                overlap = prefetcher.overlap(time.perf_counter() - start)
+                Logger.info('prefetch_overlap', prefetcher.items, prefetcher.threads, overlap['parse'],
+                            overlap['write'], overlap['wait'], overlap['efficiency'] * 100)
+                summary['overlap'] = overlap
+
+        if self.profiler is not None:
+            self.report_profile()
+            summary['profile'] = self.profiler.stages()
 
         Logger.info('done')
+        return summary
+
+
+def build_block(builder, block, input_path, output_path, logger_args):
+    """
+    Worker process entry point. Writes one output block and collects the messages
+    printed meanwhile, so that they can be printed by the parent process.
+    :param builder: the parent process Builder
+    :param block: see Builder.plan_blocks
+    :param input_path: input data directory
+    :param output_path: output directory
+    :param logger_args: the parent process Logger arguments
+    :return: (output file path, time records written, captured messages, error message or None,
+    profile records)
+    """
+    Logger.set_args(logger_args)
+    Logger.capture()
+    out_complete = block['name']
+    rows = 0
+    error = None
+
+    try:
+        reader = builder.module_loader.get_reader()()
+        reader.set_configs(builder.configs)
+        out_complete, rows = builder.build_block(reader, block, input_path, output_path)
+    except (Exception, SystemExit) as e:
+        Logger.debug(None, traceback.format_exc())
+        error = str(e)
+
+    return out_complete, rows, Logger.release(), error, builder.profiler.records if builder.profiler is not None else []
 
 
 def build(**args):
     builder = Builder(**args)
-    builder.build()
\ No newline at end of file
+    return builder.build()
@@ -0,0 +1,36 @@
+from abc import abstractmethod
+from lidaco.core.Reader import Reader
+
+
+class ColumnarReader(Reader):
+    """
+    Reader returning what it parsed as a DataBatch, which the writer materializes, instead of writing
+    the output dataset itself. Parsing apart from writing lets the Builder parse the next input files
+    while the current one is written (see Builder.prefetcher).
+    """
+
+    columnar = True
+
+    @abstractmethod
+    def read_batch(self, input, configurations):
+        """
+        Parses an input file/group, without writing it.
+        With prefetching, it is called for the next inputs on other threads while the current one
+        is written: it must not keep what it parsed in the reader.
+        :param input: file path. When group_by is used, a tuple containing the group file paths.
+        :param configurations: configurations read from .yaml files
+        :return: DataBatch
+        """
+        pass
+
+    def read_to(self, output_dataset, input, configurations, index):
+        """
+        Reads an input file/group to the correspondent output dataset: writes the DataBatch returned by read_batch.
+        :param output_dataset: cdm/netcdf4 dataset.
+        :param input: is file path.
+        When group_by is used, a tuple containing the group file paths.
+        :param configurations: configurations read from .yaml files
+        :param index: True to append to the output variables created before
+        :return: void
+        """
+        self.read_batch(input, configurations).write_to(output_dataset, self.configs, index)
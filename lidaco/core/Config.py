@@ -1,7 +1,40 @@
 from ..common.Utils import dict_merge, map_recursively
 from ..common.Logger import Logger
+from copy import deepcopy
+from datetime import date, datetime
 import yaml
 from os import path
+import hashlib
+import json
+import os
+
+# Loader of the .yaml files: the C one (libyaml) when PyYAML was built with it
+Loader = getattr(yaml, 'CFullLoader', yaml.FullLoader)
+
+# version of the compiled configuration files, see Config.compiled
+COMPILED_VERSION = 2
+
+
+def encode_compiled(value):
+    """
+    json.dump default: the dates and times the .yaml files hold, e.g. 'date_created: 2016-11-24'.
+    """
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    raise TypeError('{} values can not be compiled'.format(type(value).__name__))
+
+
+def decode_compiled(dct):
+    """
+    json.load object_hook, see encode_compiled.
+    """
+    if '__datetime__' in dct:
+        return datetime.fromisoformat(dct['__datetime__'])
+    if '__date__' in dct:
+        return date.fromisoformat(dct['__date__'])
+    return dct
 
 
 class Config:
@@ -11,6 +44,14 @@ class Config:
 
     """
 
+    # .yaml files parsed in this process, shared by the Config instances (e.g. many stations importing
+    # the same instrument files): (normalized path, mtime, size) => parsed content. A file is parsed
+    # again when it changed.
+    parsed_files = {}
+
+    # name of the compiled configuration file of a .yaml file, see compiled_path
+    compiled_filename = '.{}.lidaco-config.json'
+
     def __init__(self, context, file_name=None, configs={}):
         """
         Loads a configuration file and the declared imports in it recursively.
@@ -20,6 +61,8 @@ class Config:
         self.configs = {}
         self.config_paths = {}
         self.context = context
+        # normalized path => (mtime, size) of the .yaml files read, imports included
+        self.files = {}
 
         tmp_configs = {}
 
@@ -43,25 +86,146 @@ class Config:
         """
         for relative_path in imports:
             absolute_path = path.join(dir_path, relative_path)
-            import_dir_path = path.dirname(absolute_path)
-            import_filename = path.basename(absolute_path)
-
-            config = Config(import_dir_path, import_filename)
+            config = Config.load_import(absolute_path)
             dict_merge(self.configs, config.get())
             dict_merge(self.config_paths, config.get_path())
+            self.files.update(config.files)
+
+    @staticmethod
+    def load_import(absolute_path):
+        """
+        Loads an imported configuration file (and its own imports).
+        :param absolute_path: configuration file path
+        :return: Config
+        """
+        import_dir_path = path.dirname(absolute_path)
+        import_filename = path.basename(absolute_path)
+        return Config(import_dir_path, import_filename)
 
     def load_from_file(self, file_name):
         full_path = ""
         try:
             full_path = path.join(self.context, file_name)
             Logger.info('loading_config', full_path.replace("/./", "/"))
-            with open(full_path, 'r') as stream:
-                return yaml.load(stream, Loader=yaml.FullLoader)
+            key, signature, content = Config.parse(full_path)
+            self.files[key] = signature
+            return content
         except FileNotFoundError as e:
             Logger.error('bad_config_path', full_path.replace("/./", "/"))
         except Exception as e:
             Logger.error('bad_config_formatting', str(e))
 
+    @staticmethod
+    def parse(file_path):
+        """
+        Parses a .yaml file, or reuses its content parsed earlier in this process if the file did not change.
+        :param file_path: configuration file path
+        :return: (normalized path, (mtime, size), parsed content). The content is a copy, free to be modified.
+        """
+        file_path = path.normpath(path.abspath(file_path))
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = (file_path,) + signature
+
+        if key not in Config.parsed_files:
+            with open(file_path, 'r') as stream:
+                content = yaml.load(stream, Loader=Loader)
+
+            # the content of the file before it changed
+            for old_key in [k for k in Config.parsed_files if k[0] == file_path]:
+                del Config.parsed_files[old_key]
+            Config.parsed_files[key] = content
+
+        # the configurations are merged into (and modify) the parsed content
+        return file_path, signature, deepcopy(Config.parsed_files[key])
+
+    @staticmethod
+    def compiled_path(config_file, dir_path=None):
+        """
+        Path of the compiled configuration file of a .yaml file, see compiled.
+        :param config_file: configuration file path
+        :param dir_path: directory of the compiled file, None for the configuration file directory
+        :return: path
+        """
+        config_file = path.abspath(config_file)
+        name = path.basename(config_file)
+
+        if dir_path is None:
+            dir_path = path.dirname(config_file)
+        else:
+            # e.g. the config.yaml files of several stations in one directory
+            name += '.' + hashlib.md5(config_file.encode()).hexdigest()[:8]
+
+        return path.join(dir_path, Config.compiled_filename.format(name))
+
+    @staticmethod
+    def compiled(context, configs, cache_path):
+        """
+        Loads the configurations as Config(context, configs=configs) does, from a compiled configuration file:
+        the merged configurations saved as JSON by a previous run. It is used if it has the same version, was
+        compiled from the same configs and none of the .yaml files read changed (mtime and size), and compiled
+        again otherwise. Configurations holding values JSON can not represent as they are (e.g. integer keys)
+        are not compiled.
+        :param context: file location path
+        :param configs: root configurations, e.g. {'imports': ['config.yaml'], 'parameters': {...}}
+        :param cache_path: compiled configuration file path
+        :return: Config
+        """
+        arguments = deepcopy(configs)
+
+        try:
+            with open(cache_path) as f:
+                compiled = json.load(f, object_hook=decode_compiled)
+
+            if compiled['version'] == COMPILED_VERSION and compiled['context'] == context \
+                    and compiled['arguments'] == arguments and Config.unchanged(compiled['files']):
+                Logger.info('loading_compiled_config', cache_path)
+                config = Config.__new__(Config)
+                config.context = context
+                config.configs = compiled['configs']
+                config.config_paths = compiled['config_paths']
+                config.files = compiled['files']
+                return config
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            Logger.warn('bad_compiled_config', cache_path, str(e))
+
+        config = Config(context, configs=configs)
+
+        try:
+            compiled = {'version': COMPILED_VERSION, 'context': context, 'arguments': arguments,
+                        'files': config.files, 'configs': config.configs, 'config_paths': config.config_paths}
+            text = json.dumps(compiled, default=encode_compiled)
+
+            # e.g. integer keys would come back as strings, or tuples as lists
+            if json.loads(text, object_hook=decode_compiled)['configs'] != config.configs:
+                raise ValueError('the configurations can not be compiled to JSON as they are')
+
+            tmp_path = cache_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                f.write(text)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            Logger.warn('compiled_config_not_saved', cache_path, str(e))
+
+        return config
+
+    @staticmethod
+    def unchanged(files):
+        """
+        :param files: normalized path => (mtime, size) of .yaml files
+        :return: True if none of the files changed
+        """
+        for file_path, signature in files.items():
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return False
+            if (stat.st_mtime_ns, stat.st_size) != tuple(signature):
+                return False
+        return True
+
     def merge(self, config):
         """
         Updates the current configuration data with "config"
@@ -0,0 +1,159 @@
+import numpy as np
+
+from ..common.Time import create_time_variable, encode_time
+
+# datatype of the time variables, whose data are datetime64 values: the output datatype
+# follows 'parameters: output: time_format:', see common.Time
+TIME = 'time'
+
+
+class BatchVariable:
+    """
+    A variable of a DataBatch: its datatype, dimension names, attributes and data.
+    """
+
+    def __init__(self, name, datatype, dimensions=(), data=None, attributes=None, options=None):
+        """
+        :param name: variable name
+        :param datatype: numpy datatype (e.g. 'f4'), str, or TIME
+        :param dimensions: dimension names
+        :param data: numpy array (datetime64 values for TIME), None if the variable has no data
+        :param attributes: {name: value}, in the order they are written
+        :param options: keyword arguments of createVariable, e.g. {'fill_value': -999}
+        """
+        self.name = name
+        self.datatype = datatype
+        self.dimensions = (dimensions,) if isinstance(dimensions, str) else tuple(dimensions)
+        self.data = None if data is None else np.asarray(data)
+        self.attributes = dict(attributes or {})
+        self.options = dict(options or {})
+
+    def is_time(self):
+        return isinstance(self.datatype, str) and self.datatype == TIME
+
+
+class DataBatch:
+    """
+    What a reader parsed from an input file / file group, independent of the output: dimensions,
+    variables holding their data as numpy arrays, attributes and sub-groups. A Writer materializes it
+    in its dataset (see Writer.materialize), so that parsing is decoupled from writing.
+
+    Readers setting 'columnar' return a DataBatch from read_batch instead of writing the output
+    dataset in read_to.
+    """
+
+    def __init__(self):
+        self.dimensions = {}  # name => length, None for an unlimited dimension
+        self.variables = {}  # name => BatchVariable, in creation order
+        self.attributes = {}
+        self.groups = {}  # name => DataBatch
+
+    def add_dimension(self, name, size=None):
+        """
+        :param name: dimension name
+        :param size: dimension length, None for an unlimited dimension (the records are appended along it)
+        :return: void
+        """
+        self.dimensions[name] = size
+
+    def add_variable(self, name, datatype, dimensions=(), data=None, options=None, **attributes):
+        """
+        :param name: variable name
+        :param datatype: numpy datatype (e.g. 'f4'), str, or TIME
+        :param dimensions: dimension names
+        :param data: the variable values, None if it has none
+        :param options: keyword arguments of createVariable
+        :param attributes: variable attributes, e.g. units='m', long_name='range_gate_distance_from_lidar'
+        :return: BatchVariable
+        """
+        variable = BatchVariable(name, datatype, dimensions, data, attributes, options)
+        self.variables[name] = variable
+        return variable
+
+    def add_time(self, timestamps, dimensions=('time',), name='time', **attributes):
+        """
+        Adds a time coordinate variable, encoded in the configured time format when written.
+        :param timestamps: datetime64 values, or anything common.Time.to_datetime64 converts
+        :param dimensions: dimension names
+        :param name: variable name
+        :param attributes: variable attributes; long_name is only used by the ISO 8601 format
+        :return: BatchVariable
+        """
+        return self.add_variable(name, TIME, dimensions, timestamps, **attributes)
+
+    def add_group(self, name):
+        """
+        :param name: group name
+        :return: the sub-group DataBatch
+        """
+        group = DataBatch()
+        self.groups[name] = group
+        return group
+
+    def write_to(self, output_dataset, configs, appending):
+        """
+        Writes the batch to a netCDF4-like dataset. The dimensions, variables and groups missing in the
+        dataset are created; the data along an unlimited dimension are appended after the records
+        already written. When appending, the variables without an unlimited dimension and the
+        attributes are left as the first batch wrote them.
+        :param output_dataset: cdm/netcdf4 dataset or group
+        :param configs: Config, for the time format
+        :param appending: True if a batch was written to the dataset before
+        :return: void
+        """
+        for name, size in self.dimensions.items():
+            if name not in output_dataset.dimensions:
+                output_dataset.createDimension(name, size)
+
+        # the lengths before writing: the variables of a dimension all start at the same record
+        starts = {name: len(output_dataset.dimensions[name])
+                  for name, size in self.dimensions.items() if size is None}
+
+        if not appending:
+            for name, value in self.attributes.items():
+                output_dataset.setncattr(name, value)
+
+        for variable in self.variables.values():
+            unlimited = len(variable.dimensions) > 0 and variable.dimensions[0] in starts
+            exists = variable.name in output_dataset.variables
+            if appending and exists and not unlimited:
+                continue
+
+            target = output_dataset.variables[variable.name] if exists \
+                else self.create_variable(output_dataset, variable, configs)
+
+            if variable.data is None:
+                continue
+
+            data = encode_time(target, variable.data) if variable.is_time() else variable.data
+            if unlimited:
+                target[starts[variable.dimensions[0]]:] = data
+            else:
+                target[:] = data
+
+        for name, group in self.groups.items():
+            output_group = output_dataset.groups[name] if name in output_dataset.groups \
+                else output_dataset.createGroup(name)
+            group.write_to(output_group, configs, appending)
+
+    @staticmethod
+    def create_variable(output_dataset, variable, configs):
+        """
+        :param output_dataset: cdm/netcdf4 dataset or group
+        :param variable: BatchVariable
+        :param configs: Config, for the time format
+        :return: the created output variable
+        """
+        attributes = dict(variable.attributes)
+
+        if variable.is_time():
+            long_name = {'long_name': attributes.pop('long_name')} if 'long_name' in attributes else {}
+            target = create_time_variable(output_dataset, configs, variable.dimensions, variable.name, **long_name)
+        else:
+            target = output_dataset.createVariable(variable.name, variable.datatype, variable.dimensions,
+                                                   **variable.options)
+
+        for name, value in attributes.items():
+            target.setncattr(name, value)
+
+        return target
@@ -0,0 +1,182 @@
+from os import path
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+import json
+import os
+import time
+
+from ..common.Logger import Logger
+
+
+class Discovery:
+    """
+    Lists the input files of a directory tree with os.scandir, the directories of a level
+    being listed by several threads at once. Directories matching one of the prune patterns
+    are skipped with everything below them.
+
+    The listing of every directory is kept with the directory mtime, which changes when an entry
+    is added, removed or renamed in it, so that listing the tree again only lists the directories
+    that changed. The listings are kept in memory, and in a cache file next to the output files
+    if a cache directory is given.
+
+    """
+
+    filename = '.lidaco-listing.json'
+
+    def __init__(self, prune=None, threads=8, cache_dir=None):
+        """
+        :param prune: glob patterns of the directories to skip, matched against the directory
+        name and against its path relative to the input directory, e.g. ['.snapshot', '2016/*/tmp']
+        :param threads: number of directories listed at once
+        :param cache_dir: directory of the listing cache file, None to keep the listings in memory only
+        """
+        self.prune = [prune] if isinstance(prune, str) else list(prune or [])
+        self.threads = max(1, int(threads))
+        self.file_path = path.join(cache_dir, Discovery.filename) if cache_dir is not None else None
+        self.directories = {}  # directory path => {'mtime', 'dirs', 'files'}
+        self.changed = False
+        self.visited = 0  # directories walked through by the last call to files
+        self.listed = 0  # of which listed again
+        self.load()
+
+    def load(self):
+        """
+        Reads the cache file. A missing or unreadable cache is treated as empty.
+        :return: void
+        """
+        if self.file_path is None or not path.isfile(self.file_path):
+            return
+
+        try:
+            with open(self.file_path) as f:
+                self.directories = json.load(f)
+        except Exception as e:
+            Logger.warn('bad_listing_cache', self.file_path, str(e))
+
+    def save(self):
+        """
+        Writes the cache file, if anything changed since it was loaded.
+        :return: void
+        """
+        if self.file_path is None or not self.changed:
+            return
+
+        tmp_path = self.file_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.directories, f)
+        os.replace(tmp_path, self.file_path)
+        self.changed = False
+
+    def pruned(self, relative_path):
+        """
+        :param relative_path: directory path, relative to the input directory
+        :return: True if the directory is skipped
+        """
+        name = path.basename(relative_path)
+        relative_path = relative_path.replace(os.sep, '/')
+        return any(fnmatch(name, pattern) or fnmatch(relative_path, pattern) for pattern in self.prune)
+
+    def list_directory(self, dir_path):
+        """
+        Lists a directory, or takes its listing from the cache if the directory did not change.
+        :param dir_path: directory path
+        :return: ([sub-directory names], [file names], True if the directory was listed again),
+        ([], [], True) if the directory vanished
+        """
+        try:
+            mtime = os.stat(dir_path).st_mtime
+        except (FileNotFoundError, NotADirectoryError):
+            return [], [], True
+
+        listing = self.directories.get(dir_path)
+        if listing is not None and listing['mtime'] == mtime:
+            return listing['dirs'], listing['files'], False
+
+        dirs, files = [], []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    (dirs if entry.is_dir() else files).append(entry.name)
+        except (FileNotFoundError, NotADirectoryError):
+            return [], [], True
+
+        # a change within the same mtime tick as the listing would go unnoticed: list it again next time
+        self.directories[dir_path] = {
+            'mtime': mtime if time.time() - mtime > 2 else None,
+            'dirs': dirs,
+            'files': files,
+        }
+        self.changed = True
+        return dirs, files, True
+
+    def forget(self, dir_path):
+        """
+        Drops the listing of a directory, so that it is listed again by the next walk.
+        :param dir_path: directory path
+        :return: void
+        """
+        if self.directories.pop(dir_path, None) is not None:
+            self.changed = True
+
+    def walk(self, dir_path, accepts_file, changed_only=False):
+        """
+        Lists the input files of a directory tree, directory by directory.
+        :param dir_path: input directory
+        :param accepts_file: filter on the file names, e.g. reader.accepts_file
+        :param changed_only: only return the directories listed again, i.e. that changed since the
+        last walk, so that the entries of the other directories are not looked at
+        :return: {directory path relative to dir_path: [accepted file names]}. With changed_only,
+        the directories that vanished are returned too, with no files.
+        """
+        listing = {}
+        visited = set()
+        listed = 0
+        level = ['']
+
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            while len(level) > 0:
+                listings = executor.map(self.list_directory, [path.join(dir_path, d) for d in level])
+                next_level = []
+
+                for relative_dir, (dirs, files, listed_again) in zip(level, listings):
+                    visited.add(path.join(dir_path, relative_dir))
+                    listed += listed_again
+                    if listed_again or not changed_only:
+                        listing[relative_dir] = [f for f in files if accepts_file(f)]
+                    next_level += [d for d in (path.join(relative_dir, d) for d in dirs) if not self.pruned(d)]
+
+                level = next_level
+
+        # forget the directories below dir_path that are gone or pruned
+        prefix = path.join(dir_path, '')
+        for directory in [d for d in self.directories if d not in visited]:
+            if directory.startswith(prefix):
+                del self.directories[directory]
+                self.changed = True
+                if changed_only:
+                    listing[path.relpath(directory, dir_path)] = []
+
+        self.visited = len(visited)
+        self.listed = listed
+        self.save()
+        return listing
+
+    def files(self, dir_path, accepts_file):
+        """
+        Lists the input files of a directory tree.
+        :param dir_path: input directory
+        :param accepts_file: filter on the file names, e.g. reader.accepts_file
+        :return: sorted file paths, relative to dir_path
+        """
+        listing = self.walk(dir_path, accepts_file)
+        return sorted(path.join(relative_dir, f) for relative_dir, files in listing.items() for f in files)
+
+    def changes(self, dir_path, accepts_file):
+        """
+        Lists the input files of the directories changed since the last walk (see walk). The other
+        directories are only stat'ed, so that the cost does not grow with the number of files.
+        :param dir_path: input directory
+        :param accepts_file: filter on the file names, e.g. reader.accepts_file
+        :return: {directory path relative to dir_path: [accepted file names]}
+        """
+        return self.walk(dir_path, accepts_file, changed_only=True)
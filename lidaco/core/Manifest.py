@@ -0,0 +1,168 @@
+from os import path
+import hashlib
+import json
+import os
+
+from ..common.Logger import Logger
+
+
+class Manifest:
+    """
+    Persisted record of the already converted input files, stored next to the output files.
+    Maps every input file (size, mtime and content hash, and the size and mtime of its related
+    files, e.g. the Windscanner _system.txt) to the output block it was written to, so that an
+    incremental build only converts the blocks whose inputs changed.
+
+    """
+
+    filename = '.lidaco-manifest.json'
+
+    def __init__(self, dir_path):
+        """
+        Loads the manifest of an output directory, if there is one.
+        :param dir_path: output directory
+        """
+        self.file_path = path.join(dir_path, Manifest.filename)
+        self.inputs = {}
+        self.blocks = {}
+        self.load()
+
+    def load(self):
+        """
+        Reads the manifest file. A missing or unreadable manifest is treated as empty,
+        i.e. everything is converted again.
+        :return: void
+        """
+        if not path.isfile(self.file_path):
+            return
+
+        try:
+            with open(self.file_path) as f:
+                manifest = json.load(f)
+            self.inputs = manifest['inputs']
+            self.blocks = manifest['blocks']
+        except Exception as e:
+            Logger.warn('bad_manifest', self.file_path, str(e))
+
+    def save(self):
+        """
+        Writes the manifest file. A temporary file is renamed over the old one, so
+        that a crash while saving never leaves a truncated manifest behind.
+        :return: void
+        """
+        tmp_path = self.file_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'inputs': self.inputs, 'blocks': self.blocks}, f, indent=1)
+        os.replace(tmp_path, self.file_path)
+
+    @staticmethod
+    def content_hash(file_path, chunk_size=1 << 20):
+        """
+        SHA-1 of a file content, read in chunks.
+        :param file_path: file path
+        :param chunk_size: bytes read at once
+        :return: hex digest
+        """
+        sha1 = hashlib.sha1()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                sha1.update(chunk)
+        return sha1.hexdigest()
+
+    @staticmethod
+    def signature(file_path):
+        """
+        :param file_path: file path
+        :return: [size, mtime], None if the file does not exist
+        """
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime]
+
+    def unchanged(self, file_path):
+        """
+        Checks if an input file is the same as when it was converted. Size and mtime are
+        compared first; the content hash is only computed if the mtime changed. The related files
+        must have the same size and mtime, and still be missing if they were missing.
+        :param file_path: input file path
+        :return: boolean
+        """
+        record = self.inputs.get(file_path)
+        if record is None or not path.isfile(file_path):
+            return False
+
+        for related_path, signature in record.get('related', {}).items():
+            if self.signature(related_path) != signature:
+                return False
+
+        stat = os.stat(file_path)
+        if stat.st_size != record['size']:
+            return False
+
+        if stat.st_mtime == record['mtime']:
+            return True
+
+        if self.content_hash(file_path) != record['hash']:
+            return False
+
+        record['mtime'] = stat.st_mtime
+        return True
+
+    def plan(self, output, inputs, resumable):
+        """
+        Decides what to do with an output block.
+        :param output: output file path
+        :param inputs: the block's input file paths, in conversion order
+        :param resumable: if the writer can append to an existing output file
+        :return: number of leading inputs already converted and unchanged. The whole block is up to date
+        if it equals len(inputs); 0 means that the block must be rewritten from scratch.
+        """
+        block = self.blocks.get(output)
+        if block is None or not block['complete'] or not path.isfile(output):
+            return 0
+
+        converted = block['inputs']
+        if converted != inputs[:len(converted)] or not all(self.unchanged(f) for f in converted):
+            return 0
+
+        if len(converted) < len(inputs) and not resumable:
+            return 0
+
+        return len(converted)
+
+    def start_block(self, output):
+        """
+        Marks an output block as being written. If the conversion crashes, the block is
+        rewritten from scratch by the next incremental build.
+        :param output: output file path
+        :return: void
+        """
+        if output in self.blocks:
+            self.blocks[output]['complete'] = False
+            self.save()
+
+    def complete_block(self, output, inputs, related_files=None):
+        """
+        Records a successfully written output block and its inputs.
+        :param output: output file path
+        :param inputs: the block's input file paths, in conversion order
+        :param related_files: function listing the related files of an input file, e.g. reader.related_files
+        :return: void
+        """
+        for file_path in inputs:
+            if not self.unchanged(file_path):
+                stat = os.stat(file_path)
+                self.inputs[file_path] = {
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                    'hash': self.content_hash(file_path),
+                }
+            self.inputs[file_path]['output'] = output
+
+            if related_files is not None:
+                self.inputs[file_path]['related'] = {f: self.signature(f) for f in related_files(file_path)}
+
+        self.blocks[output] = {'inputs': list(inputs), 'complete': True}
+        self.save()
@@ -1,27 +1,82 @@
+from importlib.util import find_spec
 import importlib
 
+# Catalogue of the bundled "add-on" modules, listed without importing them:
+# name => (description, third-party packages imported when the module is loaded)
+READERS = {
+    'AQ500': ('AQ500 sodar _result.txt files', ['numpy', 'pandas']),
+    'Galion': ('Galion .scn scan files', ['numpy', 'pandas']),
+    'Triton': ('Triton sodar .csv exports', ['numpy', 'pandas']),
+    'WLS70': ('Windcube WLS70 .txt files', ['numpy', 'pandas']),
+    'Windcubev1': ('Windcube v1 .sta / .rtd files', ['numpy', 'pandas']),
+    'Windcubev2': ('Windcube v2 .sta / .rtd files', ['numpy', 'pandas']),
+    'Windscanner': ('WindScanner _wind.txt and _system.txt files', ['numpy']),
+    'ZephIR300': ('ZephIR 300 .csv files', ['numpy', 'pandas']),
+}
+WRITERS = {
+    'MetadataCard': ('JSON metadata card of the NetCDF4 output', ['numpy', 'netCDF4']),
+    'NcML': ('NcML description of the NetCDF4 output', ['numpy', 'netCDF4', 'lxml']),
+    'NetCDF4': ('NetCDF4 files', ['numpy', 'netCDF4']),
+}
+
 
 class ModuleLoader:
     """
     Dynamically handles "add-on" modules (readers and writers) loading.
     """
 
+    # classes already loaded in this process, shared by all loaders
+    classes = {}
+
+    # path => catalogue of the modules found there, see register
+    catalogues = {'..readers.': READERS, '..writers.': WRITERS}
+
     def __init__(self):
         super().__init__()
         self.reader_module = None
         self.writer_module = None
 
+    @staticmethod
+    def available(path):
+        """
+        Lists the modules of a path, without importing them.
+        :param path: should be '..readers.' or '..writers.'
+        :return: {name: (description, third-party packages, whether they are all installed)}
+        """
+        return {name: (description, requires, all(find_spec(package) is not None for package in requires))
+                for name, (description, requires) in sorted(ModuleLoader.catalogues[path].items())}
+
+    @staticmethod
+    def register(path, name, description='', requires=()):
+        """
+        Adds a module to the catalogue of a path, e.g. a reader added to the readers sub directory.
+        :param path: should be '..readers.' or '..writers.'
+        :param name: module name, which declares the class with the same name
+        :param description: what the module reads / writes
+        :param requires: third-party packages imported by the module
+        :return: void
+        """
+        ModuleLoader.catalogues[path][name] = (description, list(requires))
+
     @staticmethod
     def load(path, name):
         """
         Dynamically loads a module with name "name" and retrieves
         the class with the same name declared in that file.
-        :param path: should be 'reader' or 'writer'
+        Only that module, and the packages it imports, are imported.
+        :param path: should be '..readers.' or '..writers.'
         :param name: worker name e.g. windscanner, windcubev2, netcdf4 etc.
-        Check out the available ones at readers/writers sub directories.
+        Check out the available ones at readers/writers sub directories, or with ModuleLoader.available.
         :return: loaded class.
         """
-        return getattr(importlib.import_module(path + name, __package__), name)
+        if (path, name) not in ModuleLoader.classes:
+            catalogue = ModuleLoader.catalogues[path]
+            if name not in catalogue and find_spec(path[1:] + name, 'lidaco') is None:
+                raise ImportError('unknown module "{}", available: {}'.format(name, ', '.join(sorted(catalogue))))
+
+            ModuleLoader.classes[(path, name)] = getattr(importlib.import_module(path + name, __package__), name)
+
+        return ModuleLoader.classes[(path, name)]
 
     def load_reader(self, name):
         """
@@ -0,0 +1,86 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+END = object()
+
+
+class Prefetcher:
+    """
+    Runs a function over a sequence of items on background threads, a bounded number of items
+    ahead of the consumer, and hands the results out in the order of the items. Used to parse the
+    next input files / file groups while the current one is written.
+
+    Keeps how long the function ran (summed over the threads) and how long the consumer waited for
+    a result, to report how much of the work was overlapped.
+
+    """
+
+    def __init__(self, threads=1, depth=None):
+        """
+        :param threads: number of producer threads
+        :param depth: maximum number of results computed ahead of the consumer, default: 2 per thread
+        """
+        self.threads = max(1, int(threads))
+        self.depth = max(self.threads, int(depth)) if depth is not None else 2 * self.threads
+        self.produce_time = 0.0  # seconds spent in the function, summed over the threads
+        self.wait_time = 0.0  # seconds the consumer waited for a result
+        self.items = 0  # results handed out
+        self.lock = threading.Lock()
+
+    def timed(self, function, item):
+        start = time.perf_counter()
+        try:
+            return function(item)
+        finally:
+            with self.lock:
+                self.produce_time += time.perf_counter() - start
+
+    def map(self, function, items):
+        """
+        Like the built-in map, computing up to 'depth' results ahead. An exception raised by the function
+        is raised to the consumer when it reaches that item; the items not started yet are then dropped.
+        :param function: called with each item, on a producer thread
+        :param items: iterable of items
+        :return: iterator of the results, in the order of the items
+        """
+        items = iter(items)
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            try:
+                while True:
+                    while len(pending) < self.depth:
+                        item = next(items, END)
+                        if item is END:
+                            break
+                        pending.append(executor.submit(self.timed, function, item))
+
+                    if len(pending) == 0:
+                        return
+
+                    start = time.perf_counter()
+                    result = pending.popleft().result()
+                    self.wait_time += time.perf_counter() - start
+                    self.items += 1
+                    yield result
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def overlap(self, wall_time):
+        """
+        Overlap of the producers with the consumer.
+        :param wall_time: seconds the whole pipeline ran
+        :return: {'parse': seconds in the function, 'write': seconds the consumer worked, 'wait': seconds it waited,
+        'efficiency': fraction of the function time hidden behind the consumer work}
+        """
+        work = max(0.0, wall_time - self.wait_time)
+        hidden = max(0.0, self.produce_time - self.wait_time)
+        return {
+            'parse': self.produce_time,
+            'write': work,
+            'wait': self.wait_time,
+            'efficiency': hidden / self.produce_time if self.produce_time > 0 else 0.0,
+        }
@@ -0,0 +1,149 @@
+from contextlib import contextmanager
+import csv
+import json
+import threading
+import time
+
+from ..common.Logger import Logger
+
+# what is measured for each stage of a file / output block
+FIELDS = ['stage', 'item', 'wall', 'cpu', 'bytes_read', 'rows', 'bytes_written']
+
+# the stages spent on one input file / file group, ranked in the slowest inputs table
+INPUT_STAGES = ('timestamps', 'read_to', 'parse', 'write')
+
+
+class Profiler:
+    """
+    Records the wall and cpu time, the bytes read and the rows and bytes written by each stage of a
+    conversion, per input file / file group or output block:
+
+    - discovery: listing and filtering the input files (Reader.fetch_input_files)
+    - timestamps: reading the first timestamp of an input file to plan time based output blocks
+    - metadata: writing the "meta-data" configurations (Builder.read_attributes / read_variables)
+    - read_to: parsing and writing an input file, for the readers doing both in read_to
+    - parse / write: parsing an input file (Reader.read_batch) / writing it (Writer.materialize)
+    - close: flushing and closing an output file
+
+    The cpu time is the time of the thread running the stage, so that prefetching threads are
+    measured apart.
+
+    """
+
+    def __init__(self):
+        self.records = []
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # a worker process starts with no records, see Builder.build_parallel
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def begin(self, stage, item=None, bytes_read=0):
+        """
+        Starts measuring a stage, on the current thread.
+        :param stage: stage name
+        :param item: input file / file group id, or output file path
+        :param bytes_read: size of the input read by the stage
+        :return: the stage record; 'rows' and 'bytes_written' can be set until end is called
+        """
+        return {'stage': stage, 'item': item, 'wall': time.perf_counter(), 'cpu': time.thread_time(),
+                'bytes_read': bytes_read, 'rows': 0, 'bytes_written': 0}
+
+    def end(self, record):
+        """
+        Stops measuring a stage started by begin, on the same thread.
+        :param record: the stage record
+        :return: void
+        """
+        record['wall'] = time.perf_counter() - record['wall']
+        record['cpu'] = time.thread_time() - record['cpu']
+        with self.lock:
+            self.records.append(record)
+
+    @contextmanager
+    def stage(self, stage, item=None, bytes_read=0):
+        """
+        Measures a stage, e.g.: with profiler.stage('parse', file_path) as record: ...
+        :return: the stage record, see begin
+        """
+        record = self.begin(stage, item, bytes_read)
+        try:
+            yield record
+        finally:
+            self.end(record)
+
+    def merge(self, records):
+        """
+        Adds the records of another Profiler, e.g. of a worker process.
+        :param records: list of stage records
+        :return: void
+        """
+        with self.lock:
+            self.records += records
+
+    def stages(self):
+        """
+        :return: {stage: totals}, in the order the stages first ran
+        """
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record['stage'], {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'bytes_read': 0,
+                                                        'rows': 0, 'bytes_written': 0})
+            total['calls'] += 1
+            for key in ('wall', 'cpu', 'bytes_read', 'rows', 'bytes_written'):
+                total[key] += record[key]
+        return totals
+
+    def inputs(self):
+        """
+        :return: {input file / file group: totals of its stages}
+        """
+        totals = {}
+        for record in self.records:
+            if record['stage'] in INPUT_STAGES:
+                total = totals.setdefault(record['item'], {'wall': 0.0, 'cpu': 0.0, 'bytes_read': 0, 'rows': 0})
+                for key in total:
+                    total[key] += record[key]
+        return totals
+
+    def export(self, file_path):
+        """
+        Writes the records to a .csv file (one row per stage record), or else to a .json file
+        holding the stage totals and the records.
+        :param file_path: output file path
+        :return: void
+        """
+        if file_path.lower().endswith('.csv'):
+            with open(file_path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(self.records)
+        else:
+            with open(file_path, 'w') as f:
+                json.dump({'stages': self.stages(), 'records': self.records}, f, indent=2, default=str)
+
+        Logger.info('profile_exported', file_path)
+
+    def print_summary(self, top=10):
+        """
+        Prints the stage totals and the slowest input files / file groups.
+        :param top: number of input files / file groups listed
+        :return: void
+        """
+        Logger.log('profile_stage_header', 'stage', 'calls', 'wall (s)', 'cpu (s)', 'read (MB)', 'rows', 'written (MB)')
+        for stage, total in self.stages().items():
+            Logger.log('profile_stage_row', stage, total['calls'], total['wall'], total['cpu'],
+                       total['bytes_read'] / 2 ** 20, total['rows'], total['bytes_written'] / 2 ** 20)
+
+        slowest = sorted(self.inputs().items(), key=lambda entry: entry[1]['wall'], reverse=True)[:top]
+        if len(slowest) == 0:
+            return
+
+        Logger.log('profile_inputs_title', len(slowest))
+        Logger.log('profile_inputs_header', 'input', 'wall (s)', 'cpu (s)', 'read (MB)', 'rows')
+        for item, total in slowest:
+            Logger.log('profile_inputs_row', str(item), total['wall'], total['cpu'], total['bytes_read'] / 2 ** 20,
+                       total['rows'])
@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
-from os import listdir
-from itertools import groupby
+from datetime import datetime
+from os import listdir, path
+from itertools import groupby, islice
 from lidaco.common.Logger import Logger
+from lidaco.core.Discovery import Discovery
+import io
+import locale
 import os
+import re
 
 class Reader(ABC):
     """
@@ -11,6 +16,18 @@ class Reader(ABC):
 
     out_path = ''
 
+    # time of the first record in the input filenames: regular expression (the time is its first group)
+    # and strptime format, see filename_timestamp. None if the filenames hold no time.
+    filename_time_pattern = None
+    filename_time_format = None
+
+    # True if the reader can read its input files in record batches, see read_batches and write_batch
+    streams = False
+
+    # True if the reader returns what it parsed as a DataBatch from read_batch, which the writer
+    # materializes, instead of writing the output dataset itself in read_to, see ColumnarReader
+    columnar = False
+
     def __init__(self, data_grouping):
         """
         Constructor.
@@ -20,27 +37,25 @@ class Reader(ABC):
         self.data_grouping = data_grouping
         self.configs = None
 
-    def fetch_input_files(self, dir_path):
+    def fetch_input_files(self, dir_path, discovery=None, required=True):
         """
         Lists and filters input data files. If the reader specifies a group_by function,
         it also groups files by that value, return a dictionary group => [files].
         :param dir_path: directory containing input data files
-        :return: [files] | {group => [files]}
+        :param discovery: Discovery used to list the directory tree, see Builder.discovery
+        :param required: False to return no files instead of failing when none is found (e.g. watch mode)
+        :return: [files] | {group => [files]}, paths relative to dir_path
         """
-
-
         Logger.info('searching_in_path', dir_path)
-        # files = [f for f in listdir(dir_path) if self.accepts_file(f)]
-        files=[]
-        for folder, d, filenames in os.walk(dir_path):
-            for filename in filenames:
-                if self.accepts_file(folder + filename):
-                    files.append(folder + '\\' +filename)
 
+        if discovery is None:
+            discovery = Discovery()
 
-        [Logger.info('found', f) for f in files]
+        files = discovery.files(dir_path, self.accepts_file)
+        Logger.info('discovered', len(files), discovery.visited, discovery.listed)
+        files = self.select_window(files, dir_path)
 
-        if len(files) == 0:
+        if len(files) == 0 and required:
             Logger.error('files_not_found')
 
         if self.data_grouping:
@@ -104,15 +119,279 @@ class Reader(ABC):
     def read_to(self, output_dataset, input, configurations, index):
         """
         Reads an input file/group to the correspondent output dataset.
+        The readers returning what they parsed as a DataBatch extend ColumnarReader, which implements it.
         :param output_dataset: cdm/netcdf4 dataset.
         :param input: is file path.
         When group_by is used, a tuple containing the group file paths.
         :param configurations: configurations read from .yaml files
-        :param index:
+        :param index: True to append to the output variables created before
         :return: void
         """
         pass
 
+    def read_batch(self, input, configurations):
+        """
+        Parses an input file/group, without writing it. Implemented by the readers setting 'columnar',
+        see ColumnarReader.
+        :param input: file path. When group_by is used, a tuple containing the group file paths.
+        :param configurations: configurations read from .yaml files
+        :return: DataBatch
+        """
+        raise NotImplementedError('{} sets columnar but does not implement read_batch'.format(type(self).__name__))
+
+    def read_batches(self, input, batch_rows):
+        """
+        Reads an input file/group in record batches, so that the memory used does not grow with the size
+        of the input. Implemented by the readers setting 'streams'.
+        :param input: file path. When group_by is used, a tuple containing the group file paths.
+        :param batch_rows: number of records per batch
+        :return: iterator of batches, in the reader's own format, as write_batch takes them
+        """
+        raise NotImplementedError('{} sets streams but does not implement read_batches'.format(type(self).__name__))
+
+    def write_batch(self, output_dataset, batch, configurations, appending):
+        """
+        Writes a record batch to the output dataset, as read_to writes a whole input file/group.
+        Implemented by the readers setting 'streams'.
+        :param output_dataset: cdm/netcdf4 dataset.
+        :param batch: a batch yielded by read_batches
+        :param configurations: configurations read from .yaml files
+        :param appending: False for the first batch of an output file, which creates the output variables
+        :return: void
+        """
+        raise NotImplementedError('{} sets streams but does not implement write_batch'.format(type(self).__name__))
+
+    def stream_to(self, output_dataset, input, configurations, appending, batch_size):
+        """
+        Reads an input file/group to the output dataset batch by batch, see read_batches.
+        Readers that do not stream read the whole input with read_to.
+        :param output_dataset: cdm/netcdf4 dataset.
+        :param input: file path. When group_by is used, a tuple containing the group file paths.
+        :param configurations: configurations read from .yaml files
+        :param appending: True to append to the output variables created before
+        :param batch_size: records per batch (int), or a size in memory (e.g. '64MB'), see batch_rows
+        :return: void
+        """
+        if not self.streams:
+            return self.read_to(output_dataset, input, configurations, appending)
+
+        batch_rows = self.batch_rows(input if isinstance(input, str) else input[0], batch_size)
+        for i, batch in enumerate(self.read_batches(input, batch_rows)):
+            self.write_batch(output_dataset, batch, configurations, appending or i > 0)
+
+    @staticmethod
+    def batch_rows(file_path, batch_size, sample_size=1 << 16):
+        """
+        Number of records per batch. A size in memory is converted with the average line length of
+        the beginning of the file, i.e. assuming a record per line and about as many bytes decoded as read.
+        :param file_path: input file path
+        :param batch_size: records (int or digits), or a size in memory, e.g. '512KB', '64MB' or '1GB'
+        :param sample_size: bytes read to measure the line length
+        :return: int
+        """
+        match = re.fullmatch(r'\s*(\d+)\s*([KMG]B)?\s*', str(batch_size), re.IGNORECASE)
+        if match is None or int(match.group(1)) == 0:
+            Logger.error('bad_batch_size', batch_size)
+
+        if match.group(2) is None:
+            return int(match.group(1))
+
+        size = int(match.group(1)) * 1024 ** ('KMG'.index(match.group(2)[0].upper()) + 1)
+        with open(file_path, 'rb') as f:
+            sample = f.read(sample_size)
+
+        line_length = len(sample) / max(1, sample.count(b'\n'))
+        return max(1, int(size // line_length))
+
+    def related_files(self, filename):
+        """
+        Other files read together with an input file, that are not listed as inputs themselves.
+        Used to wait until they are completely written too.
+        :param filename: e.g., 20161211135000_wind.txt
+        :return: file paths e.g. [20161211135000_system.txt]
+        """
+        return []
+
+    @staticmethod
+    def read_lines(file_path, start, count=1, encoding=None, block_size=1 << 16):
+        """
+        Reads a few lines of a file without reading the whole file, e.g. to get a timestamp.
+        Lines from the start are streamed, lines from the end are read backwards from the end of the file.
+        :param file_path: file path
+        :param start: index of the first line, negative to count from the end (as in readlines()[start])
+        :param count: number of lines
+        :param encoding: file encoding, the platform default if None (as in open)
+        :param block_size: bytes read at once when reading backwards
+        :return: list of lines, with their line endings
+        """
+        if start >= 0:
+            with open(file_path, encoding=encoding) as f:
+                lines = list(islice(f, start, start + count))
+        else:
+            with open(file_path, 'rb') as f:
+                position = f.seek(0, os.SEEK_END)
+                data = b''
+
+                # one more line break than lines wanted, so that the first of them is complete
+                while position > 0 and data.count(b'\n') <= -start:
+                    size = min(block_size, position)
+                    position -= size
+                    f.seek(position)
+                    data = f.read(size) + data
+
+            if position > 0:
+                data = data[data.find(b'\n') + 1:]
+
+            text = data.decode(encoding or locale.getpreferredencoding(False))
+            lines = io.StringIO(text, newline=None).readlines()
+            lines = lines[len(lines) + start:][:count] if len(lines) + start >= 0 else []
+
+        if len(lines) == 0:
+            raise IndexError('line {} not found in {}'.format(start, file_path))
+
+        return lines
+
+    @staticmethod
+    def read_line(file_path, row, header_lines=0, footer_lines=0, encoding=None):
+        """
+        Reads one data line of a file without reading the whole file, see read_lines.
+        :param file_path: file path
+        :param row: index of the data line, negative to count from the last data line
+        :param header_lines: number of lines before the first data line
+        :param footer_lines: number of lines after the last data line
+        :param encoding: file encoding
+        :return: the line
+        """
+        start = header_lines + row if row >= 0 else row - footer_lines
+        return Reader.read_lines(file_path, start, 1, encoding)[0]
+
+    def filename_timestamp(self, filename):
+        """
+        Time of the first record of an input file, taken from its name (see filename_time_pattern).
+        :param filename: e.g. 20161211135000_wind.txt, WLS7-164_2016_09_19__00_00_00.sta
+        :return: pandas Timestamp, None if the filename holds no time
+        """
+        if self.filename_time_pattern is None:
+            return None
+
+        match = re.search(self.filename_time_pattern, os.path.basename(filename))
+        if match is None:
+            return None
+
+        import pandas as pd
+        try:
+            return pd.Timestamp(datetime.strptime(match.group(1), self.filename_time_format))
+        except ValueError:
+            return None
+
+    def first_timestamp(self, file_path):
+        """
+        Time of the first record of an input file, from its name or else from its first record.
+        :param file_path: input file path
+        :return: pandas Timestamp, None if it can not be read
+        """
+        timestamp = self.filename_timestamp(file_path)
+        if timestamp is not None:
+            return timestamp
+
+        import pandas as pd
+        try:
+            return pd.Timestamp(self.get_timestamp(file_path))
+        except Exception as e:
+            Logger.debug(None, 'No first timestamp in {}: {}'.format(file_path, e))
+            return None
+
+    def last_timestamp(self, file_path):
+        """
+        Time of the last record of an input file.
+        :param file_path: input file path
+        :return: pandas Timestamp, None if it can not be read
+        """
+        import pandas as pd
+        try:
+            return pd.Timestamp(self.get_timestamp(file_path, -1))
+        except Exception as e:
+            Logger.debug(None, 'No last timestamp in {}: {}'.format(file_path, e))
+            return None
+
+    def time_window(self):
+        """
+        The records converted, set under 'parameters: input: start:' and 'end:' in the .yaml files
+        or with --start and --end, e.g. '2016-12-11' or '2016-12-11 13:30'. The start is included,
+        the end is not.
+        :return: (start, end) pandas Timestamps, None where the window is open
+        """
+        window = []
+        for key in ('start', 'end'):
+            value = None
+            if self.configs is not None and self.configs.exists('parameters', 'input', key):
+                value = self.configs.get('parameters', 'input', key)
+
+            if value in (None, ''):
+                window.append(None)
+                continue
+
+            import pandas as pd
+            try:
+                window.append(pd.Timestamp(value))
+            except ValueError:
+                Logger.error('bad_time_window', key, value)
+
+        return tuple(window)
+
+    def in_window(self, timestamps):
+        """
+        Checks which records are inside the time window. Readers use it to drop the other records.
+        :param timestamps: record timestamps, anything numpy.asarray turns into datetime64
+        :return: boolean array, all True without a time window
+        """
+        import numpy as np
+        timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+        start, end = self.time_window()
+        keep = np.ones(len(timestamps), dtype=bool)
+
+        if start is not None:
+            keep &= timestamps >= start.to_datetime64()
+        if end is not None:
+            keep &= timestamps < end.to_datetime64()
+
+        return keep
+
+    def select_window(self, files, dir_path):
+        """
+        Drops the input files without records in the time window. The start of every file is taken
+        from its name, or else from its first record, and a file is assumed to end where the next one starts
+        (the input files do not overlap). Only the last record of the file starting before the window is read.
+        :param files: input file paths, relative to dir_path
+        :param dir_path: input directory
+        :return: the input files in the time window
+        """
+        start, end = self.time_window()
+        if start is None and end is None:
+            return files
+
+        firsts = [self.first_timestamp(path.join(dir_path, f)) for f in files]
+        known = sorted((first, f) for first, f in zip(firsts, files) if first is not None)
+        selected = [f for first, f in zip(firsts, files) if first is None]
+
+        for i, (first, f) in enumerate(known):
+            if end is not None and first >= end:
+                continue
+
+            if start is not None and first < start:
+                if i + 1 < len(known) and known[i + 1][0] < start:
+                    continue
+
+                last = self.last_timestamp(path.join(dir_path, f))
+                if last is not None and last < start:
+                    continue
+
+            selected.append(f)
+
+        Logger.info('time_window', '-' if start is None else start, '-' if end is None else end,
+                    len(selected), len(files))
+        return sorted(selected)
+
     def group_id(self, filename):
         """
         Used by the converter to group by the converter to combine multiple files into a group.
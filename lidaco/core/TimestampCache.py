@@ -0,0 +1,93 @@
+from os import path
+import json
+import os
+
+from ..common.Logger import Logger
+
+
+class TimestampCache:
+    """
+    Persisted first and last timestamps of the input files, stored next to the output files.
+    Planning time based output blocks (see output_block_size) then only reads the input files
+    that are new or changed since the last run.
+
+    """
+
+    filename = '.lidaco-timestamps.json'
+
+    def __init__(self, dir_path):
+        """
+        Loads the timestamp cache of an output directory, if there is one.
+        :param dir_path: output directory
+        """
+        self.file_path = path.join(dir_path, TimestampCache.filename)
+        self.files = {}
+        self.changed = False
+        self.load()
+
+    def load(self):
+        """
+        Reads the cache file. A missing or unreadable cache is treated as empty.
+        :return: void
+        """
+        if not path.isfile(self.file_path):
+            return
+
+        try:
+            with open(self.file_path) as f:
+                self.files = json.load(f)
+        except Exception as e:
+            Logger.warn('bad_timestamp_cache', self.file_path, str(e))
+
+    def save(self):
+        """
+        Writes the cache file, if anything changed since it was loaded.
+        :return: void
+        """
+        if not self.changed:
+            return
+
+        tmp_path = self.file_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.files, f, indent=1)
+        os.replace(tmp_path, self.file_path)
+        self.changed = False
+
+    def get(self, reader, file_path):
+        """
+        First and last timestamps of an input file. They are read from the file with reader.get_timestamp
+        if the file is not in the cache, or if its size or mtime changed.
+        :param reader: the reader instance
+        :param file_path: input file path
+        :return: (first, last) pandas Timestamps. last is None if the reader can not read it.
+        """
+        import pandas as pd
+        stat = os.stat(file_path)
+        record = self.files.get(file_path)
+
+        if record is None or record['size'] != stat.st_size or record['mtime'] != stat.st_mtime:
+            try:
+                last = pd.Timestamp(reader.get_timestamp(file_path, -1)).isoformat()
+            except Exception as e:
+                Logger.debug(None, 'No last timestamp in {}: {}'.format(file_path, e))
+                last = None
+
+            record = {
+                'size': stat.st_size,
+                'mtime': stat.st_mtime,
+                'first': pd.Timestamp(reader.get_timestamp(file_path)).isoformat(),
+                'last': last,
+            }
+            self.files[file_path] = record
+            self.changed = True
+
+        last = pd.Timestamp(record['last']) if record['last'] is not None else None
+        return pd.Timestamp(record['first']), last
+
+    def first(self, reader, file_path):
+        """
+        :param reader: the reader instance
+        :param file_path: input file path
+        :return: first timestamp of the file, see get
+        """
+        return self.get(reader, file_path)[0]
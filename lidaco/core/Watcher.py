@@ -0,0 +1,323 @@
+from os import path
+import os
+import pathlib
+import time
+
+from ..common.Logger import Logger
+from .Builder import Builder
+from .Manifest import Manifest
+
+
+class Watcher:
+    """
+    Long-running conversion of the input files as they land in the input directory.
+    New files / file groups are appended to the open output block (see output_block_size),
+    or start a new one. The input directory is listed by a Discovery: a poll only looks at the
+    entries of the directories modified since the last poll, so the latency does not grow with
+    the size of the archive. A file failing to convert is tried again, and the output block of
+    a converted file is rewritten when its related files (e.g. a Windscanner _system.txt
+    written late) change.
+
+    """
+
+    def __init__(self, builder, interval=10, settle=60):
+        """
+        :param builder: a Builder, holding the configurations, the reader and the writer
+        :param interval: seconds between two polls of the input directory
+        :param settle: seconds a file must stay unmodified before it is considered completely written
+        """
+        self.builder = builder
+        self.interval = interval
+        self.settle = settle
+
+        self.reader = builder.module_loader.get_reader()()
+        self.reader.set_configs(builder.configs)
+        self.reader.verify_parameters()
+        self.writer_class = builder.module_loader.get_writer()
+
+        self.input_path = builder.configs.get_resolved('parameters', 'input', 'path')
+        self.output_path = builder.configs.get_resolved('parameters', 'output', 'path')
+        self.manifest = None
+
+        self.discovery = builder.discovery()
+        self.seen = {}  # directory relative to the input directory => accepted file names converted, or waiting to be
+        self.pending = {}  # file path => (size, mtime) at the last poll
+        self.outdated = {}  # converted file path whose related files changed => (size, mtime) at the last poll
+        self.block = None  # the open output block
+
+    def start(self):
+        """
+        Converts what is missing in the output directory (an incremental build) and
+        opens the last output block for appending. An empty (or new) input directory is
+        not an error: its files are converted as they land. The files modified within the
+        last 'settle' seconds may still be written: they wait for the polls, as new files do.
+        :return: void
+        """
+        self.builder.configs.merge({'parameters': {'incremental': True}})
+        pathlib.Path(self.output_path).mkdir(parents=True, exist_ok=True)
+
+        files = self.reader.fetch_input_files(self.input_path, self.discovery, required=False)
+        ready = [group for group in files if all(self.unmodified(f) for f in self.group_inputs(group))]
+        if len(ready) > 0:
+            self.builder.build(ready)
+
+        # the files found now are converted, or else wait (or are tried again) in pending; the ones
+        # landing during the build are not listed yet, so that the next poll finds them
+        self.manifest = Manifest(self.output_path)
+        for group in files:
+            for file_path in self.group_inputs(group):
+                relative_dir, name = path.split(path.relpath(file_path, self.input_path))
+                self.seen.setdefault(relative_dir, set()).add(name)
+                if file_path not in self.manifest.inputs:
+                    self.pending[file_path] = None
+
+        converted = [group for group in files if all(f in self.manifest.inputs for f in self.group_inputs(group))]
+        blocks = self.builder.plan_blocks(self.reader, converted, self.input_path) if len(converted) > 0 else []
+
+        if len(blocks) > 0:
+            last_block = blocks[-1]
+            self.block = {
+                'name': last_block['name'],
+                'output': self.writer_class(self.output_path, last_block['name']).file_path(),
+                'inputs': [f for group in last_block['groups'] for f in self.group_inputs(group)],
+                'groups': len(last_block['groups']),
+                'start': self.block_start(last_block['groups'][0]),
+            }
+
+    def run(self, polls=None):
+        """
+        Polls the input directory until interrupted (Ctrl+C).
+        :param polls: stop after this number of polls, None to run forever
+        :return: void
+        """
+        self.start()
+        Logger.log('watching', self.input_path, self.interval, self.settle)
+
+        try:
+            while polls is None or polls > 0:
+                time.sleep(self.interval)
+                self.poll()
+                polls = None if polls is None else polls - 1
+        except KeyboardInterrupt:
+            Logger.log('watch_stopped')
+
+    def poll(self):
+        """
+        Looks for new files and converts the ones that are completely written.
+        :return: void
+        """
+        new_files, outdated = self.scan()
+        for file_path in new_files:
+            self.pending[file_path] = None
+        for file_path in outdated:
+            self.outdated.setdefault(file_path, None)
+
+        outputs = set()
+        for file_path in [f for f in sorted(self.outdated) if self.settled(f, self.outdated)]:
+            self.outdated.pop(file_path)
+            if file_path in self.manifest.inputs:
+                outputs.add(self.manifest.inputs[file_path]['output'])
+
+        for output in sorted(outputs):
+            self.rebuild(output)
+
+        ready = [f for f in sorted(self.pending) if self.settled(f, self.pending)]
+        if len(ready) == 0:
+            return
+
+        for f in ready:
+            self.pending.pop(f)
+
+        for group in self.groups(ready):
+            self.convert(group)
+
+    def groups(self, file_paths):
+        """
+        Groups input files as Reader.fetch_input_files does.
+        :param file_paths: input file paths
+        :return: [{'id': group id, 'files': file(s)}], sorted by id, with paths relative to the input
+        directory, as Builder.group_path expects them
+        """
+        relative_paths = [path.relpath(f, self.input_path) for f in file_paths]
+
+        if self.reader.data_grouping:
+            groups = {}
+            for f in relative_paths:
+                groups.setdefault(self.reader.group_id(f), []).append(f)
+            groups = [{'id': k, 'files': g} for k, g in groups.items()]
+        else:
+            groups = [{'id': f, 'files': f} for f in relative_paths]
+
+        return sorted(groups, key=lambda group: group['id'])
+
+    def scan(self):
+        """
+        Looks at the directories modified since the last scan.
+        :return: (accepted files that were not seen before, converted files whose related files changed)
+        """
+        new_files, outdated = [], []
+
+        for relative_dir, names in self.discovery.changes(self.input_path, self.reader.accepts_file).items():
+            seen = self.seen.get(relative_dir, set())
+
+            for name in names:
+                file_path = path.join(self.input_path, relative_dir, name)
+                if name not in seen:
+                    new_files.append(file_path)
+                elif file_path in self.manifest.inputs and not self.manifest.unchanged(file_path):
+                    outdated.append(file_path)
+
+            if len(names) > 0:
+                self.seen[relative_dir] = set(names)
+            else:
+                self.seen.pop(relative_dir, None)
+
+        return sorted(new_files), outdated
+
+    def unmodified(self, file_path):
+        """
+        Checks if a file (and its related files) was not modified for at least 'settle' seconds.
+        :param file_path: input file path
+        :return: boolean
+        """
+        try:
+            stats = [os.stat(f) for f in [file_path] + self.reader.related_files(file_path)]
+        except FileNotFoundError:
+            return False
+
+        return all(time.time() - stat.st_mtime >= self.settle for stat in stats)
+
+    def settled(self, file_path, signatures):
+        """
+        Checks if a file (and its related files) stopped changing for at least 'settle' seconds.
+        :param file_path: input file path
+        :param signatures: file path => (size, mtime) at the last poll, updated
+        :return: boolean
+        """
+        try:
+            stats = [os.stat(f) for f in [file_path] + self.reader.related_files(file_path)]
+        except FileNotFoundError:
+            return False
+
+        signature = [(stat.st_size, stat.st_mtime) for stat in stats]
+        previous = signatures.get(file_path)
+        signatures[file_path] = signature
+
+        return signature == previous and all(time.time() - stat.st_mtime >= self.settle for stat in stats)
+
+    def group_inputs(self, group):
+        """
+        :param group: {'id': group id, 'files': file(s)}
+        :return: the group's input file paths
+        """
+        complete_path = self.builder.group_path(self.reader, group, self.input_path)
+        return list(complete_path) if self.reader.data_grouping else [complete_path]
+
+    def block_start(self, group):
+        """
+        Start of the time block a file / file group belongs to, when output_block_size is a time span.
+        :param group: {'id': group id, 'files': file(s)}
+        :return: pandas Timestamp or None
+        """
+        obs = self.builder.block_size()
+        if not isinstance(obs, str):
+            return None
+
+        import pandas as pd
+        timestamp = self.reader.get_timestamp(path.join(self.input_path, group['id']))
+        return pd.Timestamp(timestamp).floor(obs)
+
+    def starts_block(self, group):
+        """
+        Checks if a new file / file group opens a new output block, as Builder.plan_blocks does.
+        :param group: {'id': group id, 'files': file(s)}
+        :return: boolean
+        """
+        obs = self.builder.block_size()
+
+        if self.block is None:
+            return True
+        elif obs is None:
+            return False
+        elif isinstance(obs, int):
+            return self.block['groups'] >= obs
+        else:
+            import pandas as pd
+            timestamp = self.reader.get_timestamp(path.join(self.input_path, group['id']))
+            return (self.block['start'] + pd.Timedelta(obs)) < pd.Timestamp(timestamp)
+
+    def convert(self, group):
+        """
+        Appends a new file / file group to the open output block, or starts a new block with it.
+        A writer that can not append to its output files (see Writer.resumable) rewrites the open block
+        with it instead. If it fails, the files are forgotten, to be converted again by a next poll.
+        :param group: {'id': group id, 'files': file(s)}
+        :return: void
+        """
+        inputs = self.group_inputs(group)
+
+        if self.starts_block(group):
+            name = self.reader.output_filename(group['id'])
+            self.block = {
+                'name': name,
+                'output': self.writer_class(self.output_path, name).file_path(),
+                'inputs': [],
+                'groups': 0,
+                'start': self.block_start(group),
+            }
+
+        if self.block['groups'] == 0 or self.writer_class.resumable:
+            block = {'name': self.block['name'], 'groups': [group], 'append': self.block['groups'] > 0}
+        else:
+            block = {'name': self.block['name'], 'groups': self.groups(self.block['inputs']) + [group]}
+
+        self.manifest.start_block(self.block['output'])
+        try:
+            self.builder.build_block(self.reader, block, self.input_path, self.output_path)
+        except (Exception, SystemExit) as e:
+            Logger.warn('block_failed', self.block['output'], str(e))
+            self.forget(inputs)
+            return
+
+        self.block['inputs'] += inputs
+        self.block['groups'] += 1
+        self.manifest.complete_block(self.block['output'], self.block['inputs'], self.reader.related_files)
+
+    def rebuild(self, output):
+        """
+        Rewrites a converted output block from scratch, e.g. when a related file of one of its
+        inputs was written after it was converted. If it fails, it is tried again by the next poll.
+        :param output: output file path
+        :return: void
+        """
+        inputs = self.manifest.blocks[output]['inputs']
+        groups = self.groups(inputs)
+        block = {'name': self.reader.output_filename(groups[0]['id']), 'groups': groups}
+
+        self.manifest.start_block(output)
+        try:
+            self.builder.build_block(self.reader, block, self.input_path, self.output_path)
+        except (Exception, SystemExit) as e:
+            Logger.warn('block_failed', output, str(e))
+            # tried again by the next poll
+            for file_path in inputs:
+                self.outdated.setdefault(file_path, None)
+            return
+
+        self.manifest.complete_block(output, inputs, self.reader.related_files)
+
+    def forget(self, file_paths):
+        """
+        Forgets input files, and lists their directories again, so that the next poll converts them again.
+        :param file_paths: input file paths
+        :return: void
+        """
+        for file_path in file_paths:
+            relative_dir, name = path.split(path.relpath(file_path, self.input_path))
+            self.seen.get(relative_dir, set()).discard(name)
+            self.discovery.forget(path.join(self.input_path, relative_dir))
+
+
+def watch(interval=10, settle=60, **args):
+    watcher = Watcher(Builder(**args), interval, settle)
+    watcher.run()
@@ -10,6 +10,9 @@ class Writer(ABC):
     dir_path = None
     name = None
 
+    # True if data can be appended to an output file written by a previous run.
+    resumable = False
+
     def __init__(self, dir_path, name):
         """
         Constructor.
@@ -21,6 +24,7 @@ class Writer(ABC):
         self.dir_path = dir_path
         self.name = name
         self.append = False
+        self.configs = None
 
     def file_path(self):
         """
@@ -37,10 +41,35 @@ class Writer(ABC):
         """
         pass
 
+    def set_configs(self, configs):
+        self.configs = configs
+
+    def config(self, *keys):
+        """
+        Returns an output parameter, set under 'parameters: output:' in the .yaml files.
+        :param keys: parameter keys
+        :return: the parameter value, None if it is not set
+        """
+        if self.configs is None or not self.configs.exists('parameters', 'output', *keys):
+            return None
+        return self.configs.get('parameters', 'output', *keys)
+
+    def materialize(self, output_dataset, batch, appending):
+        """
+        Writes what a reader parsed to the dataset returned by __enter__. The writers based on
+        a netCDF4 dataset share this implementation, see DataBatch.write_to.
+        :param output_dataset: the dataset returned by __enter__
+        :param batch: DataBatch
+        :param appending: True if a batch was written to the dataset before
+        :return: void
+        """
+        batch.write_to(output_dataset, self.configs, appending)
+
     def appending(self, append):
         """
-        Sets the writer appending mode.
-        :param append: boolean
+        Sets the writer appending mode. The dataset returned by __enter__ stays open until __exit__,
+        i.e. for a whole output block.
+        :param append: boolean, True to append to an output file opened before
         :return: the writer itself.
         """
         self.append = append
@@ -1,9 +1,13 @@
 """ Lidaco core
 
 """
+import importlib
 
-from . import Builder
-from . import Config
-from . import ModuleLoader
-from . import Reader
-from . import Writer
+__all__ = ['Builder', 'Config', 'ModuleLoader', 'Reader', 'Writer']
+
+
+def __getattr__(name):
+    # the submodules are imported when first used, so that e.g. ModuleLoader does not import Builder and pandas
+    if name in __all__:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
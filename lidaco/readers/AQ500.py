@@ -1,12 +1,17 @@
 import numpy as np
+from ..core.DataBatch import DataBatch
+from ..core.ColumnarReader import ColumnarReader
 from ..core.Reader import Reader
+from ..common.Records import parse_records
 from datetime import datetime
 import os
 
 
 
 
-class AQ500(Reader):
+class AQ500(ColumnarReader):
+    filename_time_pattern = r'^(\d{6})_'
+    filename_time_format = '%y%m%d'
 
     def __init__(self):
         super().__init__(False)
@@ -33,9 +38,8 @@ class AQ500(Reader):
 
     @staticmethod
     def get_timestamp(input_filepath, row_of_timestamp = 0 ):
-        with open(input_filepath) as f:
-            line = f.readlines()[28 + row_of_timestamp]
-            
+        line = Reader.read_line(input_filepath, row_of_timestamp, header_lines=28, footer_lines=2,
+                                encoding='latin-1')
 
         timestamp = datetime.strptime(line.split(',')[0], 
                                           '%Y%m%d  %H:%M')
@@ -64,89 +68,66 @@ class AQ500(Reader):
     def output_filename(self, filename):
         return os.path.split(filename)[-1][:-4]
 
-    def read_to(self, output_dataset, input_filepath, configs, appending):
+    def read_batch(self, input_filepath, configs):
 
         # read file
         with open(input_filepath, encoding='latin-1') as f:
             data = f.readlines()
-            data = [line.strip() for line in data]
-            temp_headerlength = data.index('[EOH]')
-            parameters = {line.split('=')[0]: line.split('=')[1].strip() for line in data[:temp_headerlength] if ('=' in line)}
-            parameters['HeaderLength'] = temp_headerlength
-            parameters['Measurement heights'] = np.arange(int(parameters['Lowest level(LL m)']),int(parameters['Highest level(HL m)'])+1,int(parameters['Interval(m)']) )
-
-        	#create datafield dictionary  {column_name:np.array(columns)}
-            datafield = {line.split(':')[1].strip() : np.array((line.split(':')[0][11:]).split(','),dtype=int)-2 for line in data[:temp_headerlength] if (':' in line)}
-            
-            # create the dimensions
-            output_dataset.createDimension('range', len(parameters['Measurement heights']))
-            output_dataset.createDimension('time', None)
-
-            # create the coordinate variables
-            range1 = output_dataset.createVariable('range', 'f4', ('range',))
-            range1.units = 'm'
-            range1.long_name = 'range_gate_distance_from_lidar'
-            range1[:] = np.array(parameters['Measurement heights'])
-
-            time = output_dataset.createVariable('time', str, ('time',))
-            time.units = 's'
-            time.long_name = 'Time UTC in ISO 8601 format yyyy-mm-ddThh:mm:ssZ'
-
-            # create the data variables
-            scan_type = output_dataset.createVariable('scan_type', 'i')
-            scan_type.units = 'none'
-            scan_type.long_name = 'scan_type_of_the_measurement'
-            scan_type[:] = 1
-
-            accumulation_time = output_dataset.createVariable('accumulation_time', 'f4')
-            accumulation_time.units = 'seconds'
-            accumulation_time.long_name = 'time_for_spectral_accumulation'
-            accumulation_time[:] = 1.0
-
-            # create the measurement variables
-            T_external = output_dataset.createVariable('T_external', 'f4', ('time',))
-            T_external.units = 'degrees C'
-            T_external.long_name = 'temperature'
-
-            rh = output_dataset.createVariable('rh', 'f4', ('time',))
-            rh.units = 'degrees'
-            rh.long_name = 'lidar_yaw_angle'
-            
-            p = output_dataset.createVariable('p', 'f4', ('time',))
-            p.units = 'degrees'
-            p.long_name = 'lidar_yaw_angle'
-
-            WS = output_dataset.createVariable('WS', 'f4', ('time', 'range'))
-            WS.units = 'm.s-1'
-            WS.long_name = 'mean of scalar wind speed'
-            
-            DIR = output_dataset.createVariable('DIR', 'f4', ('time', 'range'))
-            DIR.units = 'degrees north'
-            DIR.long_name = 'wind direction from north'
-            
-            signal_quality = output_dataset.createVariable('signal_quality', 'f4', ('time', 'range'))
-            signal_quality.units = 'percent'
-            signal_quality.long_name = 'signal quality'
-
-            # create np.array of dataset without timestamp and cast to float
-            data_timeseries = [line[:-1].split(',') for line in data[temp_headerlength+2:-2]]
-            data_timeseries_array = np.array(data_timeseries)[:,1:].astype(float)
-            
-            timestamp_input = [datetime.strptime(row[0],'%Y%m%d %H:%M') for row in data_timeseries]
-            timestamp_iso8601 = [value.isoformat()+'Z' for value in timestamp_input]
-            output_dataset.variables['time'][:] = np.array(timestamp_iso8601)
-
-            output_dataset.variables['T_external'][:] = data_timeseries_array[:,datafield['Temperature sensor(deg C * 10)=True']]
-            output_dataset.variables['rh'][:] = data_timeseries_array[:,datafield['Humidity sensor(%RH)=True']]
-            output_dataset.variables['p'][:] = data_timeseries_array[:,datafield['Pressure sensor(Hp)=False']]
-
-            # e.g. radial velocity starts at 5th column and is then repeated every 9th column
-            output_dataset.variables['WS'][:, :] = AQ500.correct_ws(data_timeseries_array[:,datafield['Speed m/s(LL to HL)']], parameters['Measurement heights'])
-            output_dataset.variables['DIR'][:, :] = data_timeseries_array[:,datafield['Dir degrees(LL to HL)']]
-            
-            # there is an error reading signal_quality for our data because there are only 30 columns, but 31 heights
-            # we commented it out but it might be useful for future measurements
-            # output_dataset.variables['signal_quality'][:, :] = data_timeseries_array[:,datafield['Quality(S/N*10)(LL to HL)']]
-            
-            
-            
+        data = [line.strip() for line in data]
+        temp_headerlength = data.index('[EOH]')
+        parameters = {line.split('=')[0]: line.split('=')[1].strip() for line in data[:temp_headerlength] if ('=' in line)}
+        parameters['HeaderLength'] = temp_headerlength
+        parameters['Measurement heights'] = np.arange(int(parameters['Lowest level(LL m)']),int(parameters['Highest level(HL m)'])+1,int(parameters['Interval(m)']) )
+
+        #create datafield dictionary  {column_name:np.array(columns)}
+        datafield = {line.split(':')[1].strip() : np.array((line.split(':')[0][11:]).split(','),dtype=int)-2 for line in data[:temp_headerlength] if (':' in line)}
+
+        # decode the records; the datafield columns are counted without the timestamp column
+        columns = {
+            'T_external': int(datafield['Temperature sensor(deg C * 10)=True'][0]) + 1,
+            'rh': int(datafield['Humidity sensor(%RH)=True'][0]) + 1,
+            'p': int(datafield['Pressure sensor(Hp)=False'][0]) + 1,
+            'WS': datafield['Speed m/s(LL to HL)'] + 1,
+            'DIR': datafield['Dir degrees(LL to HL)'] + 1,
+        }
+        timestamps, records = parse_records(data[temp_headerlength+2:-2], ',', columns, 0, '%Y%m%d %H:%M')
+
+        # the records outside the time window are dropped
+        keep = self.in_window(timestamps)
+        if not keep.all():
+            timestamps, records = timestamps[keep], {name: values[keep] for name, values in records.items()}
+
+        batch = DataBatch()
+
+        # create the dimensions
+        batch.add_dimension('range', len(parameters['Measurement heights']))
+        batch.add_dimension('time', None)
+
+        # create the coordinate variables
+        batch.add_variable('range', 'f4', ('range',), np.array(parameters['Measurement heights']),
+                           units='m', long_name='range_gate_distance_from_lidar')
+        batch.add_time(timestamps)
+
+        # create the data variables
+        batch.add_variable('scan_type', 'i', (), 1, units='none', long_name='scan_type_of_the_measurement')
+        batch.add_variable('accumulation_time', 'f4', (), 1.0,
+                           units='seconds', long_name='time_for_spectral_accumulation')
+
+        # create the measurement variables
+        batch.add_variable('T_external', 'f4', ('time',), records['T_external'], units='degrees C', long_name='temperature')
+        batch.add_variable('rh', 'f4', ('time',), records['rh'], units='degrees', long_name='lidar_yaw_angle')
+        batch.add_variable('p', 'f4', ('time',), records['p'], units='degrees', long_name='lidar_yaw_angle')
+
+        # e.g. radial velocity starts at 5th column and is then repeated every 9th column
+        batch.add_variable('WS', 'f4', ('time', 'range'), AQ500.correct_ws(records['WS'], parameters['Measurement heights']),
+                           units='m.s-1', long_name='mean of scalar wind speed')
+        batch.add_variable('DIR', 'f4', ('time', 'range'), records['DIR'],
+                           units='degrees north', long_name='wind direction from north')
+
+        # there is an error reading signal_quality for our data because there are only 30 columns, but 31 heights
+        # we commented it out but it might be useful for future measurements
+        # ('signal_quality': datafield['Quality(S/N*10)(LL to HL)'] + 1 in the columns above, and
+        # records['signal_quality'] as the data below)
+        batch.add_variable('signal_quality', 'f4', ('time', 'range'), units='percent', long_name='signal quality')
+
+        return batch
@@ -1,5 +1,6 @@
 from ..core.Reader import Reader
 import numpy as np
+import pandas as pd
 from datetime import datetime
 import os
 
@@ -14,18 +15,58 @@ elevation_index = 5
 pitch_index = 6
 roll_index = 7
 
+metadata_lines = 6
+time_format = '%Y-%m-%d %H:%M:%S.%f'
 
-def chunks(l, n):
-    for i in range(0, len(l), n):
-        yield l[i:i + n]
+# .scn columns decoded into the (scan, gate, field) array, in this order
+fields = (doppler_index, intensity_index, azimuth_index, elevation_index, pitch_index, roll_index)
 
 
-def process_time(timestamp):
-    y, m, d = timestamp[:10].split('-')
-    h, min_, s = timestamp[11:19].split(':')
-    ms = timestamp[20:]
-    dt = datetime(int(y), int(m), int(d), int(h), int(min_), int(s), int(ms) * 1000)
-    return dt.timestamp()
+def load_scans(input_filepath, nr_gates):
+    """
+    Decodes a .scn file body into typed arrays. Only the columns in 'fields' and the ray time are read.
+    :param input_filepath: .scn file path
+    :param nr_gates: range gates per scan (rows per scan)
+    :return: (metadata lines, float array of shape (scan, gate, field), datetime64 array of the scans ray time)
+    """
+    metadata = Reader.read_lines(input_filepath, 0, metadata_lines)
+
+    body = pd.read_csv(input_filepath, sep='\t', skiprows=metadata_lines, header=None,
+                       usecols=fields + (time_index,), dtype={column: float for column in fields},
+                       engine='c')
+
+    # an incomplete last scan is dropped
+    n_scans = len(body) // nr_gates
+    body = body.iloc[:n_scans * nr_gates]
+
+    scans = body[list(fields)].to_numpy().reshape(n_scans, nr_gates, len(fields))
+    times = pd.to_datetime(body[time_index].to_numpy()[::nr_gates], format=time_format).to_numpy()
+
+    return metadata, scans, times
+
+
+def field(scans, column, gate=None):
+    """
+    :param scans: (scan, gate, field) array, see load_scans
+    :param column: .scn column index, e.g. doppler_index
+    :param gate: a range gate to get a (scan,) array of a value that is the same for every gate,
+    None to get the (scan, gate) array
+    :return: view of the field
+    """
+    if gate is None:
+        return scans[:, :, fields.index(column)]
+    return scans[:, gate, fields.index(column)]
+
+
+def scan_indexes(records, first_scan):
+    """
+    Indexes of the scans of a measurement scenario.
+    :param records: scan ranges, e.g. '3-208;244-254' (1-based, inclusive)
+    :param first_scan: number of the first scan in the file
+    :return: int array of 0-based indexes
+    """
+    ranges = [[int(value) for value in scan_range.split('-')] for scan_range in records.split(';')]
+    return np.concatenate([np.arange(start, end + 1) for start, end in ranges]) - first_scan
 
 
 def create_variables(group, azimuth, elevation, _yaw, _pitch, _roll, doppler, intensity):
@@ -102,9 +143,7 @@ class Galion(Reader):
 
     @staticmethod
     def get_timestamp(input_filepath, row_of_timestamp = 0 ):
-        with open(input_filepath) as f:
-            line = f.readlines()[6 + row_of_timestamp]
-            
+        line = Reader.read_line(input_filepath, row_of_timestamp, header_lines=6)
 
         timestamp = datetime.strptime(line.split('\t')[3], 
                                           '%Y-%m-%d %H:%M:%S.%f')
@@ -114,92 +153,98 @@ class Galion(Reader):
 
 
     def read_to(self, output_dataset, input_filepath, configs, appending):
-        with open(input_filepath) as file:
-            nr_gates = configs['parameters']['n_gates']
-            range_gates = configs['parameters']['range_gates']
-            constant_gates = configs['parameters']['constant_gates']
-            measurement_scenarios = configs['parameters']['measurement_scenarios']
-            raw_file = file.readlines()
-
-            # if we can assume that the metadata is always the same length
-            # If not, then it's better to add a variable to identify the number of lines that are "metadata"
-            metadata = raw_file[:6]
-            data = raw_file[6:]
-
-            scans = np.array(list(chunks([row.strip().split('\t') for row in data], int(nr_gates))))
-
-            # create the dimensions
-            output_dataset.createDimension('range', nr_gates)
-            output_dataset.createDimension('time', len(scans))
-
-            # create the coordinate variables
-            # range
-            range1 = output_dataset.createVariable('range', 'f4', ('range',))
-            range1.units = 'm'
-            range1.long_name = 'range_gate_distance_from_lidar'
-            if constant_gates:
-                range1[:] = np.full(nr_gates, float(range_gates))
+        nr_gates = configs['parameters']['n_gates']
+        range_gates = configs['parameters']['range_gates']
+        constant_gates = configs['parameters']['constant_gates']
+        measurement_scenarios = configs['parameters']['measurement_scenarios']
+
+        # if we can assume that the metadata is always the same length
+        # If not, then it's better to change metadata_lines to the number of lines that are "metadata"
+        metadata, scans, scan_times = load_scans(input_filepath, int(nr_gates))
+
+        # the scans outside the time window are dropped, the scenarios still count the scans of the file
+        kept = np.flatnonzero(self.in_window(scan_times))
+        file_scans = len(scans)
+        scans, scan_times = scans[kept], scan_times[kept]
+
+        # create the dimensions
+        output_dataset.createDimension('range', nr_gates)
+        output_dataset.createDimension('time', len(scans))
+
+        # create the coordinate variables
+        # range
+        range1 = output_dataset.createVariable('range', 'f4', ('range',))
+        range1.units = 'm'
+        range1.long_name = 'range_gate_distance_from_lidar'
+        if constant_gates:
+            range1[:] = np.full(nr_gates, float(range_gates))
+        else:
+            range1[:] = np.array(range_gates.split(';')).astype(float)
+        range1.comment = ''
+
+        # time
+        time = output_dataset.createVariable('time', 'f4', ('time',))
+        time.units = 's'
+        start_time_kv = metadata[4]
+        start_time_str = start_time_kv[start_time_kv.find('\t') + 1:start_time_kv.find('\n')]
+        start_time = np.datetime64(datetime.strptime(start_time_str, time_format))
+        time.long_name = 'seconds since ' + start_time_str
+        time_values = (scan_times - start_time) / np.timedelta64(1, 's')
+        time[:] = time_values
+        time.comment = ''
+
+        # create the data variables
+        scan_type = output_dataset.createVariable('scan_type', 'i', 'time')
+        scan_type.units = 'none'
+        scan_type.long_name = 'scan_type_of_the_measurement'
+
+        scan_id = output_dataset.createVariable('scan_id', 'i', 'time')
+        scan_id.units = 'none'
+        scan_id.long_name = 'scan_id_of_the_measurement'
+
+        create_variables(output_dataset, field(scans, azimuth_index, 0), field(scans, elevation_index, 0),
+                         np.zeros(len(scans)), field(scans, pitch_index, 0), field(scans, roll_index, 0),
+                         field(scans, doppler_index), field(scans, intensity_index))
+
+        invalid_scans = 0
+        scan_index = 1
+        scan_types = np.ma.masked_all(len(scans), dtype='i4')
+        scan_ids = np.ma.masked_all(len(scans), dtype='i4')
+
+        for s in measurement_scenarios:
+            long_name = s['scenario']
+            _type = int(s['type'])
+            records = s['scans']
+            if long_name == 'INVALID':
+                invalid_scans += len(scan_indexes(records, 0))
             else:
-                range1[:] = np.array(range_gates.split(';')).astype(float)
-            range1.comment = ''
-
-            # time
-            time = output_dataset.createVariable('time', 'f4', ('time',))
-            time.units = 's'
-            start_time_kv = metadata[4]
-            start_time_str = start_time_kv[start_time_kv.find('\t') + 1:start_time_kv.find('\n')]
-            start_time_seconds = process_time(start_time_str)
-            time.long_name = 'seconds since ' + start_time_str
-            # array manipulation to obtain timestamps
-            timestamps = (scans[:, :, time_index])[:, 0]
-            time[:] = np.array(list(map(lambda x: process_time(x) - start_time_seconds, timestamps)))
-            time.comment = ''
-
-            # create the data variables
-            scan_type = output_dataset.createVariable('scan_type', 'i', 'time')
-            scan_type.units = 'none'
-            scan_type.long_name = 'scan_type_of_the_measurement'
-
-            scan_id = output_dataset.createVariable('scan_id', 'i', 'time')
-            scan_id.units = 'none'
-            scan_id.long_name = 'scan_id_of_the_measurement'
-
-            create_variables(output_dataset, (scans[:, :, azimuth_index])[:, 0], (scans[:, :, elevation_index])[:, 0], np.zeros(len(scans)),
-                             (scans[:, :, pitch_index])[:, 0], (scans[:, :, roll_index])[:, 0],
-                             (scans[:, :, doppler_index]), (scans[:, :, intensity_index]))
-
-            invalid_scans = 0
-            scan_index = 1
-            for s in measurement_scenarios:
-                long_name = s['scenario']
-                _type = int(s['type'])
-                records = s['scans']
-                if long_name == 'INVALID':
-                    split_scans = records.split(';')
-                    for ss in split_scans:
-                        invalid_scans += int(ss.split('-')[1]) - int(ss.split('-')[0]) + 1
-                else:
-                    scan_group = output_dataset.createGroup('scan_' + str(scan_index) + '_' + long_name)
-                    _azimuth = np.zeros(len(scans))
-                    _elevation = np.zeros(len(scans))
-                    _yaw = np.zeros(len(scans))
-                    _pitch = np.zeros(len(scans))
-                    _roll = np.zeros(len(scans))
-                    _doppler = np.zeros(shape=[len(scans), int(nr_gates)])
-                    _intensity = np.zeros(shape=[len(scans), int(nr_gates)])
-                    split_scans = records.split(';')
-                    for ss in split_scans:
-                        initial_index = int(ss.split('-')[0]) - (invalid_scans + 1)
-                        final_index = int(ss.split('-')[1]) - (invalid_scans + 1)
-                        scan_type[initial_index:final_index + 1] = _type
-                        scan_id[initial_index:final_index + 1] = scan_index
-                        _azimuth[initial_index:final_index + 1] = scans[initial_index:final_index + 1, :, azimuth_index][:, 0]
-                        _elevation[initial_index:final_index + 1] = scans[initial_index:final_index + 1, :, elevation_index][:, 0]
-                        _pitch[initial_index:final_index + 1] = scans[initial_index:final_index + 1, :, pitch_index][:, 0]
-                        _roll[initial_index:final_index + 1] = scans[initial_index:final_index + 1, :, roll_index][:, 0]
-                        _doppler[initial_index:final_index + 1] = scans[initial_index:final_index + 1, :, doppler_index]
-                        _intensity[initial_index:final_index + 1] = scans[initial_index:final_index + 1, :, intensity_index]
-                    create_variables(scan_group, _azimuth, _elevation, _yaw, _pitch, _roll, _doppler, _intensity)
-                    scan_index += 1
-
-
+                indexes = scan_indexes(records, invalid_scans + 1)
+                indexes = indexes[(indexes >= 0) & (indexes < file_scans)]
+
+                # positions of the scenario scans among the kept scans
+                positions = np.searchsorted(kept, indexes)
+                found = positions < len(kept)
+                found[found] = kept[positions[found]] == indexes[found]
+                indexes = positions[found]
+
+                scan_types[indexes] = _type
+                scan_ids[indexes] = scan_index
+
+                # the group holds its own scans only, along its own time dimension
+                scan_group = output_dataset.createGroup('scan_' + str(scan_index) + '_' + long_name)
+                scan_group.createDimension('time', len(indexes))
+
+                group_time = scan_group.createVariable('time', 'f4', ('time',))
+                group_time.units = time.units
+                group_time.long_name = time.long_name
+                group_time[:] = time_values[indexes]
+                group_time.comment = ''
+
+                create_variables(scan_group, field(scans, azimuth_index, 0)[indexes],
+                                 field(scans, elevation_index, 0)[indexes], np.zeros(len(indexes)),
+                                 field(scans, pitch_index, 0)[indexes], field(scans, roll_index, 0)[indexes],
+                                 field(scans, doppler_index)[indexes], field(scans, intensity_index)[indexes])
+                scan_index += 1
+
+        scan_type[:] = scan_types
+        scan_id[:] = scan_ids
@@ -1,4 +1,7 @@
+from ..core.DataBatch import DataBatch
+from ..core.ColumnarReader import ColumnarReader
 from ..core.Reader import Reader
+from ..common.Records import parse_records
 from datetime import datetime
 import numpy as np
 import re
@@ -7,7 +10,7 @@ import os
 
 
 
-class Triton(Reader):
+class Triton(ColumnarReader):
 
     def __init__(self):
         super().__init__(False)
@@ -20,9 +23,7 @@ class Triton(Reader):
 
     @staticmethod
     def get_timestamp(input_filepath, row_of_timestamp = 0 ):
-        with open(input_filepath) as f:
-            line = f.readlines()[4 + row_of_timestamp]
-            
+        line = Reader.read_line(input_filepath, row_of_timestamp, header_lines=4)
 
         timestamp = datetime.strptime(line.split(';')[0], 
                                           '%d.%m.%Y %H:%M')
@@ -33,122 +34,54 @@ class Triton(Reader):
 
 
 
-    def read_to(self, output_dataset, input_filepaths, parameters, appending):
+    def read_batch(self, input_filepaths, parameters):
         wind_file = input_filepaths        
         
         with open(wind_file) as f:
-            wind_file_data = f.readlines()
-
-        wind_file_data = [row.strip().split(';') for row in wind_file_data]
-        wind_file_data_T = list(zip(*wind_file_data[4:]))
-
-
-        if not appending:
-
-            
-            range_list=[]
-            for column in wind_file_data[2]:
-                temp = re.findall('\d+(?=m)',column)
-                if len(temp) > 0:
-                    range_list.append(int(temp[0]))
-
-            range_list = list(set(range_list))
-            range_list.sort()
-            
-            # create the dimensions
-            output_dataset.createDimension('range', len(range_list))
-            output_dataset.createDimension('time', None)
-
-            # create the coordinate variables
-
-            # range
-            range1 = output_dataset.createVariable('range', 'f4', ('range',))
-            range1.units = 'm'
-            range1.long_name = 'range_gate_distance_from_lidar'
-            range1[:] = range_list
-            range1.comment = ''
-
-            # time
-            time = output_dataset.createVariable('time', str, ('time',))
-            time.units = 's'
-            time.long_name = 'seconds since 1904-01-01 12:00AM UTC'
-            time.comment = ''
-
-            # create the data variables
-            scan_type = output_dataset.createVariable('scan_type', 'i')
-            scan_type.units = 'none'
-            scan_type.long_name = 'scan_type_of_the_measurement'
-
-
-            # create the measurement variables VEL, Quality, WIDTH
-            VEL = output_dataset.createVariable('VEL', 'f4', ('time', 'range'))
-            VEL.units = 'm.s-1'
-            VEL.long_name = 'radial velocity'
-            VEL.comment = ''
-            VEL.accuracy = ''
-            VEL.accuracy_info = ''
-            
-            DIR = output_dataset.createVariable('DIR', 'f4', ('time', 'range'))
-            DIR.units = 'degrees north'
-            DIR.long_name = 'wind direction from north'
-            
-            
-            Quality = output_dataset.createVariable('Quality', 'f4', ('time', 'range'))
-            Quality.units = 'percent'
-            Quality.long_name = 'quality_value'
-            Quality.comment = ''
-            Quality.accuracy = ''
-            Quality.accuracy_info = ''
-
-            w = output_dataset.createVariable('w', 'f4', ('time', 'range'))
-            w.units = 'm.s-1'
-            w.long_name = 'vertical_wind_speed'
-            w.comment = ''
-            w.accuracy = ''
-            w.accuracy_info = ''
-            
-            #%% get timestamps in ISO 8601 format
-
-            timestamp_list = [datetime.strptime(value, '%d.%m.%Y %H:%M') for value in wind_file_data_T[0]]
-            timestamp_iso8601 = [value.isoformat()+'Z' for value in timestamp_list]
-            output_dataset.variables['time'][:] = np.array(timestamp_iso8601)
-
-            #%% read vel, width, Quality out of dataset
-            # e.g. radial velocity starts at 5th column and is then repeated every 9th column
-            
-            def str2float(astring):
-                if len(astring) > 0:
-                    return float(astring.replace(',','.'))
-                else:
-                    return 0
-
-            
-            output_dataset.variables['VEL'][:, :] = list(
-                zip(*[[str2float(value) for value in row] for row in wind_file_data_T[2:len(range_list)*4+1:4]]))
-            output_dataset.variables['DIR'][:, :] = list(
-                zip(*[[str2float(value) for value in row] for row in wind_file_data_T[1:len(range_list)*4+1:4]]))
-            output_dataset.variables['w'][:, :] = list(
-                zip(*[[str2float(value) for value in row] for row in wind_file_data_T[3:len(range_list)*4+1:4]]))
-            output_dataset.variables['Quality'][:, :] = list(
-                zip(*[[str2float(value) for value in row] for row in wind_file_data_T[4:len(range_list)*4+1:4]]))
-            
-        #%% case appending
-        else: 
-            ntime = len(output_dataset.dimensions["time"])
-            
-            timestamp_list = [datetime.strptime(value, '%d.%m.%Y %H:%M') for value in wind_file_data_T[0]]
-            timestamp_iso8601 = [value.isoformat()+'Z' for value in timestamp_list]
-            output_dataset.variables['time'][ntime:] = np.array(timestamp_iso8601)
-
-            # e.g. radial velocity starts at 5th column and is then repeated every 9th column
-            output_dataset.variables['VEL'][ntime:, :] = list(
-                zip(*[[str2float(value) for value in row] for row in wind_file_data_T[2:len(range_list)*4+1:4]]))
-            output_dataset.variables['DIR'][ntime:, :] = list(
-                zip(*[[str2float(value) for value in row] for row in wind_file_data_T[1:len(range_list)*4+1:4]]))
-            output_dataset.variables['w'][ntime:, :] = list(
-                zip(*[[str2float(value) for value in row] for row in wind_file_data_T[3:len(range_list)*4+1:4]]))
-            output_dataset.variables['Quality'][ntime:, :] = list(
-                zip(*[[str2float(value) for value in row] for row in wind_file_data_T[4:len(range_list)*4+1:4]]))
-
-
-
+            wind_file_data = f.read().splitlines()
+
+        range_list=[]
+        for column in wind_file_data[2].split(';'):
+            temp = re.findall(r'\d+(?=m)',column)
+            if len(temp) > 0:
+                range_list.append(int(temp[0]))
+
+        range_list = list(set(range_list))
+        range_list.sort()
+
+        # every range has a DIR, VEL, w and Quality column, in this order, after the timestamp
+        n = len(range_list)*4+1
+        columns = {'DIR': list(range(1, n, 4)), 'VEL': list(range(2, n, 4)),
+                   'w': list(range(3, n, 4)), 'Quality': list(range(4, n, 4))}
+        timestamps, records = parse_records(wind_file_data[4:], ';', columns, 0, '%d.%m.%Y %H:%M', decimal=',')
+
+        # the records outside the time window are dropped
+        keep = self.in_window(timestamps)
+        if not keep.all():
+            timestamps, records = timestamps[keep], {name: values[keep] for name, values in records.items()}
+
+        batch = DataBatch()
+
+        # create the dimensions
+        batch.add_dimension('range', len(range_list))
+        batch.add_dimension('time', None)
+
+        # create the coordinate variables
+        batch.add_variable('range', 'f4', ('range',), range_list,
+                           units='m', long_name='range_gate_distance_from_lidar', comment='')
+        batch.add_time(timestamps, long_name='seconds since 1904-01-01 12:00AM UTC', comment='')
+
+        # create the data variables
+        batch.add_variable('scan_type', 'i', units='none', long_name='scan_type_of_the_measurement')
+
+        # create the measurement variables VEL, Quality, WIDTH
+        batch.add_variable('VEL', 'f4', ('time', 'range'), records['VEL'], units='m.s-1', long_name='radial velocity',
+                           comment='', accuracy='', accuracy_info='')
+        batch.add_variable('DIR', 'f4', ('time', 'range'), records['DIR'], units='degrees north',
+                           long_name='wind direction from north')
+        batch.add_variable('Quality', 'f4', ('time', 'range'), records['Quality'], units='percent',
+                           long_name='quality_value', comment='', accuracy='', accuracy_info='')
+        batch.add_variable('w', 'f4', ('time', 'range'), records['w'], units='m.s-1', long_name='vertical_wind_speed',
+                           comment='', accuracy='', accuracy_info='')
+
+        return batch
@@ -1,10 +1,14 @@
 from ..core.Reader import Reader
+from ..common.Time import create_time_variable, encode_time
 from datetime import datetime
 import numpy as np
+import pandas as pd
 import os
 
 
 class WLS70(Reader):
+    filename_time_pattern = r'_(\d{4}_\d{2}_\d{2}__\d{2}_\d{2}_\d{2})'
+    filename_time_format = '%Y_%m_%d__%H_%M_%S'
 
     def __init__(self):
         super().__init__(False)
@@ -17,10 +21,13 @@ class WLS70(Reader):
     
     @staticmethod
     def get_timestamp(input_filepath, row_of_timestamp = 0 ):
-        with open(input_filepath) as f:
-            line = f.readlines()[17 * row_of_timestamp + 40: 
-                                    17 * row_of_timestamp + 46]
-            
+        # 39 header lines, then records of 17 lines (the date and time fields are the 2nd to 7th), then 1 line
+        if row_of_timestamp >= 0:
+            start = 17 * row_of_timestamp + 40
+        else:
+            start = 17 * row_of_timestamp
+        line = Reader.read_lines(input_filepath, start, 6)
+
         line = [int(value.strip()) for value in line]
         timestamp = datetime(*line)
 
@@ -28,20 +35,39 @@ class WLS70(Reader):
     
     
     
+    @staticmethod
+    def load_records(input_filepath):
+        """
+        Decodes the records of a file in one pass: one field per line, 17 fields per record,
+        between 39 header lines and 1 footer line. Fields that are not numbers become NaN.
+        :param input_filepath: file path
+        :return: (float matrix (records x 17 fields), datetime64 vector of the records, from fields 1 to 6)
+        """
+        with open(input_filepath) as f:
+            lines = f.read().splitlines()[39:-1]
+
+        records = pd.to_numeric(pd.Series(lines).str.strip(), errors='coerce').to_numpy(dtype=float)
+        records = records[:len(records) // 17 * 17].reshape(-1, 17)
+
+        date_fields = pd.DataFrame(records[:, 1:7], columns=['year', 'month', 'day', 'hour', 'minute', 'second'])
+        timestamps = pd.to_datetime(date_fields).to_numpy()
+
+        return records, timestamps
+
     def read_to(self, output_dataset, input_filepaths, parameters, appending):
         wind_file = input_filepaths
 
-        with open(wind_file) as f:
-            input_file_data = [line.strip() for line in f.readlines()]
-            
+        ordered_data, record_timestamps = self.load_records(wind_file)
+        range_list = np.unique(ordered_data[:,9]).astype(int)
+
+        # the records outside the time window are dropped
+        keep = self.in_window(record_timestamps)
+        if not keep.all():
+            ordered_data, record_timestamps = ordered_data[keep], record_timestamps[keep]
 
-        
-        ordered_data=np.reshape(np.array(input_file_data)[39:-1],(-1,17))
-        range_list = np.unique(ordered_data[:,9].astype(float)).astype(int)
-        
-        time_array = ordered_data[::len(range_list),1:7].astype(int)
-        datetime_array = [datetime(*line) for line in time_array]
-        iso8601_array = [date.isoformat()+'Z' for date in datetime_array]
+        # one record per time and range gate: views of shape (time, range) of the fields
+        timestamps = record_timestamps[::len(range_list)]
+        shape = (len(timestamps), len(range_list))
 
 
         if not appending:
@@ -49,21 +75,19 @@ class WLS70(Reader):
             output_dataset.createDimension('range', len(range_list))
             output_dataset.createDimension('time', None)
 
-            time = output_dataset.createVariable('time', str, ('time',))
-            time.units = 's'
-            time.long_name = 'Time UTC in ISO 8601 format yyyy-mm-ddThh:mm:ssZ'
+            time = create_time_variable(output_dataset, self.configs)
             time.comment = ''
-            time[:] = np.array(iso8601_array)
+            time[:] = encode_time(time, timestamps)
 
             T_internal = output_dataset.createVariable('T_internal', 'f4', ('time','range'))
             T_internal.units = 'degrees C'
             T_internal.long_name = 'temperature'
-            T_internal[:] = np.reshape(ordered_data[:,7].astype(float),(len(iso8601_array),len(range_list)))
+            T_internal[:] = ordered_data[:,7].reshape(shape)
             
             elevation_angle = output_dataset.createVariable('elevation_angle', 'f4', ('time','range'))
             elevation_angle.units = 'degrees'
             elevation_angle.long_name = 'elevation_angle_of_lidar beam'
-            elevation_angle[:] = np.reshape(ordered_data[:,8].astype(float),(len(iso8601_array),len(range_list)))
+            elevation_angle[:] = ordered_data[:,8].reshape(shape)
 
             range1 = output_dataset.createVariable('range', 'f4', ('range',))
             range1.units = 'm'
@@ -77,7 +101,7 @@ class WLS70(Reader):
             CNR.comment = ''
             CNR.accuracy = ''
             CNR.accuracy_info = ''
-            CNR[:] = np.reshape(ordered_data[:,10].astype(float),(len(iso8601_array),len(range_list)))
+            CNR[:] = ordered_data[:,10].reshape(shape)
             
             VEL = output_dataset.createVariable('VEL', 'f4', ('time', 'range'))
             VEL.units = 'm.s-1'
@@ -85,21 +109,22 @@ class WLS70(Reader):
             VEL.comment = ''
             VEL.accuracy = ''
             VEL.accuracy_info = ''
-            VEL[:] = np.reshape(ordered_data[:,11].astype(float),(len(iso8601_array),len(range_list)))
+            VEL[:] = ordered_data[:,11].reshape(shape)
             
             DIR = output_dataset.createVariable('DIR', 'f4', ('time', 'range'))
             DIR.units = 'degrees north'
             DIR.long_name = 'wind direction from north'
-            DIR[:] = np.reshape(ordered_data[:,12].astype(float),(len(iso8601_array),len(range_list)))
+            DIR[:] = ordered_data[:,12].reshape(shape)
             
         else: 
             ntime = len(output_dataset.dimensions["time"])
-            output_dataset.variables['time'][ntime:] = np.array(iso8601_array)
-            output_dataset.variables['T_internal'][ntime:] = np.reshape(ordered_data[:,7].astype(float) , (len(iso8601_array),len(range_list)))
-            output_dataset.variables['elevation_angle'][ntime:] = np.reshape(ordered_data[:,8].astype(float) , (len(iso8601_array),len(range_list)))
-            output_dataset.variables['CNR'][ntime:] = np.reshape(ordered_data[:,10].astype(float) , (len(iso8601_array),len(range_list)))
-            output_dataset.variables['VEL'][ntime:] = np.reshape(ordered_data[:,11].astype(float)  ,(len(iso8601_array),len(range_list)))        
-            output_dataset.variables['DIR'][ntime:] = np.reshape(ordered_data[:,12].astype(float),(len(iso8601_array),len(range_list)))
+            time = output_dataset.variables['time']
+            time[ntime:] = encode_time(time, timestamps)
+            output_dataset.variables['T_internal'][ntime:] = ordered_data[:,7].reshape(shape)
+            output_dataset.variables['elevation_angle'][ntime:] = ordered_data[:,8].reshape(shape)
+            output_dataset.variables['CNR'][ntime:] = ordered_data[:,10].reshape(shape)
+            output_dataset.variables['VEL'][ntime:] = ordered_data[:,11].reshape(shape)        
+            output_dataset.variables['DIR'][ntime:] = ordered_data[:,12].reshape(shape)
             
             
             
\ No newline at end of file
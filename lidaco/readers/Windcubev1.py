@@ -2,37 +2,38 @@ import datetime
 import numpy as np
 from pathlib import Path
 from ..core.Reader import Reader
+from ..common.Time import create_time_variable, encode_time
 import pandas as pd
 import os
 
 
 
 class Windcubev1(Reader):
+    filename_time_pattern = r'_(\d{4}_\d{2}_\d{2}__\d{2}_\d{2}_\d{2})'
+    filename_time_format = '%Y_%m_%d__%H_%M_%S'
+
+    # timestamp format of the first column, per filetype
+    time_formats = {'rtd': '%d/%m/%Y %H:%M:%S.%f', 'sta': '%d/%m/%Y %H:%M:%S'}
+
+    streams = True
+
     def __init__(self):
         super().__init__(False)
 
-    def parse_time(self, string1):
-        if self.parameters['filetype'] == 'rtd':
-            temp = datetime.datetime.strptime(string1,'%d/%m/%Y %H:%M:%S.%f')
-        else:
-            temp = datetime.datetime.strptime(string1,'%d/%m/%Y %H:%M:%S')
-        return temp.isoformat() + 'Z'
+    def parse_time(self, column):
+        """
+        Parses the timestamp column at once, with the format of the file type.
+        :param column: pandas Series of timestamp strings
+        :return: pandas Series of datetime64
+        """
+        return pd.to_datetime(column, format=Windcubev1.time_formats[self.parameters['filetype']])
     
     @staticmethod
     def get_timestamp(input_filepath, row_of_timestamp = 0 ):
         
-        with open(input_filepath) as f:
-            line = f.readlines()[57 + row_of_timestamp]
-            
-        filetype = input_filepath.split('.')[1]
-        
-        if filetype == 'rtd':
-            timestamp = datetime.strptime(line.split('\t')[0], 
-                                          '%d/%m/%Y %H:%M:%S.%f')
-            
-        elif filetype == 'sta':
-            timestamp = datetime.strptime(line.split('\t')[0], 
-                                          '%d/%m/%Y %H:%M:%S')
+        line = Reader.read_line(input_filepath, row_of_timestamp, header_lines=57, encoding='latin-1')
+        filetype = input_filepath[-3:]
+        timestamp = datetime.datetime.strptime(line.split('\t')[0], Windcubev1.time_formats[filetype])
             
         return timestamp
     
@@ -54,7 +55,12 @@ class Windcubev1(Reader):
     def output_filename(self, filename):
         return os.path.split(filename)[-1][:-4]
     
-    def load_file(self, input_filepath):
+    def read_header(self, input_filepath):
+        """
+        Reads the file header to self.parameters.
+        :param input_filepath: input file path
+        :return: number of header lines
+        """
         # read the file header and write to dict
 
         with open(input_filepath, encoding='latin-1') as f:
@@ -66,14 +72,33 @@ class Windcubev1(Reader):
         parameters['filetype'] = input_filepath[-3:]
         
         self.parameters = parameters
-        df = pd.read_csv(input_filepath, skiprows = header_length + 1, sep='\t', decimal='.', converters={0:self.parse_time}, encoding='cp1252', index_col = False)
+        return header_length
+
+    def prepare(self, df):
+        """
+        Parses the timestamps and derives the beam angles of the records read from the file.
+        :param df: pandas DataFrame of records, all of the file or a batch of it
+        :return: pandas DataFrame
+        """
+        df[df.columns[0]] = self.parse_time(df[df.columns[0]])
+        df = df[self.in_window(df[df.columns[0]])].reset_index(drop=True)
 
         if self.parameters['filetype'] == 'rtd':
             df['azimuth_angle'] = df.Position
-            df['elevation_angle'] = parameters['ScanAngle(°)']
+            df['elevation_angle'] = self.parameters['ScanAngle(°)']
             
         return df
 
+    def load_file(self, input_filepath):
+        header_length = self.read_header(input_filepath)
+        df = pd.read_csv(input_filepath, skiprows = header_length + 1, sep='\t', decimal='.', encoding='cp1252', index_col = False)
+        return self.prepare(df)
+
+    def read_batches(self, input_filepath, batch_rows):
+        header_length = self.read_header(input_filepath)
+        with pd.read_csv(input_filepath, skiprows = header_length + 1, sep='\t', decimal='.', encoding='cp1252', index_col = False, chunksize=batch_rows) as chunks:
+            for df in chunks:
+                yield self.prepare(df)
 
     def create_variables(self, output_dataset):
         output_dataset.createDimension('range', len(self.parameters['Altitudes(m)']))
@@ -88,9 +113,7 @@ class Windcubev1(Reader):
         range1[:] = np.array(self.parameters['Altitudes(m)'])
 
 
-        time = output_dataset.createVariable('time', str, ('time',))
-        time.units = 's'
-        time.long_name = 'Time UTC in ISO 8601 format yyyy-mm-ddThh:mm:ssZ'            
+        create_time_variable(output_dataset, self.configs)
 
         # create the beam steering and location variables
         yaw = output_dataset.createVariable('yaw', 'f4')
@@ -260,49 +283,49 @@ class Windcubev1(Reader):
 
 
 
-    def write_file(self, output_dataset, df):
+    def write_file(self, output_dataset, df, start=0):
         output_dataset.variables['scan_type'][:] = 2
         output_dataset.variables['accumulation_time'][:] = 1.0
         
         if self.parameters['filetype'] == 'rtd': # high resolution data
-            output_dataset.variables['time'][:] = df['Date'].values
-            output_dataset.variables['T_internal'][:] = df['Temperature (°C)'].values
-            output_dataset.variables['wiper_state'][:] = df['Wiper'].values
-            output_dataset.variables['azimuth_angle'][:] = df['azimuth_angle'].values
-            output_dataset.variables['elevation_angle'][:] = df['elevation_angle'].values
-            output_dataset.variables['WS'][:, :] = df.loc[:,['Vh-' in column for column in df.columns]]
-            output_dataset.variables['VEL'][:, :] = df.loc[:,['RWS-' in column for column in df.columns]]
-            output_dataset.variables['AZI'][:, :] = df.loc[:,['Azi ' in column for column in df.columns]]
-            output_dataset.variables['WIDTH'][:, :] = df.loc[:,['RWSD-' in column for column in df.columns]]
-            output_dataset.variables['CNR'][:, :] = df.loc[:,['CNR-' in column for column in df.columns]]
-            output_dataset.variables['u'][:, :] = df.loc[:,['u-' in column for column in df.columns]]
-            output_dataset.variables['v'][:, :] = df.loc[:,['v-' in column for column in df.columns]]
-            output_dataset.variables['w'][:, :] = df.loc[:,['w-' in column for column in df.columns]]
+            output_dataset.variables['time'][start:] = encode_time(output_dataset.variables['time'], df['Date'].values)
+            output_dataset.variables['T_internal'][start:] = df['Temperature (°C)'].values
+            output_dataset.variables['wiper_state'][start:] = df['Wiper'].values
+            output_dataset.variables['azimuth_angle'][start:] = df['azimuth_angle'].values
+            output_dataset.variables['elevation_angle'][start:] = df['elevation_angle'].values
+            output_dataset.variables['WS'][start:, :] = df.loc[:,['Vh-' in column for column in df.columns]]
+            output_dataset.variables['VEL'][start:, :] = df.loc[:,['RWS-' in column for column in df.columns]]
+            output_dataset.variables['AZI'][start:, :] = df.loc[:,['Azi ' in column for column in df.columns]]
+            output_dataset.variables['WIDTH'][start:, :] = df.loc[:,['RWSD-' in column for column in df.columns]]
+            output_dataset.variables['CNR'][start:, :] = df.loc[:,['CNR-' in column for column in df.columns]]
+            output_dataset.variables['u'][start:, :] = df.loc[:,['u-' in column for column in df.columns]]
+            output_dataset.variables['v'][start:, :] = df.loc[:,['v-' in column for column in df.columns]]
+            output_dataset.variables['w'][start:, :] = df.loc[:,['w-' in column for column in df.columns]]
 
 
 			# filetype == 'sta' # 10 minute mean values
         else:
-            output_dataset.variables['time'][:] = df['Date'].values
-            output_dataset.variables['T_internal'][:] = df['Tm'].values
-            output_dataset.variables['wiper'][:] = df['WiperCount'].values
-            output_dataset.variables['WS'][:, :] = df.loc[:,['Vhm' in column for column in df.columns]]
-            output_dataset.variables['WSstd'][:, :] = df.loc[:,['dVh' in column for column in df.columns]]
-            output_dataset.variables['WSmin'][:, :] = df.loc[:,['VhMin' in column for column in df.columns]]
-            output_dataset.variables['WSmax'][:, :] = df.loc[:,['VhMax' in column for column in df.columns]]
-            output_dataset.variables['DIR'][:, :] = df.loc[:,['Azim' in column for column in df.columns]]
-            output_dataset.variables['u'][:, :] = df.loc[:,['um' in column for column in df.columns]]
-            output_dataset.variables['ustd'][:, :] = df.loc[:,['du' in column for column in df.columns]]
-            output_dataset.variables['v'][:, :] = df.loc[:,['vm' in column for column in df.columns]]
-            output_dataset.variables['vstd'][:, :] = df.loc[:,['dv' in column for column in df.columns]]
-            output_dataset.variables['w'][:, :] = df.loc[:,['wm' in column for column in df.columns]]
-            output_dataset.variables['wstd'][:, :] = df.loc[:,['dw' in column for column in df.columns]]
-            output_dataset.variables['CNR'][:, :] = df.loc[:,[(('CNRm' in column) & ('CNRmax' not in column) & ('CNRmin' not in column) ) for column in df.columns]]
-            output_dataset.variables['CNRstd'][:, :] = df.loc[:,['dCNR' in column for column in df.columns]]
-            output_dataset.variables['CNRmax'][:, :] = df.loc[:,['CNRmax' in column for column in df.columns]]
-            output_dataset.variables['CNRmin'][:, :] = df.loc[:,['CNRmin' in column for column in df.columns]]
-            output_dataset.variables['WIDTH'][:, :] = df.loc[:,[(('spectral broedening' in column) & ('dspectral broedening' not in column)) for column in df.columns]]
-            output_dataset.variables['WIDTHstd'][:, :] = df.loc[:,['dspectral broedening' in column for column in df.columns]]
-            output_dataset.variables['Availability'][:, :] = df.loc[:,['Avail' in column for column in df.columns]]
+            output_dataset.variables['time'][start:] = encode_time(output_dataset.variables['time'], df['Date'].values)
+            output_dataset.variables['T_internal'][start:] = df['Tm'].values
+            output_dataset.variables['wiper'][start:] = df['WiperCount'].values
+            output_dataset.variables['WS'][start:, :] = df.loc[:,['Vhm' in column for column in df.columns]]
+            output_dataset.variables['WSstd'][start:, :] = df.loc[:,['dVh' in column for column in df.columns]]
+            output_dataset.variables['WSmin'][start:, :] = df.loc[:,['VhMin' in column for column in df.columns]]
+            output_dataset.variables['WSmax'][start:, :] = df.loc[:,['VhMax' in column for column in df.columns]]
+            output_dataset.variables['DIR'][start:, :] = df.loc[:,['Azim' in column for column in df.columns]]
+            output_dataset.variables['u'][start:, :] = df.loc[:,['um' in column for column in df.columns]]
+            output_dataset.variables['ustd'][start:, :] = df.loc[:,['du' in column for column in df.columns]]
+            output_dataset.variables['v'][start:, :] = df.loc[:,['vm' in column for column in df.columns]]
+            output_dataset.variables['vstd'][start:, :] = df.loc[:,['dv' in column for column in df.columns]]
+            output_dataset.variables['w'][start:, :] = df.loc[:,['wm' in column for column in df.columns]]
+            output_dataset.variables['wstd'][start:, :] = df.loc[:,['dw' in column for column in df.columns]]
+            output_dataset.variables['CNR'][start:, :] = df.loc[:,[(('CNRm' in column) & ('CNRmax' not in column) & ('CNRmin' not in column) ) for column in df.columns]]
+            output_dataset.variables['CNRstd'][start:, :] = df.loc[:,['dCNR' in column for column in df.columns]]
+            output_dataset.variables['CNRmax'][start:, :] = df.loc[:,['CNRmax' in column for column in df.columns]]
+            output_dataset.variables['CNRmin'][start:, :] = df.loc[:,['CNRmin' in column for column in df.columns]]
+            output_dataset.variables['WIDTH'][start:, :] = df.loc[:,[(('spectral broedening' in column) & ('dspectral broedening' not in column)) for column in df.columns]]
+            output_dataset.variables['WIDTHstd'][start:, :] = df.loc[:,['dspectral broedening' in column for column in df.columns]]
+            output_dataset.variables['Availability'][start:, :] = df.loc[:,['Avail' in column for column in df.columns]]
 
     
     def read_to(self, output_dataset, input_filepath, configs, appending):
@@ -315,6 +338,19 @@ class Windcubev1(Reader):
             print(err)
             with open(Path(output_dataset.filepath()).parent / 'error.log','a') as logfile:
                 logfile.write( '%s'%output_dataset.filepath() +'\n')
-                
-                
 
+    def stream_to(self, output_dataset, input_filepath, configs, appending, batch_size):
+        try:
+            super().stream_to(output_dataset, input_filepath, configs, appending, batch_size)
+        except Exception as err:
+            print('Error ocurred while converting %s. See error.log for details.' % input_filepath)
+            print(err)
+            with open(Path(output_dataset.filepath()).parent / 'error.log','a') as logfile:
+                logfile.write( '%s'%output_dataset.filepath() +'\n')
+
+    def write_batch(self, output_dataset, df, configs, appending):
+        if not appending:
+            self.create_variables(output_dataset)
+
+        if len(df) > 0:
+            self.write_file(output_dataset, df, len(output_dataset.dimensions['time']))
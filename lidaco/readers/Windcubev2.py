@@ -1,6 +1,7 @@
 import numpy as np
 from pathlib import Path
 from ..core.Reader import Reader
+from ..common.Time import create_time_variable, encode_time
 from datetime import datetime
 import pandas as pd
 import os
@@ -8,6 +9,13 @@ import os
 
 
 class Windcubev2(Reader):
+    filename_time_pattern = r'_(\d{4}_\d{2}_\d{2}__\d{2}_\d{2}_\d{2})'
+    filename_time_format = '%Y_%m_%d__%H_%M_%S'
+
+    # timestamp format of the first column, per filetype
+    time_formats = {'rtd': '%Y/%m/%d %H:%M:%S.%f', 'sta': '%Y/%m/%d %H:%M'}
+
+    streams = True
 
     def __init__(self):
         super().__init__(False)
@@ -27,28 +35,20 @@ class Windcubev2(Reader):
     def output_filename(self, filename):
         return os.path.split(filename)[-1][:-4]
     
-    def parse_time(self, string1):
-        if self.parameters['filetype'] == 'rtd':
-            temp = datetime.strptime(string1,'%Y/%m/%d %H:%M:%S.%f')
-        else:
-            temp = datetime.strptime(string1,'%Y/%m/%d %H:%M')
-        return temp.isoformat() + 'Z'
+    def parse_time(self, column):
+        """
+        Parses the timestamp column at once, with the format of the file type.
+        :param column: pandas Series of timestamp strings
+        :return: pandas Series of datetime64
+        """
+        return pd.to_datetime(column, format=Windcubev2.time_formats[self.parameters['filetype']])
         
     
     @staticmethod
     def get_timestamp(input_filepath, row_of_timestamp = 0 ):
-        with open(input_filepath) as f:
-            line = f.readlines()[42 + row_of_timestamp]
-            
-        filetype = input_filepath.split('.')[1]
-        
-        if filetype == 'rtd':
-            timestamp = datetime.strptime(line.split('\t')[0], 
-                                          '%Y/%m/%d %H:%M:%S.%f')
-            
-        elif filetype == 'sta':
-            timestamp = datetime.strptime(line.split('\t')[0], 
-                                          '%Y/%m/%d %H:%M')
+        line = Reader.read_line(input_filepath, row_of_timestamp, header_lines=42, encoding='latin-1')
+        filetype = input_filepath[-3:]
+        timestamp = datetime.strptime(line.split('\t')[0], Windcubev2.time_formats[filetype])
             
         return timestamp
     
@@ -67,7 +67,12 @@ class Windcubev2(Reader):
             return 90 - self.parameters['ScanAngle (°)']
         
 
-    def load_file(self, input_filepath):
+    def read_header(self, input_filepath):
+        """
+        Reads the file header to self.parameters.
+        :param input_filepath: input file path
+        :return: number of header lines
+        """
         # read the file header and write to dict
 
         with open(input_filepath, encoding='latin-1') as f:
@@ -79,8 +84,16 @@ class Windcubev2(Reader):
         parameters['filetype'] = input_filepath[-3:]
         
         self.parameters = parameters
-        
-        df = pd.read_csv(input_filepath, skiprows = header_length + 1, sep='\t', decimal='.', converters={0:self.parse_time}, encoding='cp1252', index_col = False)
+        return header_length
+
+    def prepare(self, df):
+        """
+        Parses the timestamps and derives the beam angles of the records read from the file.
+        :param df: pandas DataFrame of records, all of the file or a batch of it
+        :return: pandas DataFrame
+        """
+        df[df.columns[0]] = self.parse_time(df[df.columns[0]])
+        df = df[self.in_window(df[df.columns[0]])].reset_index(drop=True)
 
         if self.parameters['filetype'] == 'rtd':
             df['azimuth_angle']=df.Position.apply(self.parse_azimuth)
@@ -88,6 +101,17 @@ class Windcubev2(Reader):
     
         return df
 
+    def load_file(self, input_filepath):
+        header_length = self.read_header(input_filepath)
+        df = pd.read_csv(input_filepath, skiprows = header_length + 1, sep='\t', decimal='.', encoding='cp1252', index_col = False)
+        return self.prepare(df)
+
+    def read_batches(self, input_filepath, batch_rows):
+        header_length = self.read_header(input_filepath)
+        with pd.read_csv(input_filepath, skiprows = header_length + 1, sep='\t', decimal='.', encoding='cp1252', index_col = False, chunksize=batch_rows) as chunks:
+            for df in chunks:
+                yield self.prepare(df)
+
     def create_variables(self, output_dataset):
         output_dataset.createDimension('range', len(self.parameters['Altitudes (m)']))
         output_dataset.createDimension('time', None)
@@ -98,9 +122,7 @@ class Windcubev2(Reader):
         range1.long_name = 'range_gate_distance_from_lidar'
         range1[:] = np.array(self.parameters['Altitudes (m)'])
 
-        time = output_dataset.createVariable('time', str, ('time',))
-        time.units = 's'
-        time.long_name = 'Time UTC in ISO 8601 format yyyy-mm-ddThh:mm:ssZ'
+        create_time_variable(output_dataset, self.configs)
 
         # create the beam steering and location variables
         yaw = output_dataset.createVariable('yaw', 'f4')
@@ -262,45 +284,46 @@ class Windcubev2(Reader):
 
 
 
-    def write_file(self, output_dataset, df):
+    def write_file(self, output_dataset, df, start=0):
         output_dataset.variables['scan_type'][:] = 2
         output_dataset.variables['accumulation_time'][:] = 1.0
         
         if self.parameters['filetype'] == 'rtd': # high resolution data
-            output_dataset.variables['time'][:] = df['Timestamp'].values
-            output_dataset.variables['T_internal'][:] = df['Temperature'].values
-            output_dataset.variables['wiper'][:] = df['Wiper Count'].values
-            output_dataset.variables['azimuth_angle'][:] = df['azimuth_angle'].values
-            output_dataset.variables['elevation_angle'][:] = df['elevation_angle'].values
-            output_dataset.variables['WS'][:, :] = df.loc[:,['m Wind Speed (m/s)' in column for column in df.columns]]
-            output_dataset.variables['DIR'][:, :] = df.loc[:,['Wind Direction (°)' in column for column in df.columns]]
-            output_dataset.variables['VEL'][:, :] = df.loc[:,['Radial Wind Speed (m/s)' in column for column in df.columns]]
-            output_dataset.variables['WIDTH'][:, :] = df.loc[:,['Radial Wind Speed Dispersion (m/s)' in column for column in df.columns]]
-            output_dataset.variables['CNR'][:, :] = df.loc[:,['CNR (dB)' in column for column in df.columns]]
-            output_dataset.variables['u'][:, :] = df.loc[:,['X-wind (m/s)' in column for column in df.columns]]
-            output_dataset.variables['v'][:, :] = df.loc[:,['Y-wind (m/s)' in column for column in df.columns]]
-            output_dataset.variables['w'][:, :] = df.loc[:,['Z-wind (m/s)' in column for column in df.columns]]
+            output_dataset.variables['time'][start:] = encode_time(output_dataset.variables['time'], df['Timestamp'].values)
+            output_dataset.variables['T_internal'][start:] = df['Temperature'].values
+            output_dataset.variables['wiper'][start:] = df['Wiper Count'].values
+            output_dataset.variables['azimuth_angle'][start:] = df['azimuth_angle'].values
+            output_dataset.variables['elevation_angle'][start:] = df['elevation_angle'].values
+            output_dataset.variables['WS'][start:, :] = df.loc[:,['m Wind Speed (m/s)' in column for column in df.columns]]
+            output_dataset.variables['DIR'][start:, :] = df.loc[:,['Wind Direction (°)' in column for column in df.columns]]
+            output_dataset.variables['VEL'][start:, :] = df.loc[:,['Radial Wind Speed (m/s)' in column for column in df.columns]]
+            output_dataset.variables['WIDTH'][start:, :] = df.loc[:,['Radial Wind Speed Dispersion (m/s)' in column for column in df.columns]]
+            output_dataset.variables['CNR'][start:, :] = df.loc[:,['CNR (dB)' in column for column in df.columns]]
+            output_dataset.variables['u'][start:, :] = df.loc[:,['X-wind (m/s)' in column for column in df.columns]]
+            output_dataset.variables['v'][start:, :] = df.loc[:,['Y-wind (m/s)' in column for column in df.columns]]
+            output_dataset.variables['w'][start:, :] = df.loc[:,['Z-wind (m/s)' in column for column in df.columns]]
 
             
 			# filetype == 'sta' # 10 minute mean values
         else:
-            output_dataset.variables['time'][:] = df['Timestamp (end of interval)'].values
-            output_dataset.variables['T_internal'][:] = df['Int Temp (°C)'].values
-            output_dataset.variables['T_external'][:] = df['Ext Temp (°C)'].values
-            output_dataset.variables['p'][:] = df['Pressure (hPa)'].values
-            output_dataset.variables['Rh'][:] = df['Rel Humidity (%)'].values
-            output_dataset.variables['wiper'][:] = df['Wiper count'].values
-            output_dataset.variables['WS'][:, :] = df.loc[:,['Wind Speed (m/s)' in column for column in df.columns]]
-            output_dataset.variables['WSstd'][:, :] = df.loc[:,['Wind Speed Dispersion (m/s)' in column for column in df.columns]]
-            output_dataset.variables['WSmin'][:, :] = df.loc[:,['Wind Speed min (m/s)' in column for column in df.columns]]
-            output_dataset.variables['WSmax'][:, :] = df.loc[:,['Wind Speed max (m/s)' in column for column in df.columns]]
-            output_dataset.variables['DIR'][:, :] = df.loc[:,['Wind Direction (°)' in column for column in df.columns]]
-            output_dataset.variables['w'][:, :] = df.loc[:,['Z-wind (m/s)' in column for column in df.columns]]
-            output_dataset.variables['wstd'][:, :] = df.loc[:,['Z-wind Dispersion (m/s)' in column for column in df.columns]]
-            output_dataset.variables['CNR'][:, :] = df.loc[:,['CNR (dB)' in column for column in df.columns]]
-            output_dataset.variables['CNRmin'][:, :] = df.loc[:,['CNR min (dB)' in column for column in df.columns]]
-            output_dataset.variables['WIDTH'][:, :] = df.loc[:,['Dopp Spect Broad (m/s)' in column for column in df.columns]]
-            output_dataset.variables['Availability'][:, :] = df.loc[:,['Data Availability (%)' in column for column in df.columns]]
+            output_dataset.variables['time'][start:] = encode_time(output_dataset.variables['time'],
+                                                                   df['Timestamp (end of interval)'].values)
+            output_dataset.variables['T_internal'][start:] = df['Int Temp (°C)'].values
+            output_dataset.variables['T_external'][start:] = df['Ext Temp (°C)'].values
+            output_dataset.variables['p'][start:] = df['Pressure (hPa)'].values
+            output_dataset.variables['Rh'][start:] = df['Rel Humidity (%)'].values
+            output_dataset.variables['wiper'][start:] = df['Wiper count'].values
+            output_dataset.variables['WS'][start:, :] = df.loc[:,['Wind Speed (m/s)' in column for column in df.columns]]
+            output_dataset.variables['WSstd'][start:, :] = df.loc[:,['Wind Speed Dispersion (m/s)' in column for column in df.columns]]
+            output_dataset.variables['WSmin'][start:, :] = df.loc[:,['Wind Speed min (m/s)' in column for column in df.columns]]
+            output_dataset.variables['WSmax'][start:, :] = df.loc[:,['Wind Speed max (m/s)' in column for column in df.columns]]
+            output_dataset.variables['DIR'][start:, :] = df.loc[:,['Wind Direction (°)' in column for column in df.columns]]
+            output_dataset.variables['w'][start:, :] = df.loc[:,['Z-wind (m/s)' in column for column in df.columns]]
+            output_dataset.variables['wstd'][start:, :] = df.loc[:,['Z-wind Dispersion (m/s)' in column for column in df.columns]]
+            output_dataset.variables['CNR'][start:, :] = df.loc[:,['CNR (dB)' in column for column in df.columns]]
+            output_dataset.variables['CNRmin'][start:, :] = df.loc[:,['CNR min (dB)' in column for column in df.columns]]
+            output_dataset.variables['WIDTH'][start:, :] = df.loc[:,['Dopp Spect Broad (m/s)' in column for column in df.columns]]
+            output_dataset.variables['Availability'][start:, :] = df.loc[:,['Data Availability (%)' in column for column in df.columns]]
             
     def read_to(self, output_dataset, input_filepath, configs, appending):
         try:
@@ -313,4 +336,19 @@ class Windcubev2(Reader):
             print(err)
             with open(Path(output_dataset.filepath()).parent / 'error.log','a') as logfile:
                 logfile.write( '%s'%output_dataset.filepath() +'\n')
-                    
+
+    def stream_to(self, output_dataset, input_filepath, configs, appending, batch_size):
+        try:
+            super().stream_to(output_dataset, input_filepath, configs, appending, batch_size)
+        except Exception as err:
+            print('Error ocurred while converting %s. See error.log for details.' % input_filepath)
+            print(err)
+            with open(Path(output_dataset.filepath()).parent / 'error.log','a') as logfile:
+                logfile.write( '%s'%output_dataset.filepath() +'\n')
+
+    def write_batch(self, output_dataset, df, configs, appending):
+        if not appending:
+            self.create_variables(output_dataset)
+
+        if len(df) > 0:
+            self.write_file(output_dataset, df, len(output_dataset.dimensions['time']))
@@ -1,20 +1,88 @@
 from ..core.Reader import Reader
 from ..common.Logger import Logger
+from ..common.Time import create_time_variable, encode_time, from_seconds
 from datetime import datetime, timedelta
 import numpy as np
 import os
 
 
 class Windscanner(Reader):
+    # the filenames hold the time the file was closed, by a clock that may differ from the records' one
+    # (see the Kassel samples): the time window is checked against the first record instead
+    filename_time_pattern = None
+
     def __init__(self):
         super().__init__(False)
 
     @staticmethod
-    def try_cast(variable, dtype=float):
+    def read_rows(file_path):
+        """
+        Reads a ;-separated file.
+        :param file_path: _wind.txt or _system.txt file path
+        :return: (stripped rows, number of columns in each row)
+        """
+        with open(file_path) as f:
+            rows = [row.strip() for row in f.read().splitlines()]
+
+        columns_in_row = np.array([row.count(';') + 1 for row in rows])
+        return rows, columns_in_row
+
+    @staticmethod
+    def parse_rows(rows, usecols=None):
+        """
+        Decodes rows with the same number of columns into a 2-D float array in one pass.
+        If a cell is malformed, the (slower) tolerant parser is used and the malformed cells become NaN.
+        :param rows: ;-separated rows
+        :param usecols: indexes of the columns to decode, None for all of them
+        :return: float array (rows x columns)
+        """
+        if len(rows) == 0:
+            return np.empty((0, 0 if usecols is None else len(usecols)))
+
         try:
-            return dtype(variable)
-        except Exception:
-            return np.nan
+            return np.loadtxt(rows, delimiter=';', dtype=float, usecols=usecols, ndmin=2)
+        except ValueError:
+            data = np.genfromtxt(rows, delimiter=';', dtype=float, usecols=usecols)
+            return data.reshape(len(rows), -1)
+
+    def load_files(self, wind_file, system_file):
+        """
+        Loads a _wind.txt file and its _system.txt file. The rows whose column count differs from the
+        median (i.e. corrupt rows) are dropped, in the system file too, to keep both files aligned.
+        The system data is cut (or padded with NaN) to the number of wind records.
+        :param wind_file: _wind.txt file path
+        :param system_file: _system.txt file path
+        :return: (wind data, system data) float arrays (rows x columns). Only the roll and pitch
+        columns of the system file are decoded, the others are NaN.
+        """
+        wind_rows, wind_columns = self.read_rows(wind_file)
+        system_rows, system_columns = self.read_rows(system_file)
+
+        # check if file is corrupt by comparing the count of columns in each row
+        wind_valid = wind_columns == int(np.median(wind_columns))
+        system_valid = system_columns == int(np.median(system_columns))
+
+        if len(wind_rows) == len(system_rows):
+            wind_valid = system_valid = wind_valid & system_valid
+
+        if not wind_valid.all():
+            Logger.warn('file_corrupt', os.path.split(wind_file)[1])
+
+        wind_rows = [row for row, valid in zip(wind_rows, wind_valid) if valid]
+        system_rows = [row for row, valid in zip(system_rows, system_valid) if valid]
+
+        wind_data = self.parse_rows(wind_rows)
+        system_data = np.full((len(system_rows), int(np.median(system_columns))), np.nan)
+        system_data[:, [7, 8]] = self.parse_rows(system_rows, usecols=(7, 8))
+
+        # one system record per wind record: the system file may hold more (or fewer) records
+        if system_data.shape[0] != wind_data.shape[0]:
+            aligned = np.full((wind_data.shape[0], system_data.shape[1]), np.nan)
+            records = min(wind_data.shape[0], system_data.shape[0])
+            aligned[:records] = system_data[:records]
+            system_data = aligned
+
+        return wind_data, system_data
 
     def accepts_file(self, filename):
         return filename.endswith('wind.txt') & (len(filename) > 14)
@@ -22,12 +90,13 @@ class Windscanner(Reader):
     def output_filename(self, timestamp):
         return os.path.split(timestamp)[-1][:-9]
     
+    def related_files(self, filename):
+        return [filename[:filename.find('_wind.txt')] + '_system.txt']
+
     def get_timestamp(self, input_filepath, row_of_timestamp = 0 ):
         start_date = datetime(1904,1,1)
         
-        with open(input_filepath) as f:
-            line = f.readlines()[row_of_timestamp]
-            
+        line = self.read_line(input_filepath, row_of_timestamp)
         timestamp_seconds = float(line.split(';')[4])
         timestamp = start_date + timedelta(seconds=timestamp_seconds)
         
@@ -38,34 +107,19 @@ class Windscanner(Reader):
         wind_file = input_filepaths
         system_file = wind_file[:wind_file.find('_wind.txt')] + '_system.txt'
 
-        with open(wind_file) as f:
-            wind_file_data = f.readlines()
+        wind_file_data, system_file_data = self.load_files(wind_file, system_file)
 
-        with open(system_file) as f:
-            system_file_data = f.readlines()
+        # the columns range, VEL, CNR and WIDTH are repeated for every range gate
+        index_columns = 4 - (wind_file_data.shape[1] % 4)
+        range_list = wind_file_data[0, index_columns + 4::4]
 
-        wind_file_data = [row.strip().split(';') for row in wind_file_data]
-        system_file_data = [row.strip().split(';') for row in system_file_data]
-
-        # check if file is corrupt by comparing the count of columns in each row
-        columns_in_row = [len(row) for row in wind_file_data]
-        median_columns = int(np.median(columns_in_row))
-        column_differs = np.not_equal(columns_in_row, median_columns)
-        any_column_differs = any(column_differs)
-        
-    
-        if any_column_differs:
-            wind_file_data = [row for row in wind_file_data if (len(row) == median_columns)]
-            system_file_data = [row for row in system_file_data if (len(row) == median_columns)]
-            Logger.warn('file_corrupt', os.path.split(wind_file)[1] )
-
-        wind_file_data = list(zip(*wind_file_data))
-        system_file_data = list(zip(*system_file_data))
+        # timestamps (whole seconds since 1904-01-01), the records outside the time window are dropped
+        timestamps = from_seconds(np.trunc(wind_file_data[:, index_columns]))
+        keep = self.in_window(timestamps)
+        if not keep.all():
+            wind_file_data, system_file_data, timestamps = wind_file_data[keep], system_file_data[keep], timestamps[keep]
 
         if not appending:
-            index_columns = 4 - (len(wind_file_data) % 4)
-            range_list = [float(row[0]) 
-                            for row in wind_file_data[index_columns + 4::4]]
 
             # create the dimensions
             output_dataset.createDimension('range', len(range_list))
@@ -81,9 +135,7 @@ class Windscanner(Reader):
             range1.comment = ''
 
             # time
-            time = output_dataset.createVariable('time', str, ('time',))
-            time.units = 's'
-            time.long_name = 'Time UTC in ISO 8601 format yyyy-mm-ddThh:mm:ssZ'
+            time = create_time_variable(output_dataset, self.configs)
             time.comment = ''
 
             # create the data variables
@@ -176,31 +228,19 @@ class Windscanner(Reader):
 
 
 
-            #%% get timestamps in ISO 8601 format
-            start_date = datetime(1904, 1, 1)
-            timestamp_seconds = [int(float(value.strip())) 
-                                    for value in wind_file_data[index_columns]]
-            
-            timestamp_iso8601 = [(start_date +
-                                  timedelta(seconds=value)).isoformat()+'Z' 
-                                    for value in timestamp_seconds]
-            
-            output_dataset.variables['time'][:] = np.array(timestamp_iso8601)
+            output_dataset.variables['time'][:] = encode_time(time, timestamps)
             
             #%% calculate azimuth and elevation sweeps
-            azimuth_angle_temp = [float(value) for value in wind_file_data[6]]
+            azimuth_angle_temp = wind_file_data[:, 6]
             
-            elevation_angle_temp = [float(value) 
-                                    for value in wind_file_data[7]]
+            elevation_angle_temp = wind_file_data[:, 7]
             
-            azimuth_sweep_temp = np.insert(np.abs(np.diff(azimuth_angle_temp)),
-                                           0, np.nan)
+            azimuth_sweep_temp = np.abs(np.diff(azimuth_angle_temp, prepend=np.nan))
             
-            elevation_sweep_temp = np.insert(np.abs(
-                                    np.diff(elevation_angle_temp)),0,np.nan)
+            elevation_sweep_temp = np.abs(np.diff(elevation_angle_temp, prepend=np.nan))
 
-            roll_temp = [float(value) for value in system_file_data[7]]
-            pitch_temp = [float(value) for value in system_file_data[8]]
+            roll_temp = system_file_data[:, 7]
+            pitch_temp = system_file_data[:, 8]
 
 
 
@@ -254,69 +294,47 @@ class Windscanner(Reader):
             #%% read vel, width, cnr out of dataset
             # e.g. radial velocity starts at 5th column 
             # and is then repeated every 9th column
-            output_dataset.variables['VEL'][:, :] = list(
-                zip(*[[float(value) for value in row] 
-                for row in wind_file_data[index_columns + 5::4]]))
+            output_dataset.variables['VEL'][:, :] = wind_file_data[:, index_columns + 5::4]
                 
-            output_dataset.variables['CNR'][:, :] = list(
-                zip(*[[float(value) for value in row] 
-                for row in wind_file_data[index_columns + 6::4]]))
+            output_dataset.variables['CNR'][:, :] = wind_file_data[:, index_columns + 6::4]
                 
-            output_dataset.variables['WIDTH'][:, :] = list(
-                zip(*[[float(value) for value in row] 
-                for row in wind_file_data[index_columns + 7::4]]))
+            output_dataset.variables['WIDTH'][:, :] = wind_file_data[:, index_columns + 7::4]
             
         #%% case appending
         else: 
-            index_columns = 4 - (len(wind_file_data) % 4)
             ntime = len(output_dataset.dimensions["time"])
             nrange = len(output_dataset.dimensions["range"])
 
-            if nrange != len(wind_file_data[index_columns + 5::4]):
+            if nrange != wind_file_data[:, index_columns + 5::4].shape[1]:
                 Logger.warn('file_corrupt', os.path.split(wind_file)[1])
                 return
             
-            start_date = datetime(1904,1,1)
-            timestamp_seconds = [int(float(value.strip())) 
-                                for value in wind_file_data[index_columns]]
+            time = output_dataset.variables['time']
+            time[ntime:] = encode_time(time, timestamps)
             
-            timestamp_iso8601 = [ (start_date + 
-                                   timedelta(seconds=value)).isoformat()+'Z' 
-                                    for value in timestamp_seconds]
-            
-            
-            output_dataset.variables['time'][ntime:] = np.array(timestamp_iso8601)
-            
-            azimuth_angle_temp = [float(value) for value in wind_file_data[6]]
+            azimuth_angle_temp = wind_file_data[:, 6]
 
-            azimuth_sweep_temp = np.insert(np.abs(np.diff(azimuth_angle_temp)),0,np.nan)
+            azimuth_sweep_temp = np.abs(np.diff(azimuth_angle_temp, prepend=np.nan))
 
             output_dataset.variables['azimuth_angle'][ntime:] = azimuth_angle_temp
             output_dataset.variables['azimuth_sweep'][ntime:] = azimuth_sweep_temp
 
 
-            elevation_angle_temp = [float(value) for value in wind_file_data[7]]
+            elevation_angle_temp = wind_file_data[:, 7]
 
-            elevation_sweep_temp = np.insert(np.abs(np.diff(elevation_angle_temp)),0,np.nan)
+            elevation_sweep_temp = np.abs(np.diff(elevation_angle_temp, prepend=np.nan))
 
             output_dataset.variables['elevation_angle'][ntime:] = elevation_angle_temp
             output_dataset.variables['elevation_sweep'][ntime:] = elevation_sweep_temp
 
-            roll_temp = [float(value) for value in system_file_data[7]]
-            pitch_temp = [float(value) for value in system_file_data[8]]
-            output_dataset.variables['roll_angle'][:] = roll_temp
-            output_dataset.variables['pitch_angle'][:] = pitch_temp
+            roll_temp = system_file_data[:, 7]
+            pitch_temp = system_file_data[:, 8]
+            output_dataset.variables['roll_angle'][ntime:] = roll_temp
+            output_dataset.variables['pitch_angle'][ntime:] = pitch_temp
 
 
-            output_dataset.variables['VEL'][ntime:, :] = list(
-                    zip(*[[self.try_cast(value, float) for value in row]
-                    for row in wind_file_data[index_columns + 5::4]]))
+            output_dataset.variables['VEL'][ntime:, :] = wind_file_data[:, index_columns + 5::4]
 
-                
-            output_dataset.variables['CNR'][ntime:, :] = list(
-                    zip(*[[self.try_cast(value, float) for value in row]
-                    for row in wind_file_data[index_columns + 6::4]]))
+            output_dataset.variables['CNR'][ntime:, :] = wind_file_data[:, index_columns + 6::4]
             
-            output_dataset.variables['WIDTH'][ntime:, :] = list(
-                    zip(*[[self.try_cast(value, float) for value in row]
-                    for row in wind_file_data[index_columns + 7::4]]))
+            output_dataset.variables['WIDTH'][ntime:, :] = wind_file_data[:, index_columns + 7::4]
@@ -1,5 +1,6 @@
 import numpy as np
 from ..core.Reader import Reader
+from ..common.Time import create_time_variable, encode_time
 from datetime import datetime
 import pandas as pd
 import re
@@ -7,6 +8,10 @@ from pathlib import Path
 import os
 
 class ZephIR300(Reader):
+    filename_time_pattern = r'@Y(\d{4}_M\d{2}_D\d{2})'
+    filename_time_format = '%Y_M%m_D%d'
+    # timestamp formats found in the 'Time and Date' column
+    time_formats = ['%d.%m.%Y %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%d.%m.%Y %H:%M']
 
     def __init__(self):
         super().__init__(False)
@@ -17,28 +22,55 @@ class ZephIR300(Reader):
     def output_filename(self, filename):
         return os.path.split(filename)[-1][:-4]
 
-    def parse_time(self, string1):
-            try:
-                temp = datetime.strptime(string1,'%d.%m.%Y %H:%M:%S')
-            except:
-                try:
-                    temp = datetime.strptime(string1,'%d/%m/%Y %H:%M:%S')
-                except:
-                    temp = datetime.strptime(string1,'%d.%m.%Y %H:%M')
-            temp = temp.isoformat() +'Z'
-            return temp
+    @staticmethod
+    def sniff_time_formats(column, sample_size=20):
+        """
+        Orders the known timestamp formats by how many rows of a sample they match.
+        :param column: pandas Series of timestamp strings
+        :param sample_size: number of rows, spread over the column, that are tried
+        :return: list of formats, the most likely first
+        """
+        sample = column.iloc[np.unique(np.linspace(0, len(column) - 1, sample_size).astype(int))]
+        matches = [pd.to_datetime(sample, format=time_format, errors='coerce').notna().sum()
+                   for time_format in ZephIR300.time_formats]
+
+        return [ZephIR300.time_formats[i] for i in np.argsort(-np.array(matches), kind='stable')]
+
+    def parse_time(self, column):
+        """
+        Parses the timestamp column at once with the sniffed format. If the column mixes formats,
+        the rows left are parsed with the next format, and so on.
+        :param column: pandas Series of timestamp strings
+        :return: pandas Series of datetime64
+        """
+        column = column.astype(str).str.strip()
+        timestamps = pd.Series(pd.NaT, index=column.index, dtype='datetime64[ns]')
+        missing = timestamps.isna()
+
+        for time_format in self.sniff_time_formats(column):
+            timestamps[missing] = pd.to_datetime(column[missing], format=time_format, errors='coerce')
+            missing = timestamps.isna()
+            if not missing.any():
+                break
+
+        if missing.any():
+            raise ValueError('Unknown timestamp format: "{}"'.format(column[missing].iloc[0]))
+
+        return timestamps
 
 
     @staticmethod
     def get_timestamp(input_filepath, row_of_timestamp = 0 ):
-        with open(input_filepath) as f:
-            line = f.readlines()[2 + row_of_timestamp]
-            
+        line = Reader.read_line(input_filepath, row_of_timestamp, header_lines=2, encoding='latin-1')
+        value = line.split(';')[1].strip()
 
-        timestamp = datetime.strptime(line.split(';')[1], 
-                                          '%d.%m.%Y %H:%M:%S')
-            
-        return timestamp
+        for time_format in ZephIR300.time_formats:
+            try:
+                return datetime.strptime(value, time_format)
+            except ValueError:
+                pass
+
+        raise ValueError('Unknown timestamp format: "{}"'.format(value))
 
     def check_version(self, input_filepath):
         ten_min_file = (re.findall(r'(?<=\\)\w+(?=_\d+@)',input_filepath)[0] == r'Wind10')
@@ -68,7 +100,8 @@ class ZephIR300(Reader):
 
         #load file into DataFrame
         df = pd.read_csv(input_filepath, sep = seperator, skiprows = 1, decimal = decimal) 
-        df['timestamp_iso8601'] = df['Time and Date'].apply(self.parse_time)
+        df['timestamp'] = self.parse_time(df['Time and Date'])
+        df = df[self.in_window(df['timestamp'])].reset_index(drop=True)
 
         return df, parameters
         
@@ -83,9 +116,7 @@ class ZephIR300(Reader):
         range1.long_name = 'range_gate_distance_from_lidar'
         range1[:] = np.array(parameters['Measurement heights'])
 
-        time = output_dataset.createVariable('time', str, ('time',))
-        time.units = 's'
-        time.long_name = 'timestamp ISO 8601'
+        create_time_variable(output_dataset, self.configs, long_name='timestamp ISO 8601')
 
         # create the data variables
         scan_type = output_dataset.createVariable('scan_type', 'i')
@@ -182,7 +213,7 @@ class ZephIR300(Reader):
         
         output_dataset.variables['WS'][:, :] = ws_list_complete.values
         output_dataset.variables['DIR'][:, :] = dir_list_complete.values
-        output_dataset.variables['time'][:] = df['timestamp_iso8601'].values        
+        output_dataset.variables['time'][:] = encode_time(output_dataset.variables['time'], df['timestamp'].values)
         output_dataset.variables['T_external'][:] = df['Air Temp. (C)'].values        
         output_dataset.variables['tilt'][:] = df['Tilt (deg)'].values
         output_dataset.variables['yaw'][:] = df['ZephIR Bearing (deg)'].values
@@ -28,5 +28,8 @@ class MetadataCard(Writer):
             for ncattr in self.nc_dataset.ncattrs():
                 metadata_card[ncattr] = self.nc_dataset.getncattr(ncattr)
 
+            # the in-memory dataset keeps its path open: close it, so that the file can be written again
+            self.nc_dataset.close()
+
             with open(self.file_path(), "w") as json_file:
                 json_file.write(json.dumps(metadata_card, indent=4))
@@ -67,4 +67,6 @@ class NcML(Writer):
 
                     self.dataset.getroot().append(element)
 
+            # the in-memory dataset keeps its path open: close it, so that the file can be written again
+            self.nc_dataset.close()
             return self.dataset.write(self.file_path(), xml_declaration=True, encoding="UTF-8", pretty_print=True)
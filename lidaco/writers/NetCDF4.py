@@ -1,10 +1,160 @@
 import netCDF4 as  nc
 
+from ..common.Logger import Logger
 from ..core.Writer import Writer
 
 
+def find_dimension(group, name):
+    """
+    Looks a dimension up in a group and its parents, as netCDF does.
+    :param group: dataset or group
+    :param name: dimension name
+    :return: the dimension
+    """
+    while name not in group.dimensions:
+        group = group.parent
+    return group.dimensions[name]
+
+
+class StoragePolicy:
+    """
+    How the variables created by the readers are stored: compression, chunk shapes and
+    chunk cache. Set under 'parameters: output: storage:' in the .yaml files, e.g.:
+
+        storage:
+          zlib: true
+          complevel: 4
+          shuffle: true
+          chunk_cache: 67108864   # bytes, per variable
+          unlimited_chunk: 1024     # chunk size of 'full' unlimited dimensions
+          chunking:
+            default: {time: 4096}   # dimensions not listed are chunked over their full length
+            VEL: {time: 4096, range: full}
+
+    An unlimited dimension (e.g. time, appended to) has no full length when the variables are
+    created: chunked 'full', its chunk size is unlimited_chunk (default: 1024).
+    Without it, the netCDF library defaults are used.
+    """
+
+    def __init__(self, storage):
+        storage = storage or {}
+        self.zlib = bool(storage.get('zlib', False))
+        self.complevel = int(storage.get('complevel', 4))
+        self.shuffle = bool(storage.get('shuffle', True))
+        self.chunk_cache = storage.get('chunk_cache')
+        self.chunking = storage.get('chunking') or {}
+        self.unlimited_chunk = self.chunk_size('unlimited_chunk', storage.get('unlimited_chunk', 1024))
+
+    @staticmethod
+    def chunk_size(name, size):
+        """
+        :param name: what the size is set for, for the error message
+        :param size: a positive number of records
+        :return: int
+        """
+        try:
+            if int(size) == float(size) and int(size) > 0:
+                return int(size)
+        except (TypeError, ValueError):
+            pass
+        Logger.error('bad_chunk_size', name, size)
+
+    def chunksizes(self, group, name, dimensions):
+        """
+        Chunk shape of a variable.
+        :param group: dataset or group the variable is created in
+        :param name: variable name
+        :param dimensions: variable dimension names
+        :return: tuple of chunk sizes, or None for the library default
+        """
+        chunks = self.chunking.get(name, self.chunking.get('default'))
+        if chunks is None:
+            return None
+
+        chunksizes = []
+        for dimension_name in dimensions:
+            dimension = find_dimension(group, dimension_name)
+            size = chunks.get(dimension_name, 'full')
+
+            if size == 'full':
+                # an unlimited dimension has no full length yet
+                size = max(1, len(dimension)) if not dimension.isunlimited() else self.unlimited_chunk
+
+            chunksizes.append(self.chunk_size('{}/{}'.format(name, dimension_name), size))
+
+        return tuple(chunksizes)
+
+    def options(self, group, name, datatype, dimensions):
+        """
+        Storage keyword arguments for createVariable.
+        :param group: dataset or group the variable is created in
+        :param name: variable name
+        :param datatype: variable data type
+        :param dimensions: variable dimension names
+        :return: dict
+        """
+        if isinstance(dimensions, str):
+            dimensions = (dimensions,)
+
+        # scalars are stored contiguously and variable-length strings can't be compressed
+        if len(dimensions) == 0 or datatype is str:
+            return {}
+
+        options = {}
+        if self.zlib:
+            options.update(zlib=True, complevel=self.complevel, shuffle=self.shuffle)
+
+        chunksizes = self.chunksizes(group, name, dimensions)
+        if chunksizes is not None:
+            options.update(chunksizes=chunksizes)
+
+        return options
+
+    def set_chunk_cache(self, variable):
+        if self.chunk_cache is not None and len(variable.dimensions) > 0:
+            variable.set_var_chunk_cache(size=int(self.chunk_cache))
+
+
+class StorageGroup:
+    """
+    Wraps a netCDF4 dataset or group, applying a StoragePolicy to every variable created in it
+    and in its sub-groups. Everything else is forwarded to the wrapped dataset.
+    """
+
+    def __init__(self, group, storage):
+        object.__setattr__(self, '_group', group)
+        object.__setattr__(self, '_storage', storage)
+
+    def __getattr__(self, name):
+        return getattr(self._group, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._group, name, value)
+
+    def __getitem__(self, name):
+        item = self._group[name]
+        return StorageGroup(item, self._storage) if isinstance(item, nc.Group) else item
+
+    @property
+    def groups(self):
+        return {name: StorageGroup(group, self._storage) for name, group in self._group.groups.items()}
+
+    def createVariable(self, varname, datatype, dimensions=(), **kwargs):
+        # options passed by the reader take precedence
+        for key, value in self._storage.options(self._group, varname, datatype, dimensions).items():
+            kwargs.setdefault(key, value)
+
+        variable = self._group.createVariable(varname, datatype, dimensions, **kwargs)
+        self._storage.set_chunk_cache(variable)
+        return variable
+
+    def createGroup(self, groupname):
+        return StorageGroup(self._group.createGroup(groupname), self._storage)
+
+
 class NetCDF4(Writer):
     dataset = None
+    resumable = True
 
     def __init__(self, dir_path, name):
         super().__init__(dir_path, name)
@@ -13,8 +163,13 @@ class NetCDF4(Writer):
         return self.name + '.nc'
 
     def __enter__(self):
+        storage = StoragePolicy(self.config('storage'))
         self.dataset = nc.Dataset(self.file_path(), 'a' if self.append else 'w', format='NETCDF4')
-        return self.dataset.__enter__()
+
+        for variable in self.dataset.variables.values():
+            storage.set_chunk_cache(variable)
+
+        return StorageGroup(self.dataset.__enter__(), storage)
 
     def __exit__(self, type, value, traceback):
         return self.dataset.__exit__(type, value, traceback)
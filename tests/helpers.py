@@ -0,0 +1,89 @@
+"""
+Helpers shared by the tests: sample paths, station configurations and output comparison.
+"""
+from os import path
+import os
+
+import yaml
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+SAMPLES = path.join(ROOT, 'samples')
+WINDSCANNER = path.join(SAMPLES, 'Windscanner')
+KASSEL = path.join(SAMPLES, 'Kassel_Experiment')
+
+
+def kassel_config(name):
+    """
+    :param name: station, e.g. 'WS1' or 'WP2_10min'
+    :return: path of its configuration file
+    """
+    return path.join(KASSEL, 'configs', 'NEWA_Kassel_{}.yaml'.format(name))
+
+
+def station(dir_path, config_file, name='station.yaml', **parameters):
+    """
+    Writes a configuration file importing a sample configuration, with its own parameters.
+    :param dir_path: directory the configuration file is written to
+    :param config_file: imported configuration file
+    :param name: configuration filename
+    :param parameters: 'parameters:' of the configuration, e.g. output_block_size=2
+    :return: configuration file path
+    """
+    file_path = path.join(str(dir_path), name)
+    with open(file_path, 'w') as f:
+        yaml.safe_dump({'imports': [path.abspath(config_file)], 'parameters': parameters}, f)
+    return file_path
+
+
+def read_dataset(file_path):
+    """
+    Reads a NetCDF4 file.
+    :return: {'group/variable': values}, the masked values filled
+    """
+    import netCDF4 as nc
+    import numpy as np
+
+    def read(group, prefix, values):
+        for name, variable in group.variables.items():
+            data = variable[...]
+            values[prefix + name] = data if data.dtype == object else np.ma.filled(data, -999)
+        for name, child in group.groups.items():
+            read(child, prefix + name + '/', values)
+        return values
+
+    with nc.Dataset(file_path) as dataset:
+        return read(dataset, '', {})
+
+
+def same_dataset(a, b):
+    """
+    :return: True if the NetCDF4 files a and b hold the same variables and values
+    """
+    import numpy as np
+
+    x, y = read_dataset(a), read_dataset(b)
+    return x.keys() == y.keys() and all(
+        np.array_equal(x[name], y[name], equal_nan=x[name].dtype.kind == 'f') for name in x)
+
+
+def output_files(dir_path):
+    """
+    :return: the .nc files of a directory, sorted
+    """
+    return sorted(f for f in os.listdir(str(dir_path)) if f.endswith('.nc'))
+
+
+def copy_inputs(dir_path, names, source=WINDSCANNER):
+    """
+    Copies sample input files, e.g. to add or modify some between two conversions.
+    :param dir_path: destination directory, created if missing
+    :param names: filenames
+    :param source: sample directory
+    :return: destination directory
+    """
+    import shutil
+
+    os.makedirs(str(dir_path), exist_ok=True)
+    for name in names:
+        shutil.copy2(path.join(source, name), path.join(str(dir_path), name))
+    return dir_path
@@ -0,0 +1,58 @@
+from os import path
+
+import pytest
+
+from lidaco.core.BatchBuilder import BatchBuilder
+from lidaco.core.Builder import Builder
+
+from .helpers import KASSEL, kassel_config, station, same_dataset, output_files
+
+STATIONS = ['WS1', 'WS7']
+
+
+def write_stations(tmp_path, names):
+    for name in names:
+        station(tmp_path, kassel_config(name), name='{}.yaml'.format(name),
+                input={'path': path.join(KASSEL, 'data', name)}, output={'path': str(tmp_path / name)})
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_batch_converts_every_station(tmp_path, jobs):
+    write_stations(tmp_path, STATIONS)
+    results = BatchBuilder(['*.yaml'], context=str(tmp_path), jobs=jobs).build()
+
+    assert [config_file for config_file, summary, wall_time, error in results] == ['WS1.yaml', 'WS7.yaml']
+    for name, (config_file, summary, wall_time, error) in zip(STATIONS, results):
+        assert error is None
+        assert summary['files'] == 3 and summary['rows'] > 0
+
+        # the same output as a conversion of the station alone
+        alone = tmp_path / 'alone' / name
+        Builder(config_file=kassel_config(name), input_path=path.join(KASSEL, 'data', name),
+                output_path=str(alone)).build()
+        assert output_files(tmp_path / name) == output_files(alone)
+        for f in output_files(alone):
+            assert same_dataset(tmp_path / name / f, alone / f)
+
+
+def test_failed_station_does_not_stop_the_others(tmp_path, capsys):
+    write_stations(tmp_path, STATIONS)
+    station(tmp_path, kassel_config('WS1'), name='broken.yaml',
+            input={'path': str(tmp_path / 'missing')}, output={'path': str(tmp_path / 'broken')})
+
+    results = {config_file: error for config_file, summary, wall_time, error in
+               BatchBuilder(['*.yaml'], context=str(tmp_path)).build()}
+
+    assert results['broken.yaml'] is not None
+    assert results['WS1.yaml'] is None and results['WS7.yaml'] is None
+    assert 'broken.yaml' in capsys.readouterr().out
+
+
+def test_expand(tmp_path):
+    write_stations(tmp_path, STATIONS)
+
+    assert BatchBuilder.expand(['WS*.yaml', 'WS1.yaml'], str(tmp_path)) == ['WS1.yaml', 'WS7.yaml']
+    assert BatchBuilder.expand(['missing_*.yaml'], str(tmp_path)) == []
+
+    with pytest.raises(SystemExit):
+        BatchBuilder(['missing_*.yaml'], context=str(tmp_path))
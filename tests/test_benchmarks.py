@@ -0,0 +1,88 @@
+from os import path
+import json
+import sys
+
+import pytest
+
+from benchmarks import compare, suite
+
+
+def result(sample, seconds, peak_rss=100 * 2 ** 20, error=None, mode='build'):
+    return {'sample': sample, 'writer': 'NetCDF4', 'mode': mode, 'seconds': seconds, 'rows': 10,
+            'rows_per_s': 10 / seconds if seconds else None, 'peak_rss': peak_rss, 'error': error}
+
+
+def write_results(file_path, label, results):
+    with open(str(file_path), 'w') as f:
+        json.dump({'label': label, 'results': results}, f)
+    return str(file_path)
+
+
+def run_main(module, monkeypatch, capsys, *arguments):
+    monkeypatch.setattr(sys, 'argv', [module.__name__] + [str(a) for a in arguments])
+    module.main()
+    return capsys.readouterr().out
+
+
+def test_samples():
+    assert set(suite.SAMPLE_FORMATS) == set(suite.SAMPLES)
+    for config_file, input_path in suite.SAMPLES.values():
+        assert path.isfile(config_file) and path.isdir(input_path)
+
+
+def test_ratio():
+    assert compare.ratio(2.0, 3.0) == 1.5
+    assert compare.ratio(0, 3.0) is None
+    assert compare.ratio(None, 3.0) is None
+    assert compare.format_ratio(None) == '-' and compare.format_ratio(1.5) == 'x1.50'
+
+
+def test_compare(tmp_path, monkeypatch, capsys):
+    before = write_results(tmp_path / 'before.json', 'v1', [
+        result('WP5', 1.0), result('WP2', 1.0), result('WP6', 1.0), result('WS1', 1.0), result('Galion', 1.0)])
+    after = write_results(tmp_path / 'after.json', 'v2', [
+        result('WP5', 1.05), result('WP2', 1.5), result('WP6', 1.0, peak_rss=200 * 2 ** 20),
+        result('WS1', None, error='boom'), result('WP1', 1.0)])
+
+    lines = run_main(compare, monkeypatch, capsys, before, after).splitlines()
+    rows = {line.split()[0]: line for line in lines[1:-1]}
+
+    assert 'v1 -> v2' in lines[0]
+    assert not rows['WP5'].endswith('<--')
+    assert rows['WP2'].endswith('<--') and 'x1.50' in rows['WP2']
+    assert rows['WP6'].endswith('<--') and 'x2.00' in rows['WP6']
+    assert 'failed in {}'.format(after) in rows['WS1']
+    assert 'only in {}'.format(after) in rows['WP1']
+    assert 'only in {}'.format(before) in rows['Galion']
+    assert lines[-1] == '2 case(s) slower or bigger than x1.10'
+
+    lines = run_main(compare, monkeypatch, capsys, before, after, '--threshold', 2.5).splitlines()
+    assert lines[-1] == '0 case(s) slower or bigger than x2.50'
+
+
+@pytest.mark.parametrize('mode', suite.MODES)
+def test_run_case(mode):
+    case = suite.run_case('WP5', 'NetCDF4', mode)
+    assert case['error'] is None
+    assert case['rows'] > 0 and case['seconds'] > 0 and case['input_bytes'] > 0 and case['output_bytes'] > 0
+    assert case['rows_per_s'] == case['rows'] / case['seconds']
+
+
+def test_run_case_failure():
+    case = suite.run_case('WP5', 'Unknown', 'build')
+    assert case['error'] is not None and case['seconds'] is None
+
+
+def test_suite_results_compare_with_themselves(tmp_path, monkeypatch, capsys):
+    output = tmp_path / 'results.json'
+    run_main(suite, monkeypatch, capsys, '--samples', 'WP5', '--writers', 'NetCDF4', '--modes', 'build',
+             '--label', 'test', '--output', output)
+
+    with open(str(output)) as f:
+        results = json.load(f)
+    assert results['label'] == 'test'
+    assert [(r['sample'], r['writer'], r['mode'], r['error']) for r in results['results']] == \
+        [('WP5', 'NetCDF4', 'build', None)]
+
+    out = run_main(compare, monkeypatch, capsys, output, output, '--threshold', 1.0)
+    assert out.splitlines()[-1] == '0 case(s) slower or bigger than x1.00'
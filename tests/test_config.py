@@ -0,0 +1,162 @@
+from datetime import date
+from os import path
+import json
+import os
+
+import pytest
+
+from lidaco.core.Builder import Builder
+from lidaco.core.Config import Config, decode_compiled
+
+from .helpers import WINDSCANNER, copy_inputs, output_files, same_dataset
+
+CONFIG = '''imports:
+  - instrument.yaml
+attributes:
+  title: station
+  date_created: 2016-11-24
+parameters:
+  input:
+    format: Windscanner
+'''
+
+INSTRUMENT = '''attributes:
+  title: instrument
+  instrument: lidar
+'''
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'parsed_files', {})
+    (tmp_path / 'config.yaml').write_text(CONFIG)
+    (tmp_path / 'instrument.yaml').write_text(INSTRUMENT)
+    return str(tmp_path)
+
+
+def root_configs():
+    return {'imports': ['config.yaml'], 'parameters': {'input': {}, 'output': {}}}
+
+
+def touch(file_path, text=None):
+    """
+    Rewrites a file, or only moves its modification time, so that it counts as changed.
+    """
+    stat = os.stat(file_path)
+    if text is not None:
+        with open(file_path, 'w') as f:
+            f.write(text)
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def compiled(config_dir, configs=None):
+    cache_path = Config.compiled_path(path.join(config_dir, 'config.yaml'))
+    return Config.compiled(config_dir, configs or root_configs(), cache_path), cache_path
+
+
+def forbid_parsing(monkeypatch):
+    def parse(file_path):
+        raise AssertionError('parsed ' + file_path)
+    monkeypatch.setattr(Config, 'parse', staticmethod(parse))
+
+
+def test_imports_and_files(config_dir):
+    config = Config(config_dir, configs=root_configs())
+    assert config.get('attributes', 'title') == 'station'
+    assert config.get('attributes', 'instrument') == 'lidar'
+    assert set(config.files) == {path.join(config_dir, 'config.yaml'), path.join(config_dir, 'instrument.yaml')}
+
+
+def test_parsed_once_while_unchanged(config_dir):
+    file_path = path.join(config_dir, 'instrument.yaml')
+    key, signature, content = Config.parse(file_path)
+    content['attributes']['title'] = 'modified'
+
+    # a copy of the content parsed before, left as it was parsed
+    assert Config.parse(file_path)[2]['attributes']['title'] == 'instrument'
+    assert list(Config.parsed_files) == [(key,) + signature]
+
+    touch(file_path, INSTRUMENT.replace('lidar', 'sodar'))
+    assert Config.parse(file_path)[2]['attributes']['instrument'] == 'sodar'
+    # the content of the file before it changed is dropped
+    assert len(Config.parsed_files) == 1
+
+
+def test_compiled_json(config_dir, monkeypatch):
+    expected = Config(config_dir, configs=root_configs())
+    config, cache_path = compiled(config_dir)
+
+    assert path.basename(cache_path) == '.config.yaml.lidaco-config.json'
+    with open(cache_path) as f:
+        text = json.load(f)
+    assert text['configs']['attributes']['date_created'] == {'__date__': '2016-11-24'}
+
+    forbid_parsing(monkeypatch)
+    config, cache_path = compiled(config_dir)
+    assert config.configs == expected.configs and config.config_paths == expected.config_paths
+    assert config.get('attributes', 'date_created') == date(2016, 11, 24)
+
+
+@pytest.mark.parametrize('name', ['config.yaml', 'instrument.yaml'])
+def test_compiled_again_when_a_file_changed(config_dir, monkeypatch, name):
+    compiled(config_dir)
+    touch(path.join(config_dir, name))
+
+    parsed = []
+    parse = Config.parse
+    monkeypatch.setattr(Config, 'parse', staticmethod(lambda file_path: parsed.append(file_path) or parse(file_path)))
+    compiled(config_dir)
+    assert len(parsed) == 2
+
+
+def test_compiled_again_with_other_arguments(config_dir):
+    compiled(config_dir)
+    configs = root_configs()
+    configs['parameters']['input']['start'] = '2016-12-11'
+
+    config, cache_path = compiled(config_dir, configs)
+    assert config.get('parameters', 'input', 'start') == '2016-12-11'
+    with open(cache_path) as f:
+        assert json.load(f)['arguments'] == configs
+
+
+def test_bad_compiled_file(config_dir, capsys):
+    config, cache_path = compiled(config_dir)
+    with open(cache_path, 'w') as f:
+        f.write('\x80\x04not json')
+
+    config, cache_path = compiled(config_dir)
+    assert config.get('attributes', 'instrument') == 'lidar'
+    assert 'Failed to read the compiled configurations' in capsys.readouterr().out
+    with open(cache_path) as f:
+        assert json.load(f, object_hook=decode_compiled)['configs'] == config.configs
+
+
+def test_configurations_json_can_not_represent(config_dir, capsys):
+    with open(path.join(config_dir, 'instrument.yaml'), 'a') as f:
+        f.write('levels:\n  40: low\n  200: high\n')
+
+    config, cache_path = compiled(config_dir)
+    assert config.get('levels') == {40: 'low', 200: 'high'}
+    assert not path.exists(cache_path)
+    assert 'can not be compiled to JSON' in capsys.readouterr().out
+
+
+def test_compiled_path_in_a_directory(tmp_path):
+    a = Config.compiled_path(str(tmp_path / 'a' / 'config.yaml'), str(tmp_path))
+    b = Config.compiled_path(str(tmp_path / 'b' / 'config.yaml'), str(tmp_path))
+    assert path.dirname(a) == str(tmp_path) and a != b
+
+
+def test_builder_config_cache(tmp_path):
+    copy_inputs(tmp_path / 'input', ['20161211135000_wind.txt', '20161211135000_system.txt'])
+    config_file = path.join(WINDSCANNER, 'config.yaml')
+
+    for output in ('first', 'second'):
+        Builder(config_file=config_file, input_path=str(tmp_path / 'input'), output_path=str(tmp_path / output),
+                config_cache=str(tmp_path)).build()
+
+    assert path.isfile(Config.compiled_path(config_file, str(tmp_path)))
+    names = output_files(tmp_path / 'first')
+    assert len(names) == 1 and output_files(tmp_path / 'second') == names
+    assert same_dataset(tmp_path / 'first' / names[0], tmp_path / 'second' / names[0])
@@ -0,0 +1,116 @@
+import netCDF4 as nc
+import numpy as np
+import pytest
+
+from lidaco.core.ColumnarReader import ColumnarReader
+from lidaco.core.Config import Config
+from lidaco.core.DataBatch import DataBatch
+from lidaco.core.Reader import Reader
+
+from .helpers import ROOT
+
+
+class Records(ColumnarReader):
+    """
+    Returns a batch of the given records, whatever the input.
+    """
+
+    def __init__(self, values, start='2016-11-22T00:00'):
+        super().__init__(False)
+        self.values = np.asarray(values, dtype='f4')
+        self.start = np.datetime64(start, 'ns')
+
+    def accepts_file(self, filename):
+        return True
+
+    def output_filename(self, input_filename):
+        return input_filename
+
+    def read_batch(self, input, configurations):
+        batch = DataBatch()
+        batch.attributes['title'] = input
+        batch.add_dimension('range', self.values.shape[1])
+        batch.add_dimension('time', None)
+        batch.add_variable('range', 'f4', ('range',), np.arange(self.values.shape[1]) * 10.0, units='m')
+        batch.add_time(self.start + np.arange(len(self.values)) * np.timedelta64(10, 'm'))
+        batch.add_variable('VEL', 'f4', ('time', 'range'), self.values, units='m.s-1')
+        scan = batch.add_group('scan')
+        scan.add_dimension('time', None)
+        scan.add_variable('n', 'i4', ('time',), np.arange(len(self.values)))
+        return batch
+
+
+def configs(**output):
+    return Config(ROOT, configs={'parameters': {'input': {}, 'output': output}})
+
+
+def test_read_to_and_read_batch_are_abstract():
+    class NoReadTo(Reader):
+        def accepts_file(self, filename):
+            return True
+
+        def output_filename(self, input_filename):
+            return input_filename
+
+    class NoReadBatch(ColumnarReader):
+        accepts_file = NoReadTo.accepts_file
+        output_filename = NoReadTo.output_filename
+
+    for cls in (NoReadTo, NoReadBatch):
+        with pytest.raises(TypeError, match='read_(to|batch)'):
+            cls(False)
+
+
+def test_missing_batch_methods_are_named():
+    class Streams(Reader):
+        streams = True
+
+        def accepts_file(self, filename):
+            return True
+
+        def output_filename(self, input_filename):
+            return input_filename
+
+        def read_to(self, output_dataset, input, configurations, index):
+            pass
+
+    reader = Streams(False)
+    with pytest.raises(NotImplementedError, match='Streams sets columnar but does not implement read_batch'):
+        reader.read_batch('input', None)
+    with pytest.raises(NotImplementedError, match='Streams sets streams but does not implement read_batches'):
+        reader.read_batches('input', 10)
+    with pytest.raises(NotImplementedError, match='Streams sets streams but does not implement write_batch'):
+        reader.write_batch(None, None, None, False)
+
+
+def test_read_to_writes_and_appends_the_batches(tmp_path):
+    file_path = str(tmp_path / 'out.nc')
+    first, second = Records([[1, 2, 3], [4, 5, 6]]), Records([[7, 8, 9]], start='2016-11-22T00:20')
+
+    with nc.Dataset(file_path, 'w') as dataset:
+        for i, reader in enumerate((first, second)):
+            reader.set_configs(configs())
+            reader.read_to(dataset, 'input {}'.format(i), None, i > 0)
+
+    with nc.Dataset(file_path) as dataset:
+        # the attributes and the variables without an unlimited dimension are the first batch's
+        assert dataset.title == 'input 0'
+        assert np.array_equal(dataset['range'][:], [0, 10, 20])
+        assert np.array_equal(dataset['VEL'][:], [[1, 2, 3], [4, 5, 6], [7, 8, 9]])
+        assert list(dataset['time'][:]) == ['2016-11-22T00:00:00Z', '2016-11-22T00:10:00Z', '2016-11-22T00:20:00Z']
+        assert dataset['VEL'].units == 'm.s-1'
+        assert np.array_equal(dataset['scan']['n'][:], [0, 1, 0])
+
+
+def test_numeric_time_format(tmp_path):
+    file_path = str(tmp_path / 'out.nc')
+    reader = Records([[1], [2]])
+    reader.set_configs(configs(time_format='numeric'))
+
+    with nc.Dataset(file_path, 'w') as dataset:
+        reader.read_to(dataset, 'input', None, False)
+
+    with nc.Dataset(file_path) as dataset:
+        assert dataset['time'].units == 'seconds since 1970-01-01 00:00:00'
+        start = (np.datetime64('2016-11-22T00:00') - np.datetime64('1970-01-01T00:00')) / np.timedelta64(1, 's')
+        assert np.array_equal(dataset['time'][:], [start, start + 600])
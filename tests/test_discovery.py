@@ -0,0 +1,133 @@
+from os import path
+import os
+import time
+
+from lidaco.core.Builder import Builder
+from lidaco.core.Discovery import Discovery
+
+from .helpers import WINDSCANNER, copy_inputs, output_files, station
+
+FILES = ['a.txt', 'b.csv', 'x/c.txt', 'x/y/d.txt', 'x/tmp/e.txt', '.snapshot/f.txt', 'z/g.txt', 'z/tmp/h.txt']
+
+
+def accepts_file(filename):
+    return filename.endswith('.txt')
+
+
+def make_tree(root):
+    for name in FILES:
+        file_path = path.join(str(root), name)
+        os.makedirs(path.dirname(file_path), exist_ok=True)
+        open(file_path, 'w').close()
+    age(root)
+
+
+def age(root, *relative_dirs):
+    # the listings of directories modified within the last 2 seconds are not kept, see Discovery.list_directory
+    past = time.time() - 60
+    dir_paths = [path.join(str(root), d) for d in relative_dirs] or [d for d, dirs, files in os.walk(str(root))]
+    for dir_path in dir_paths:
+        os.utime(dir_path, (past, past))
+
+
+def reference(root, prune=()):
+    result = []
+    for dir_path, dirs, files in os.walk(str(root)):
+        relative_dir = path.relpath(dir_path, str(root))
+        dirs[:] = [d for d in dirs if path.normpath(path.join(relative_dir, d)) not in prune]
+        result += [path.normpath(path.join(relative_dir, f)) for f in files if accepts_file(f)]
+    return sorted(result)
+
+
+def test_files_equal_os_walk(tmp_path):
+    make_tree(tmp_path)
+    for threads in (1, 8):
+        assert Discovery(threads=threads).files(str(tmp_path), accepts_file) == reference(tmp_path)
+
+
+def test_prune_by_name_and_relative_path(tmp_path):
+    make_tree(tmp_path)
+    discovery = Discovery(prune=['.snapshot', 'x/tmp'])
+    assert discovery.files(str(tmp_path), accepts_file) == reference(tmp_path, ['.snapshot', 'x/tmp'])
+
+    discovery = Discovery(prune='tmp')
+    assert discovery.files(str(tmp_path), accepts_file) == reference(tmp_path, ['x/tmp', 'z/tmp'])
+
+
+def test_unchanged_directories_are_not_listed_again(tmp_path):
+    make_tree(tmp_path)
+    discovery = Discovery()
+    discovery.files(str(tmp_path), accepts_file)
+    assert discovery.visited == discovery.listed == 7
+
+    discovery.files(str(tmp_path), accepts_file)
+    assert discovery.visited == 7 and discovery.listed == 0
+
+    open(path.join(str(tmp_path), 'x', 'new.txt'), 'w').close()
+    age(tmp_path, 'x')
+    assert 'x/new.txt' in discovery.files(str(tmp_path), accepts_file)
+    assert discovery.listed == 1
+
+
+def test_listing_cache_file(tmp_path):
+    input_path, cache_dir = tmp_path / 'input', tmp_path / 'cache'
+    make_tree(input_path)
+    os.makedirs(str(cache_dir))
+
+    expected = Discovery(cache_dir=str(cache_dir)).files(str(input_path), accepts_file)
+    assert path.isfile(path.join(str(cache_dir), Discovery.filename))
+
+    discovery = Discovery(cache_dir=str(cache_dir))
+    assert discovery.files(str(input_path), accepts_file) == expected
+    assert discovery.listed == 0
+
+
+def test_bad_listing_cache_file(tmp_path, capsys):
+    make_tree(tmp_path / 'input')
+    (tmp_path / Discovery.filename).write_text('{not json')
+
+    discovery = Discovery(cache_dir=str(tmp_path))
+    assert discovery.files(str(tmp_path / 'input'), accepts_file) == reference(tmp_path / 'input')
+    assert 'Failed to read the listing cache' in capsys.readouterr().out
+
+
+def test_changes(tmp_path):
+    make_tree(tmp_path)
+    discovery = Discovery()
+    assert discovery.changes(str(tmp_path), accepts_file)['x/y'] == ['d.txt']
+    assert discovery.changes(str(tmp_path), accepts_file) == {}
+
+    open(path.join(str(tmp_path), 'x', 'y', 'new.txt'), 'w').close()
+    for name in ('h.txt', ''):
+        target = path.join(str(tmp_path), 'z', 'tmp', name)
+        os.remove(target) if name else os.rmdir(target)
+    age(tmp_path, 'x/y', 'z')
+
+    changes = discovery.changes(str(tmp_path), accepts_file)
+    assert sorted(changes['x/y']) == ['d.txt', 'new.txt']
+    # the vanished directory is returned with no files
+    assert changes['z/tmp'] == []
+    assert set(changes) == {'x/y', 'z', 'z/tmp'}
+
+
+def test_forget(tmp_path):
+    make_tree(tmp_path)
+    discovery = Discovery()
+    discovery.files(str(tmp_path), accepts_file)
+
+    discovery.forget(path.join(str(tmp_path), 'x'))
+    assert set(discovery.changes(str(tmp_path), accepts_file)) == {'x'}
+
+
+def test_builder_listing_cache_and_prune(tmp_path):
+    input_path, output_path = tmp_path / 'input', tmp_path / 'output'
+    copy_inputs(input_path, ['20161211135000_wind.txt', '20161211135000_system.txt'])
+    copy_inputs(input_path / 'skipped', ['20161211140000_wind.txt', '20161211140000_system.txt'])
+    config_file = station(tmp_path, path.join(WINDSCANNER, 'config.yaml'), input={'prune': ['skipped']})
+
+    result = Builder(config_file=config_file, input_path=str(input_path), output_path=str(output_path),
+                     listing_cache=True).build()
+
+    assert result['files'] == 1
+    assert len(output_files(output_path)) == 1
+    assert path.isfile(path.join(str(output_path), Discovery.filename))
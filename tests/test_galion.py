@@ -0,0 +1,103 @@
+from datetime import datetime
+from os import path
+
+import numpy as np
+
+from lidaco.core.Builder import Builder
+from lidaco.readers import Galion as galion
+
+from .helpers import SAMPLES, read_dataset
+
+GALION = path.join(SAMPLES, 'Galion')
+SCN_FILE = path.join(GALION, '1352170_06061705_42.scn')
+GATES = 42
+
+
+def reference(file_path):
+    # the body decoded line by line: [(ray time, [doppler, intensity, az, el, pitch, roll])]
+    with open(file_path) as f:
+        lines = f.read().splitlines()[galion.metadata_lines:]
+    rows = [line.split('\t') for line in lines if line]
+    return [(datetime.strptime(row[galion.time_index], galion.time_format),
+             [float(row[i]) for i in galion.fields]) for row in rows]
+
+
+def build(tmp_path):
+    Builder(config_file=path.join(GALION, 'config.yaml'), input_path=GALION, output_path=str(tmp_path)).build()
+    return read_dataset(tmp_path / '1352170_06061705_42.nc')
+
+
+def test_load_scans_equals_line_by_line_parsing():
+    rows = reference(SCN_FILE)
+    metadata, scans, times = galion.load_scans(SCN_FILE, GATES)
+
+    n_scans = len(rows) // GATES
+    assert len(metadata) == galion.metadata_lines
+    assert scans.shape == (n_scans, GATES, len(galion.fields))
+    assert np.array_equal(scans.reshape(-1, len(galion.fields)), [values for time, values in rows[:n_scans * GATES]])
+    assert list(times.astype('datetime64[us]').astype(datetime)) == [time for time, values in rows[:n_scans * GATES:GATES]]
+
+
+def test_incomplete_last_scan_is_dropped(tmp_path):
+    with open(SCN_FILE) as f:
+        lines = f.read().splitlines()
+    file_path = tmp_path / 'scan.scn'
+    file_path.write_text('\n'.join(lines[:galion.metadata_lines + 3 * GATES + 5]) + '\n')
+
+    metadata, scans, times = galion.load_scans(str(file_path), GATES)
+    assert scans.shape[0] == len(times) == 3
+
+
+def test_scan_indexes():
+    assert list(galion.scan_indexes('3-5;8-9', 1)) == [2, 3, 4, 7, 8]
+    assert list(galion.scan_indexes('1-2', 0)) == [1, 2]
+
+
+def test_read_to(tmp_path):
+    output = build(tmp_path)
+    metadata, scans, times = galion.load_scans(SCN_FILE, GATES)
+
+    assert np.array_equal(output['DOPPLER'], galion.field(scans, galion.doppler_index).astype('f4'))
+    assert np.array_equal(output['INTENSITY'], galion.field(scans, galion.intensity_index).astype('f4'))
+    assert np.array_equal(output['azimuth_angle'], galion.field(scans, galion.azimuth_index, 0).astype('f4'))
+    assert output['time'][0] == 0 and (np.diff(output['time']) >= 0).all()
+
+
+def test_scenario_groups_hold_their_own_scans(tmp_path):
+    output = build(tmp_path)
+    scans = len(output['time'])
+
+    # the sample scenarios, see samples/Galion/configs/scenario.yaml: scans 1-2 are invalid
+    scenarios = [('scan_1_PPI', 3, '3-208;244-254'), ('scan_2_RHI', 4, '209-243'), ('scan_3_VAD', 2, '255-290')]
+    covered = np.zeros(scans, dtype=bool)
+
+    for scan_id, (name, scan_type, records) in enumerate(scenarios, 1):
+        indexes = galion.scan_indexes(records, 3)
+        indexes = indexes[indexes < scans]
+        covered[indexes] = True
+
+        assert len(output[name + '/time']) == len(indexes)
+        assert np.array_equal(output[name + '/time'], output['time'][indexes])
+        assert np.array_equal(output[name + '/DOPPLER'], output['DOPPLER'][indexes])
+        assert np.array_equal(output[name + '/elevation_angle'], output['elevation_angle'][indexes])
+        assert (output['scan_type'][indexes] == scan_type).all()
+        assert (output['scan_id'][indexes] == scan_id).all()
+
+    # the scans of no scenario have no type
+    assert (output['scan_type'][~covered] == -999).all()
+
+
+def test_scenario_groups_in_a_time_window(tmp_path):
+    Builder(config_file=path.join(GALION, 'config.yaml'), input_path=GALION, output_path=str(tmp_path / 'all')).build()
+    all_scans = read_dataset(tmp_path / 'all' / '1352170_06061705_42.nc')
+
+    Builder(config_file=path.join(GALION, 'config.yaml'), input_path=GALION, output_path=str(tmp_path / 'window'),
+            start='2017-06-06 06:00:00').build()
+    window = read_dataset(tmp_path / 'window' / '1352170_06061705_42.nc')
+
+    kept = len(all_scans['time']) - len(window['time'])
+    assert 0 < kept < len(all_scans['time'])
+    assert np.array_equal(window['scan_id'], all_scans['scan_id'][kept:])
+    for name in ('scan_1_PPI', 'scan_2_RHI', 'scan_3_VAD'):
+        group_times = all_scans[name + '/time']
+        assert np.array_equal(window[name + '/time'], group_times[group_times >= all_scans['time'][kept]])
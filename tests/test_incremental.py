@@ -0,0 +1,89 @@
+from os import path
+import json
+import os
+
+from lidaco.core.Builder import Builder
+from lidaco.core.Manifest import Manifest
+
+from .helpers import WINDSCANNER, station, copy_inputs, same_dataset, output_files
+
+FIRST = ['20161211135000_wind.txt', '20161211135000_system.txt']
+SECOND = ['20161211140000_wind.txt', '20161211140000_system.txt']
+
+
+def build(tmp_path, input_path, output='out', incremental=True, **parameters):
+    config_file = station(tmp_path, path.join(WINDSCANNER, 'config.yaml'), **parameters)
+    return Builder(config_file=config_file, input_path=str(input_path), output_path=str(tmp_path / output),
+                   incremental=incremental).build()
+
+
+def test_rerun_skips_up_to_date_blocks(tmp_path):
+    input_path = copy_inputs(tmp_path / 'input', FIRST + SECOND)
+
+    assert build(tmp_path, input_path)['blocks'] == 2
+    mtimes = {f: os.stat(tmp_path / 'out' / f).st_mtime_ns for f in output_files(tmp_path / 'out')}
+
+    summary = build(tmp_path, input_path)
+    assert summary['blocks'] == 0 and summary['rows'] == 0
+    assert {f: os.stat(tmp_path / 'out' / f).st_mtime_ns for f in output_files(tmp_path / 'out')} == mtimes
+
+
+def test_new_inputs_are_appended_to_their_block(tmp_path):
+    input_path = copy_inputs(tmp_path / 'input', FIRST)
+    assert build(tmp_path, input_path, output_block_size=2)['rows'] == 599
+
+    copy_inputs(input_path, SECOND)
+    summary = build(tmp_path, input_path, output_block_size=2)
+    # only the rows of the new input file are counted
+    assert summary['blocks'] == 1 and summary['rows'] == 271
+
+    # the same output as converting both files at once
+    build(tmp_path, input_path, output='all', output_block_size=2, incremental=False)
+    assert output_files(tmp_path / 'out') == output_files(tmp_path / 'all') == ['20161211135000.nc']
+    assert same_dataset(tmp_path / 'out' / '20161211135000.nc', tmp_path / 'all' / '20161211135000.nc')
+
+
+def test_changed_inputs_are_converted_again(tmp_path):
+    input_path = copy_inputs(tmp_path / 'input', FIRST + SECOND)
+    build(tmp_path, input_path)
+
+    # a new mtime with the same content is recognized by the content hash
+    wind_file = input_path / SECOND[0]
+    os.utime(wind_file, (0, 0))
+    assert build(tmp_path, input_path)['blocks'] == 0
+
+    with open(wind_file, 'a') as f:
+        f.write('\n')
+    assert build(tmp_path, input_path)['blocks'] == 1
+
+
+def test_changed_related_file_rewrites_the_block(tmp_path):
+    input_path = copy_inputs(tmp_path / 'input', FIRST + SECOND)
+    build(tmp_path, input_path)
+
+    os.utime(input_path / SECOND[1], (0, 0))
+    assert build(tmp_path, input_path)['blocks'] == 1
+
+
+def test_interrupted_block_is_rewritten(tmp_path):
+    input_path = copy_inputs(tmp_path / 'input', FIRST + SECOND)
+    build(tmp_path, input_path)
+
+    manifest = Manifest(str(tmp_path / 'out'))
+    manifest.start_block(str(tmp_path / 'out' / '20161211140000.nc'))
+
+    summary = build(tmp_path, input_path)
+    assert summary['blocks'] == 1 and summary['rows'] == 271
+
+
+def test_unreadable_manifest_converts_everything(tmp_path, capsys):
+    input_path = copy_inputs(tmp_path / 'input', FIRST + SECOND)
+    build(tmp_path, input_path)
+
+    with open(tmp_path / 'out' / Manifest.filename, 'w') as f:
+        f.write('{')
+
+    assert build(tmp_path, input_path)['blocks'] == 2
+    assert 'Failed to read the manifest' in capsys.readouterr().out
+    with open(tmp_path / 'out' / Manifest.filename) as f:
+        assert len(json.load(f)['blocks']) == 2
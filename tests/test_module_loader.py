@@ -0,0 +1,64 @@
+import pytest
+
+from benchmarks import import_time
+from lidaco.core.ModuleLoader import READERS, WRITERS, ModuleLoader
+
+
+def heavy_packages(code):
+    """
+    :return: the heavy packages (see benchmarks.import_time) imported by running code in a fresh process
+    """
+    return import_time.imported(import_time.run(['-c', code], importtime=True)[1])
+
+
+def test_available():
+    readers = ModuleLoader.available('..readers.')
+    assert list(readers) == sorted(READERS)
+    assert readers['Windscanner'] == ('WindScanner _wind.txt and _system.txt files', ['numpy'], True)
+    assert set(ModuleLoader.available('..writers.')) == set(WRITERS)
+
+
+def test_load():
+    reader = ModuleLoader.load('..readers.', 'Windscanner')
+    assert reader.__name__ == 'Windscanner'
+    assert ModuleLoader.load('..readers.', 'Windscanner') is reader
+
+    loader = ModuleLoader()
+    loader.load_writer('NetCDF4')
+    assert loader.get_writer().__name__ == 'NetCDF4'
+
+
+def test_unknown_module():
+    with pytest.raises(ImportError, match='unknown module "Windscaner", available: AQ500, Galion'):
+        ModuleLoader.load('..readers.', 'Windscaner')
+
+
+def test_register(monkeypatch):
+    monkeypatch.setitem(ModuleLoader.catalogues, '..readers.', dict(READERS))
+    ModuleLoader.register('..readers.', 'Sodar', 'Sodar files', ('numpy',))
+
+    assert ModuleLoader.available('..readers.')['Sodar'] == ('Sodar files', ['numpy'], True)
+    assert 'Sodar' not in READERS
+
+
+def test_missing_package(monkeypatch):
+    monkeypatch.setitem(ModuleLoader.catalogues, '..writers.', dict(WRITERS))
+    ModuleLoader.register('..writers.', 'Zarr', 'Zarr stores', ('numpy', 'no_such_package'))
+    assert ModuleLoader.available('..writers.')['Zarr'][2] is False
+
+
+@pytest.mark.parametrize('code', ['import lidaco.core.ModuleLoader', 'import lidaco.core.Builder',
+                                  'import lidaco.core.Reader', 'import lidaco.common.Records'])
+def test_imports_without_heavy_packages(code):
+    assert heavy_packages(code) == []
+
+
+@pytest.mark.parametrize('name', sorted(READERS))
+def test_readers_import_their_catalogue_packages(name):
+    code = 'from lidaco.core.ModuleLoader import ModuleLoader; ModuleLoader.load("..readers.", "{}")'.format(name)
+    assert set(heavy_packages(code)) <= set(READERS[name][1])
+
+
+def test_command_line_without_heavy_packages():
+    for arguments in (['--version'], ['--list-formats']):
+        assert import_time.imported(import_time.run([import_time.LIDACO] + arguments, importtime=True)[1]) == []
@@ -0,0 +1,49 @@
+from os import path
+
+import numpy as np
+
+from lidaco.core.Builder import Builder
+from lidaco.writers.NetCDF4 import NetCDF4
+
+from .helpers import KASSEL, kassel_config, station, read_dataset, output_files
+
+INPUT_PATH = path.join(KASSEL, 'data', 'WS1')
+
+
+def build(tmp_path, output, **parameters):
+    config_file = station(tmp_path, kassel_config('WS1'), **parameters)
+    return Builder(config_file=config_file, input_path=INPUT_PATH, output_path=str(tmp_path / output)).build()
+
+
+def test_output_dataset_is_opened_once_per_block(tmp_path, monkeypatch):
+    opened = []
+    enter = NetCDF4.__enter__
+
+    def counting_enter(self):
+        opened.append(self.file_path())
+        return enter(self)
+
+    monkeypatch.setattr(NetCDF4, '__enter__', counting_enter)
+    summary = build(tmp_path, 'out', output_block_size=2)
+
+    assert summary['files'] == 3 and summary['blocks'] == 2
+    assert opened == [str(tmp_path / 'out' / f) for f in output_files(tmp_path / 'out')]
+
+
+def test_block_holds_the_records_of_its_files(tmp_path):
+    build(tmp_path, 'files', output_block_size=1)
+    build(tmp_path, 'block', output_block_size=3)
+
+    files = [read_dataset(tmp_path / 'files' / f) for f in output_files(tmp_path / 'files')]
+    block = read_dataset(tmp_path / 'block' / output_files(tmp_path / 'block')[0])
+
+    assert len(files) == 3
+    assert block.keys() == files[0].keys()
+    for name, values in block.items():
+        if len(values.shape) > 0 and len(values) == len(block['time']):
+            # the time records of every file, appended in order
+            expected = np.concatenate([f[name] for f in files])
+            assert np.array_equal(values, expected, equal_nan=values.dtype.kind == 'f'), name
+        else:
+            # the configuration variables, written once
+            assert np.array_equal(values, files[0][name], equal_nan=values.dtype.kind == 'f'), name
@@ -0,0 +1,47 @@
+from os import path
+
+import pytest
+
+from lidaco.core.Builder import Builder
+
+from .helpers import WINDSCANNER, KASSEL, kassel_config, station, same_dataset, output_files
+
+
+def build(config_file, input_path, output_path, **args):
+    return Builder(config_file=config_file, input_path=input_path, output_path=str(output_path), **args).build()
+
+
+def test_parallel_output_equals_serial(tmp_path):
+    config_file = station(tmp_path, kassel_config('WS1'), output_block_size=2)
+    input_path = path.join(KASSEL, 'data', 'WS1')
+
+    serial = build(config_file, input_path, tmp_path / 'serial')
+    parallel = build(config_file, input_path, tmp_path / 'parallel', jobs=2)
+
+    assert serial['blocks'] == parallel['blocks'] == 2
+    assert serial['rows'] == parallel['rows'] > 0
+    assert output_files(tmp_path / 'serial') == output_files(tmp_path / 'parallel')
+    for name in output_files(tmp_path / 'serial'):
+        assert same_dataset(tmp_path / 'serial' / name, tmp_path / 'parallel' / name)
+
+
+def test_workers_parameter(tmp_path):
+    config_file = station(tmp_path, path.join(WINDSCANNER, 'config.yaml'), workers=2)
+    builder = Builder(config_file=config_file, input_path=WINDSCANNER, output_path=str(tmp_path / 'out'))
+
+    assert builder.workers() == 2
+    assert build(config_file, WINDSCANNER, tmp_path / 'out')['blocks'] == 2
+    assert output_files(tmp_path / 'out') == ['20161211135000.nc', '20161211140000.nc']
+
+
+def test_failed_block_fails_the_build(tmp_path, capsys):
+    input_path = tmp_path / 'input'
+    input_path.mkdir()
+    for name in ('20161211135000_wind.txt', '20161211135000_system.txt'):
+        (input_path / name).write_text(open(path.join(WINDSCANNER, name)).read())
+    (input_path / '20161211140000_wind.txt').write_text('not a wind file')
+
+    with pytest.raises(SystemExit):
+        build(path.join(WINDSCANNER, 'config.yaml'), str(input_path), tmp_path / 'out', jobs=2)
+
+    assert '1 of 2 output blocks failed' in capsys.readouterr().out
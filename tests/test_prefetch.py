@@ -0,0 +1,85 @@
+from os import path
+import random
+import threading
+import time
+
+import pytest
+
+from lidaco.core.Builder import Builder
+from lidaco.core.Prefetcher import Prefetcher
+
+from .helpers import KASSEL, kassel_config, output_files, same_dataset
+
+
+def test_results_in_the_order_of_the_items():
+    def slow_square(x):
+        time.sleep(random.random() / 100)
+        return x * x
+
+    prefetcher = Prefetcher(threads=4)
+    assert list(prefetcher.map(slow_square, range(40))) == [x * x for x in range(40)]
+    assert prefetcher.items == 40
+    assert prefetcher.depth == 8
+
+
+def test_bounded_number_of_items_ahead():
+    started = []
+    lock = threading.Lock()
+
+    def record(x):
+        with lock:
+            started.append(x)
+        return x
+
+    prefetcher = Prefetcher(threads=2, depth=3)
+    for x in prefetcher.map(record, range(20)):
+        time.sleep(0.005)
+        # the items started are at most 'depth' ahead of the one handed out
+        with lock:
+            assert max(started) <= x + 3
+
+
+def test_exception_raised_at_its_item():
+    def fail_on_5(x):
+        if x == 5:
+            raise ValueError('item 5')
+        return x
+
+    results = []
+    with pytest.raises(ValueError, match='item 5'):
+        for x in Prefetcher(threads=2).map(fail_on_5, range(100)):
+            results.append(x)
+    assert results == [0, 1, 2, 3, 4]
+
+
+def test_overlap():
+    prefetcher = Prefetcher()
+    list(prefetcher.map(lambda x: time.sleep(0.01), range(5)))
+    overlap = prefetcher.overlap(1.0)
+    assert overlap['parse'] >= 0.05
+    assert 0 <= overlap['efficiency'] <= 1
+    assert overlap['write'] == pytest.approx(1.0 - overlap['wait'])
+
+
+@pytest.mark.parametrize('name, data', [('WP2_10min', 'WP2'), ('WP5_10min', 'WP5')])
+def test_prefetched_output_equals_serial(tmp_path, name, data):
+    input_path = path.join(KASSEL, 'data', data)
+    Builder(config_file=kassel_config(name), input_path=input_path, output_path=str(tmp_path / 'serial')).build()
+    result = Builder(config_file=kassel_config(name), input_path=input_path,
+                     output_path=str(tmp_path / 'prefetched'), prefetch=2).build()
+
+    names = output_files(tmp_path / 'serial')
+    assert len(names) > 0 and output_files(tmp_path / 'prefetched') == names
+    for name in names:
+        assert same_dataset(tmp_path / 'serial' / name, tmp_path / 'prefetched' / name), name
+    assert result['overlap']['parse'] > 0
+
+
+def test_prefetch_unsupported(tmp_path, capsys):
+    input_path = path.join(KASSEL, 'data', 'WP1', 'sta')
+    result = Builder(config_file=kassel_config('WP1'), input_path=input_path, output_path=str(tmp_path),
+                     prefetch=2).build()
+
+    assert 'overlap' not in result
+    assert len(output_files(tmp_path)) > 0
+    assert 'The Windcubev2 reader writes the output itself' in capsys.readouterr().out
@@ -0,0 +1,94 @@
+from os import path
+import csv
+import json
+import os
+import subprocess
+import sys
+
+from lidaco.core.Builder import Builder
+from lidaco.core.Profiler import FIELDS, Profiler
+
+from .helpers import ROOT, WINDSCANNER, copy_inputs, output_files, station
+
+INPUTS = ['20161211135000_wind.txt', '20161211135000_system.txt', '20161211140000_wind.txt',
+          '20161211140000_system.txt']
+
+
+def profiler():
+    result = Profiler()
+    for item, wall in (('a', 0.5), ('b', 2.0)):
+        with result.stage('parse', item, bytes_read=100) as record:
+            record['rows'] = 10
+        result.records[-1]['wall'] = wall
+    with result.stage('close', 'out.nc') as record:
+        record['bytes_written'] = 1000
+    return result
+
+
+def lidaco(*arguments):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT] + [p for p in [os.environ.get('PYTHONPATH')] if p]))
+    return subprocess.run([sys.executable, path.join(ROOT, 'bin', 'lidaco')] + list(arguments), env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+
+
+def test_stages_and_inputs():
+    result = profiler()
+    stages = result.stages()
+    assert list(stages) == ['parse', 'close']
+    assert stages['parse']['calls'] == 2 and stages['parse']['rows'] == 20 and stages['parse']['bytes_read'] == 200
+    assert stages['close']['bytes_written'] == 1000
+    # the output files are not inputs
+    assert set(result.inputs()) == {'a', 'b'}
+    assert result.inputs()['b']['wall'] == 2.0
+
+
+def test_print_summary(capsys):
+    profiler().print_summary(top=1)
+    out = capsys.readouterr().out
+    assert 'Slowest 1 inputs:' in out
+    assert ' b ' in out and ' a ' not in out
+
+
+def test_export_csv(tmp_path):
+    file_path = str(tmp_path / 'profile.csv')
+    profiler().export(file_path)
+
+    with open(file_path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == FIELDS
+    assert [row['item'] for row in rows] == ['a', 'b', 'out.nc']
+    assert float(rows[1]['wall']) == 2.0
+
+
+def test_export_json(tmp_path):
+    file_path = str(tmp_path / 'profile.json')
+    profiler().export(file_path)
+
+    with open(file_path) as f:
+        exported = json.load(f)
+    assert exported['stages']['parse']['calls'] == 2
+    assert len(exported['records']) == 3
+
+
+def test_builder_profile_output(tmp_path):
+    copy_inputs(tmp_path / 'input', INPUTS)
+    result = Builder(config_file=path.join(WINDSCANNER, 'config.yaml'), input_path=str(tmp_path / 'input'),
+                     output_path=str(tmp_path / 'output'), profile_output=str(tmp_path / 'profile.json')).build()
+
+    with open(str(tmp_path / 'profile.json')) as f:
+        exported = json.load(f)
+    assert set(exported['stages']) == set(result['profile'])
+    assert {'discovery', 'read_to', 'close'} <= set(result['profile'])
+
+
+def test_command_line_profile_before_the_command(tmp_path):
+    copy_inputs(tmp_path / 'input', INPUTS)
+    config_file = station(tmp_path, path.join(WINDSCANNER, 'config.yaml'),
+                          input={'path': str(tmp_path / 'input')}, output={'path': str(tmp_path / 'output')})
+
+    # the command is not taken as the --profile value
+    completed = lidaco('--profile', 'batch', config_file, '--profile-output', str(tmp_path / 'profile.csv'))
+    assert completed.returncode == 0, completed.stdout
+    assert len(output_files(tmp_path / 'output')) > 0
+    assert 'Slowest' in completed.stdout
+    assert path.isfile(str(tmp_path / 'profile.csv'))
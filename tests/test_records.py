@@ -0,0 +1,104 @@
+from datetime import datetime
+from os import path
+import math
+
+import numpy as np
+
+from lidaco.common.Records import parse_records, read_records
+from lidaco.readers.AQ500 import AQ500
+from lidaco.readers.Triton import Triton
+
+from .helpers import KASSEL
+
+TRITON_FILE = path.join(KASSEL, 'data', 'WP2', 'TritonExport_2017-03-13-04-46-38_innogySE_sample.csv')
+AQ500_FILE = path.join(KASSEL, 'data', 'WP5', '161122_result.txt')
+
+
+def to_float(field, decimal='.'):
+    try:
+        return float(field.strip().replace(decimal, '.'))
+    except ValueError:
+        return math.nan
+
+
+def test_parse_records():
+    lines = ['2016-11-22 00:00,1.5,2,3', '2016-11-22 00:10,4,5.25,6']
+    timestamps, records = parse_records(lines, ',', {'a': 1, 'bc': [2, 3]}, 0, '%Y-%m-%d %H:%M')
+
+    assert list(timestamps) == [np.datetime64('2016-11-22T00:00'), np.datetime64('2016-11-22T00:10')]
+    assert np.array_equal(records['a'], [1.5, 4])
+    assert np.array_equal(records['bc'], [[2, 3], [5.25, 6]])
+
+
+def test_malformed_lines_and_cells_become_nan():
+    lines = ['20161122 00:00,1,2', '20161122 00:10,3', 'not a date,x,5', '20161122 00:30,7,8,9', '20161122 00:40,9,10']
+    timestamps, records = parse_records(lines, ',', {'a': 1, 'b': 2}, 0, '%Y%m%d %H:%M')
+
+    # the records stay aligned with the lines
+    assert len(timestamps) == len(lines)
+    assert np.isnat(timestamps[[1, 2, 3]]).all()
+    assert np.array_equal(records['a'], [1, math.nan, math.nan, math.nan, 9], equal_nan=True)
+    assert np.array_equal(records['b'], [2, math.nan, 5, math.nan, 10], equal_nan=True)
+
+
+def test_malformed_first_and_last_lines():
+    lines = ['20161122 00:00,1', '20161122 00:10,3,4', '20161122 00:20,5,6', '20161122 00:30,7,8', '20161122 00:40']
+    timestamps, records = parse_records(lines, ',', {'a': 1, 'b': 2}, 0, '%Y%m%d %H:%M')
+
+    assert len(timestamps) == len(lines)
+    assert np.isnat(timestamps[[0, 4]]).all()
+    assert np.array_equal(records['b'], [math.nan, 4, 6, 8, math.nan], equal_nan=True)
+
+
+def test_decimal_separator():
+    lines = ['1,5;-0,25;text', '2;3,75;4']
+    timestamps, records = parse_records(lines, ';', {'a': 0, 'b': 1, 'c': 2}, decimal=',')
+
+    assert timestamps is None
+    assert np.array_equal(records['a'], [1.5, 2])
+    assert np.array_equal(records['b'], [-0.25, 3.75])
+    assert np.array_equal(records['c'], [math.nan, 4], equal_nan=True)
+
+
+def test_no_lines():
+    timestamps, records = parse_records([], ',', {'a': 1, 'b': [2, 3]}, 0, '%Y')
+    assert len(timestamps) == 0
+    assert records['a'].shape == (0,) and records['b'].shape == (0, 2)
+
+
+def test_read_records(tmp_path):
+    file_path = tmp_path / 'records.txt'
+    file_path.write_text('header\n1,2\n3,4\nfooter\n')
+    timestamps, records = read_records(str(file_path), ',', {'a': 0, 'b': 1}, header_lines=1, footer_lines=1)
+    assert np.array_equal(records['a'], [1, 3]) and np.array_equal(records['b'], [2, 4])
+
+
+def test_triton_equals_line_by_line_parsing():
+    with open(TRITON_FILE) as f:
+        lines = f.read().splitlines()[4:]
+    rows = [line.split(';') for line in lines]
+
+    batch = Triton().read_batch(TRITON_FILE, None)
+
+    expected_time = [datetime.strptime(row[0], '%d.%m.%Y %H:%M') for row in rows]
+    assert list(batch.variables['time'].data.astype('datetime64[us]').astype(datetime)) == expected_time
+    gates = batch.dimensions['range']
+    for name, first in (('DIR', 1), ('VEL', 2), ('w', 3), ('Quality', 4)):
+        expected = [[to_float(row[first + 4 * i], ',') for i in range(gates)] for row in rows]
+        assert np.array_equal(batch.variables[name].data, expected, equal_nan=True), name
+
+
+def test_aq500_equals_line_by_line_parsing():
+    with open(AQ500_FILE, encoding='latin-1') as f:
+        lines = [line.strip() for line in f.readlines()]
+    rows = [line.split(',') for line in lines[lines.index('[EOH]') + 2:-2]]
+    # data field 7 (counted from 1, with the timestamp) is the direction at the lowest level, repeated every 6 fields
+    gates = 31
+
+    batch = AQ500().read_batch(AQ500_FILE, None)
+
+    expected_time = [datetime.strptime(row[0], '%Y%m%d %H:%M') for row in rows]
+    assert list(batch.variables['time'].data.astype('datetime64[us]').astype(datetime)) == expected_time
+    assert np.array_equal(batch.variables['T_external'].data, [to_float(row[2]) for row in rows])
+    assert np.array_equal(batch.variables['DIR'].data,
+                          [[to_float(row[6 + 6 * i]) for i in range(gates)] for row in rows], equal_nan=True)
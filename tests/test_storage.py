@@ -0,0 +1,109 @@
+from os import path
+
+import netCDF4 as nc
+import pytest
+
+from lidaco.core.Builder import Builder
+from lidaco.core.DataBatch import DataBatch
+from lidaco.writers.NetCDF4 import StoragePolicy, StorageGroup
+
+from .helpers import WINDSCANNER, station
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    def open_dataset(storage):
+        group = StorageGroup(nc.Dataset(str(tmp_path / 'storage.nc'), 'w', format='NETCDF4'), StoragePolicy(storage))
+        group.createDimension('time', None)
+        group.createDimension('range', 10)
+        opened.append(group)
+        return group
+
+    opened = []
+    yield open_dataset
+    for group in opened:
+        group.close()
+
+
+def test_library_defaults_without_policy(dataset):
+    variable = dataset(None).createVariable('VEL', 'f8', ('time', 'range'))
+    assert not variable.filters()['zlib']
+
+
+def test_compression_and_chunking(dataset):
+    storage = {'zlib': True, 'complevel': 6, 'chunking': {'default': {'time': 4096}, 'VEL': {'time': 512, 'range': 5}}}
+    group = dataset(storage)
+
+    velocity = group.createVariable('VEL', 'f8', ('time', 'range'))
+    assert velocity.filters()['zlib'] and velocity.filters()['complevel'] == 6
+    assert velocity.chunking() == [512, 5]
+
+    # dimensions not listed are chunked over their full length
+    assert group.createVariable('CNR', 'f8', ('time', 'range')).chunking() == [4096, 10]
+
+
+def test_options_passed_by_the_reader_take_precedence(dataset):
+    variable = dataset({'zlib': True}).createVariable('VEL', 'f8', ('time', 'range'), zlib=False)
+    assert not variable.filters()['zlib']
+
+
+def test_strings_and_scalars_are_not_compressed(dataset):
+    group = dataset({'zlib': True, 'chunking': {'default': {'time': 4096}}})
+    assert not group.createVariable('time', str, ('time',)).filters()['zlib']
+    assert group.createVariable('height', 'f8').chunking() == 'contiguous'
+
+
+def test_unlimited_dimension_chunk_size(dataset):
+    group = dataset({'unlimited_chunk': 256, 'chunking': {'default': {'range': 'full'}}})
+    assert group.createVariable('VEL', 'f8', ('time', 'range')).chunking() == [256, 10]
+
+    assert StoragePolicy({'chunking': {'default': {}}}).unlimited_chunk == 1024
+
+
+@pytest.mark.parametrize('storage', [{'unlimited_chunk': 'full'}, {'unlimited_chunk': 0}])
+def test_bad_unlimited_chunk_size(storage):
+    with pytest.raises(SystemExit):
+        StoragePolicy(storage)
+
+
+def test_bad_chunk_size(dataset):
+    group = dataset({'chunking': {'default': {'time': -1}}})
+    with pytest.raises(SystemExit):
+        group.createVariable('VEL', 'f8', ('time', 'range'))
+
+
+def test_policy_applies_to_nested_groups(dataset):
+    group = dataset({'zlib': True, 'chunking': {'default': {'time': 128}}})
+    group.createGroup('scan_1')
+
+    # sub-groups created, or looked up by name or in groups
+    for scan in (group['scan_1'], group.groups['scan_1'], group.createGroup('scan_2')):
+        assert isinstance(scan, StorageGroup)
+
+    variable = group.groups['scan_1'].createVariable('VEL', 'f8', ('time', 'range'))
+    assert variable.filters()['zlib'] and variable.chunking() == [128, 10]
+
+
+def test_policy_applies_to_batches_appended_to_groups(dataset):
+    group = dataset({'zlib': True})
+    group.createGroup('scan_1')
+
+    batch = DataBatch()
+    scan = batch.add_group('scan_1')
+    scan.add_dimension('gate', 3)
+    scan.add_variable('VEL', 'f8', ('gate',), [1.0, 2.0, 3.0])
+    batch.write_to(group, None, True)
+
+    assert group.groups['scan_1']['VEL'].filters()['zlib']
+
+
+def test_builder_applies_the_storage_parameters(tmp_path):
+    config_file = station(tmp_path, path.join(WINDSCANNER, 'config.yaml'),
+                          output={'storage': {'zlib': True, 'chunking': {'default': {'time': 128}}}})
+    Builder(config_file=config_file, input_path=WINDSCANNER, output_path=str(tmp_path / 'out')).build()
+
+    with nc.Dataset(str(tmp_path / 'out' / '20161211135000.nc')) as output:
+        variables = [v for v in output.variables.values() if 'time' in v.dimensions and v.dtype != str]
+        assert len(variables) > 0
+        for variable in variables:
+            assert variable.filters()['zlib'] and variable.chunking()[variable.dimensions.index('time')] == 128
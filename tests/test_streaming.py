@@ -0,0 +1,44 @@
+from os import path
+
+import pytest
+
+from lidaco.core.Builder import Builder
+from lidaco.core.Reader import Reader
+
+from .helpers import KASSEL, kassel_config, output_files, same_dataset
+
+INPUT_PATH = path.join(KASSEL, 'data', 'WP1', 'sta')
+STA_FILE = path.join(INPUT_PATH, 'WLS7-164_2016_11_24__00_00_00.sta')
+
+
+def test_batch_rows_in_records():
+    assert Reader.batch_rows(STA_FILE, 100) == 100
+    assert Reader.batch_rows(STA_FILE, '250') == 250
+
+
+def test_batch_rows_in_memory(tmp_path):
+    file_path = tmp_path / 'records.txt'
+    file_path.write_bytes(b'x' * 99 + b'\n' + b'y' * 99 + b'\n')
+    assert Reader.batch_rows(str(file_path), '1KB') == 10
+    assert Reader.batch_rows(str(file_path), '2mb') == 2 * 1024 * 1024 // 100
+    assert Reader.batch_rows(str(file_path), '1GB') == 1024 ** 3 // 100
+
+
+@pytest.mark.parametrize('batch_size', [0, '0MB', '-5', '64TB', 'many'])
+def test_bad_batch_size(batch_size, capsys):
+    with pytest.raises(SystemExit):
+        Reader.batch_rows(STA_FILE, batch_size)
+    assert 'Bad batch_size "{}"'.format(batch_size) in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('batch_size', [7, 50, '4KB'])
+def test_streamed_output_equals_read_to(tmp_path, batch_size):
+    Builder(config_file=kassel_config('WP1'), input_path=INPUT_PATH, output_path=str(tmp_path / 'whole')).build()
+    Builder(config_file=kassel_config('WP1'), input_path=INPUT_PATH, output_path=str(tmp_path / 'streamed'),
+            batch_size=batch_size).build()
+
+    names = output_files(tmp_path / 'whole')
+    assert len(names) > 0 and output_files(tmp_path / 'streamed') == names
+    assert not path.exists(tmp_path / 'streamed' / 'error.log')
+    for name in names:
+        assert same_dataset(tmp_path / 'whole' / name, tmp_path / 'streamed' / name), name
@@ -0,0 +1,87 @@
+from os import path
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import suite, synthetic
+from lidaco.readers.AQ500 import AQ500
+from lidaco.readers.Triton import Triton
+from lidaco.readers.ZephIR300 import ZephIR300
+
+START = pd.Timestamp('2016-11-24')
+
+
+@pytest.fixture(scope='module')
+def synthetic_dir(tmp_path_factory):
+    """
+    One hour of records of every format, in the layout the suite reads with --synthetic.
+    :return: (directory, {format: (file paths, number of records)})
+    """
+    dir_path = str(tmp_path_factory.mktemp('synthetic'))
+    generated = {name: synthetic.generate(name, path.join(dir_path, name), START, '1h')
+                 for name in synthetic.FORMATS}
+    return dir_path, generated
+
+
+def test_parse_size():
+    assert synthetic.parse_size(100) == 100
+    assert synthetic.parse_size('2KB') == 2048
+    assert synthetic.parse_size('1gb') == 1024 ** 3
+    with pytest.raises(ValueError):
+        synthetic.parse_size('1TB')
+
+
+@pytest.mark.parametrize('sample', [s for s in suite.SAMPLES if suite.SAMPLE_FORMATS[s] != 'ZephIR300'])
+def test_samples_convert_the_synthetic_files(synthetic_dir, sample):
+    dir_path, generated = synthetic_dir
+    file_paths, count = generated[suite.SAMPLE_FORMATS[sample]]
+
+    result = suite.run_case(sample, 'NetCDF4', 'build', dir_path)
+    assert result['error'] is None
+    assert result['rows'] == count
+    assert 0 < result['input_bytes'] <= sum(path.getsize(f) for f in file_paths)
+
+
+def test_zephir_timestamps(synthetic_dir):
+    # ZephIR300.check_version reads the file kind from a Windows path: the records are checked with the
+    # timestamps the reader plans the output blocks with
+    file_paths, count = synthetic_dir[1]['ZephIR300']
+    interval = pd.Timedelta(synthetic.ZephIR300.interval)
+    assert ZephIR300.get_timestamp(file_paths[0]) == START
+    assert ZephIR300.get_timestamp(file_paths[0], -1) == START + (count - 1) * interval
+
+
+def test_same_seed_same_files(tmp_path):
+    contents = []
+    for dir_name, seed in (('a', 1), ('b', 1), ('c', 2)):
+        file_paths, count = synthetic.generate('WLS70', str(tmp_path / dir_name), START, '2h', seed=seed)
+        with open(file_paths[0], 'rb') as f:
+            contents.append(f.read())
+    assert contents[0] == contents[1] != contents[2]
+
+
+def test_size(tmp_path):
+    file_paths, count = synthetic.generate('AQ500', str(tmp_path), START, size='200KB')
+    assert abs(path.getsize(file_paths[0]) - 200 * 1024) < 20 * 1024
+
+
+def test_files(tmp_path):
+    file_paths, count = synthetic.generate('Windcubev2', str(tmp_path), START, '3h', files=3)
+    assert count == 18 and len(file_paths) == 3
+    assert sorted(os.listdir(str(tmp_path))) == sorted(path.basename(f) for f in file_paths)
+
+
+@pytest.mark.parametrize('name, reader', [('AQ500', AQ500), ('Triton', Triton)])
+def test_corrupt_records_become_nan(tmp_path, name, reader):
+    file_paths, count = synthetic.generate(name, str(tmp_path), START, '2D', corrupt=0.2)
+    batch = reader().read_batch(file_paths[0], None)
+
+    # the records cut short are malformed lines, decoded as NaT and NaN in their place
+    times = batch.variables['time'].data
+    corrupt = np.isnat(times)
+    assert len(times) == count and 0 < corrupt.sum() < count
+    assert np.array_equal(times[~corrupt], (START + pd.to_timedelta(np.flatnonzero(~corrupt) * 10, 'min')).values)
+    assert np.isnan(batch.variables['DIR'].data[corrupt]).all()
+    assert not np.isnan(batch.variables['DIR'].data[~corrupt]).all(axis=1).any()
@@ -0,0 +1,68 @@
+from datetime import datetime
+from os import path
+
+import netCDF4 as nc
+import numpy as np
+import pytest
+
+from lidaco.common import Time
+from lidaco.core.Builder import Builder
+from lidaco.core.Config import Config
+
+from .helpers import WINDSCANNER, station, read_dataset
+
+
+def test_iso8601_strings():
+    timestamps = [datetime(2016, 12, 11, 13, 50), datetime(2016, 12, 11, 13, 50, 0, 500000)]
+    assert list(Time.to_iso8601(timestamps)) == [t.isoformat() + 'Z' for t in timestamps]
+    assert list(Time.to_iso8601(timestamps[:1])) == ['2016-12-11T13:50:00Z']
+    assert list(Time.to_iso8601(np.array(['NaT'], dtype='datetime64[us]'))) == ['']
+
+
+def test_numeric_seconds():
+    assert list(Time.to_seconds([datetime(1970, 1, 1), datetime(2016, 12, 11, 13, 50, 0, 250000)])) == \
+        [0, (datetime(2016, 12, 11, 13, 50, 0, 250000) - datetime(1970, 1, 1)).total_seconds()]
+
+
+def test_from_seconds():
+    # LabVIEW timestamps: seconds since 1904-01-01
+    seconds = (datetime(2016, 12, 11) - datetime(1904, 1, 1)).total_seconds()
+    assert Time.from_seconds([str(seconds + 0.5)]) == np.datetime64('2016-12-11T00:00:00.5', 'us')
+
+
+@pytest.mark.parametrize('time_format, datatype', [(None, str), ('iso8601', str), ('numeric', np.float64)])
+def test_time_variable(tmp_path, time_format, datatype):
+    configs = Config(str(tmp_path), configs={'parameters': {'output': {'time_format': time_format}}}
+                     if time_format else {})
+    timestamps = np.array(['2016-12-11T13:50:00', '2016-12-11T13:50:01'], dtype='datetime64[us]')
+
+    with nc.Dataset(str(tmp_path / 'time.nc'), 'w') as dataset:
+        dataset.createDimension('time', None)
+        time = Time.create_time_variable(dataset, configs)
+        time[:] = Time.encode_time(time, timestamps)
+
+    with nc.Dataset(str(tmp_path / 'time.nc')) as dataset:
+        time = dataset['time']
+        assert time.dtype == datatype
+        if datatype is str:
+            assert list(time[:]) == ['2016-12-11T13:50:00Z', '2016-12-11T13:50:01Z']
+        else:
+            assert time.units == Time.NUMERIC_UNITS and time.calendar == 'standard'
+            decoded = nc.num2date(time[:], time.units, time.calendar, only_use_cftime_datetimes=False)
+            assert list(decoded) == list(timestamps.astype(datetime))
+
+
+def test_bad_time_format(tmp_path):
+    with pytest.raises(SystemExit):
+        Time.time_format(Config(str(tmp_path), configs={'parameters': {'output': {'time_format': 'julian'}}}))
+
+
+def test_numeric_output_holds_the_same_times(tmp_path):
+    outputs = {}
+    for time_format in ('iso8601', 'numeric'):
+        config_file = station(tmp_path, path.join(WINDSCANNER, 'config.yaml'), output={'time_format': time_format})
+        Builder(config_file=config_file, input_path=WINDSCANNER, output_path=str(tmp_path / time_format)).build()
+        outputs[time_format] = read_dataset(tmp_path / time_format / '20161211135000.nc')
+
+    iso8601 = np.array([t[:-1] for t in outputs['iso8601']['time']], dtype='datetime64[us]')
+    assert np.array_equal(Time.to_seconds(iso8601), outputs['numeric']['time'])
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+from os import path
+import json
+
+import pytest
+
+from lidaco.core.Builder import Builder
+from lidaco.core.Reader import Reader
+from lidaco.core.TimestampCache import TimestampCache
+from lidaco.readers.Windscanner import Windscanner
+
+from .helpers import KASSEL, kassel_config, station, copy_inputs
+
+INPUT_PATH = path.join(KASSEL, 'data', 'WS1')
+WIND_FILES = ['20161110233000_wind.txt', '20161110234000_wind.txt', '20161110235000_wind.txt']
+
+
+@pytest.mark.parametrize('newline', ['\n', '\r\n'])
+@pytest.mark.parametrize('trailing_newline', [True, False])
+def test_read_lines_equals_readlines(tmp_path, newline, trailing_newline):
+    lines = ['line {}'.format(i) + ';' * (i % 7) for i in range(200)]
+    file_path = tmp_path / 'lines.txt'
+    file_path.write_bytes((newline.join(lines) + (newline if trailing_newline else '')).encode())
+
+    with open(file_path) as f:
+        expected = f.readlines()
+
+    for start in (0, 1, 150, 199, -1, -2, -150, -200):
+        for count in (1, 3):
+            # small blocks, so that the lines from the end are read in several blocks
+            assert Reader.read_lines(str(file_path), start, count, block_size=16) == expected[start:][:count]
+
+    for start in (200, -201):
+        with pytest.raises(IndexError):
+            Reader.read_lines(str(file_path), start)
+
+
+def test_read_line_skips_header_and_footer(tmp_path):
+    file_path = tmp_path / 'lines.txt'
+    file_path.write_text('header\nheader\n1\n2\n3\nfooter\n')
+
+    assert Reader.read_line(str(file_path), 0, header_lines=2) == '1\n'
+    assert Reader.read_line(str(file_path), 1, header_lines=2) == '2\n'
+    assert Reader.read_line(str(file_path), -1, footer_lines=1) == '3\n'
+
+
+def test_get_timestamp_reads_the_first_and_last_records():
+    file_path = path.join(INPUT_PATH, WIND_FILES[0])
+    with open(file_path) as f:
+        seconds = [float(line.split(';')[4]) for line in f.read().splitlines()]
+
+    reader = Windscanner()
+    assert reader.get_timestamp(file_path) == datetime(1904, 1, 1) + timedelta(seconds=seconds[0])
+    assert reader.get_timestamp(file_path, -1) == datetime(1904, 1, 1) + timedelta(seconds=seconds[-1])
+
+
+def test_cache_reads_new_or_changed_files_only(tmp_path, monkeypatch):
+    input_path = copy_inputs(tmp_path / 'input', WIND_FILES, INPUT_PATH)
+    files = [str(input_path / f) for f in WIND_FILES]
+    reader = Windscanner()
+
+    cache = TimestampCache(str(tmp_path))
+    expected = [cache.get(reader, f) for f in files]
+    cache.save()
+
+    reads = []
+    get_timestamp = Windscanner.get_timestamp
+    monkeypatch.setattr(Windscanner, 'get_timestamp', lambda self, *args: reads.append(args) or get_timestamp(self, *args))
+
+    cache = TimestampCache(str(tmp_path))
+    assert [cache.get(reader, f) for f in files] == expected
+    assert reads == []
+
+    # a record appended: the file is read again
+    with open(files[0]) as f:
+        last_line = f.read().splitlines()[-1]
+    with open(files[0], 'a') as f:
+        f.write(last_line + '\n')
+    assert cache.get(reader, files[0]) == expected[0]
+    assert len(reads) == 2
+
+
+def test_unreadable_cache_is_read_again(tmp_path, capsys):
+    with open(tmp_path / TimestampCache.filename, 'w') as f:
+        f.write('{')
+
+    cache = TimestampCache(str(tmp_path))
+    first, last = cache.get(Windscanner(), path.join(INPUT_PATH, WIND_FILES[0]))
+
+    assert 'Failed to read the timestamp cache' in capsys.readouterr().out
+    assert first < last
+
+
+def test_time_blocks_with_cache(tmp_path):
+    config_file = station(tmp_path, kassel_config('WS1'), output_block_size='15min')
+    builders = [Builder(config_file=config_file, input_path=INPUT_PATH, output_path=str(tmp_path / output),
+                        timestamp_cache=cache) for output, cache in (('plain', None), ('cached', True), ('cached', True))]
+
+    reader = Windscanner()
+    files = reader.fetch_input_files(INPUT_PATH)
+    blocks = [builder.plan_blocks(reader, files, INPUT_PATH) for builder in builders]
+
+    assert len(blocks[0]) == 2
+    assert blocks[0] == blocks[1] == blocks[2]
+    with open(tmp_path / 'cached' / TimestampCache.filename) as f:
+        assert sorted(json.load(f)) == [path.join(INPUT_PATH, f) for f in WIND_FILES]
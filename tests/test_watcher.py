@@ -0,0 +1,167 @@
+from os import path
+import os
+
+from lidaco.core.Builder import Builder
+from lidaco.core.Watcher import Watcher
+
+from .helpers import WINDSCANNER, station, copy_inputs, read_dataset, same_dataset, output_files
+
+FIRST = ['20161211135000_wind.txt', '20161211135000_system.txt']
+SECOND = ['20161211140000_wind.txt', '20161211140000_system.txt']
+
+
+def watcher(tmp_path, input_path, output_format=None, **parameters):
+    config_file = station(tmp_path, path.join(WINDSCANNER, 'config.yaml'), **parameters)
+    builder = Builder(config_file=config_file, input_path=str(input_path), output_path=str(tmp_path / 'out'),
+                      output_format=output_format)
+    return Watcher(builder, interval=0, settle=0)
+
+
+def poll(watcher, times=2):
+    # a file is converted once it did not change between two polls
+    for i in range(times):
+        watcher.poll()
+
+
+def rows(file_path):
+    return len(read_dataset(file_path)['time'])
+
+
+def test_start_on_an_empty_directory(tmp_path):
+    input_path = tmp_path / 'input'
+    input_path.mkdir()
+
+    w = watcher(tmp_path, input_path)
+    w.start()
+    poll(w)
+    assert output_files(tmp_path / 'out') == []
+
+    copy_inputs(input_path, FIRST)
+    poll(w)
+    assert output_files(tmp_path / 'out') == ['20161211135000.nc']
+    assert rows(tmp_path / 'out' / '20161211135000.nc') == 599
+
+
+def test_start_on_a_new_directory(tmp_path):
+    w = watcher(tmp_path, tmp_path / 'input')
+    w.start()
+
+    copy_inputs(tmp_path / 'input', FIRST)
+    poll(w)
+    assert output_files(tmp_path / 'out') == ['20161211135000.nc']
+
+
+def test_new_files_are_appended_to_the_open_block(tmp_path):
+    input_path = copy_inputs(tmp_path / 'input', FIRST)
+
+    w = watcher(tmp_path, input_path, output_block_size=2)
+    w.start()
+    copy_inputs(input_path, SECOND)
+    poll(w)
+
+    Builder(config_file=path.join(tmp_path, 'station.yaml'), input_path=str(input_path),
+            output_path=str(tmp_path / 'all')).build()
+    assert output_files(tmp_path / 'out') == ['20161211135000.nc']
+    assert same_dataset(tmp_path / 'out' / '20161211135000.nc', tmp_path / 'all' / '20161211135000.nc')
+
+
+def test_files_are_converted_once_settled(tmp_path):
+    input_path = tmp_path / 'input'
+    input_path.mkdir()
+
+    w = watcher(tmp_path, input_path)
+    w.start()
+    copy_inputs(input_path, FIRST)
+
+    w.poll()
+    assert output_files(tmp_path / 'out') == []
+    w.poll()
+    assert output_files(tmp_path / 'out') == ['20161211135000.nc']
+
+
+def test_failed_conversion_is_retried(tmp_path, capsys):
+    input_path = tmp_path / 'input'
+    input_path.mkdir()
+
+    w = watcher(tmp_path, input_path)
+    w.start()
+    copy_inputs(input_path, FIRST[1:])
+    (input_path / FIRST[0]).write_text('not a wind file')
+    poll(w)
+    assert 'Failed to write' in capsys.readouterr().out
+
+    # the file is converted once it was written completely
+    copy_inputs(input_path, FIRST[:1])
+    poll(w)
+    assert rows(tmp_path / 'out' / '20161211135000.nc') == 599
+    assert str(input_path / FIRST[0]) in w.manifest.inputs
+
+
+def test_changed_related_file_rewrites_the_block(tmp_path):
+    input_path = copy_inputs(tmp_path / 'input', FIRST)
+
+    w = watcher(tmp_path, input_path)
+    w.start()
+    output = tmp_path / 'out' / '20161211135000.nc'
+    os.utime(output, (0, 0))
+
+    # e.g. the _system.txt file written again (and renamed into place) after the _wind.txt file was converted
+    tmp_file = input_path / (FIRST[1] + '.tmp')
+    tmp_file.write_text((input_path / FIRST[1]).read_text())
+    os.replace(tmp_file, input_path / FIRST[1])
+    poll(w)
+
+    assert os.stat(output).st_mtime > 0
+    assert rows(output) == 599
+
+
+def test_files_landing_during_the_initial_build(tmp_path, monkeypatch):
+    input_path = copy_inputs(tmp_path / 'input', FIRST)
+    w = watcher(tmp_path, input_path)
+
+    build = w.builder.build
+
+    def build_and_land(*args):
+        result = build(*args)
+        copy_inputs(input_path, SECOND)
+        return result
+    monkeypatch.setattr(w.builder, 'build', build_and_land)
+
+    w.start()
+    poll(w)
+    assert output_files(tmp_path / 'out') == ['20161211135000.nc', '20161211140000.nc']
+    assert str(input_path / SECOND[0]) in w.manifest.inputs
+
+
+def test_files_written_at_startup_wait_to_settle(tmp_path):
+    input_path = copy_inputs(tmp_path / 'input', FIRST)
+    for name in FIRST:
+        os.utime(input_path / name)
+    w = watcher(tmp_path, input_path)
+    w.settle = 3600
+
+    w.start()
+    assert output_files(tmp_path / 'out') == []
+    assert list(w.pending) == [str(input_path / FIRST[0])]
+
+    w.settle = 0
+    poll(w)
+    assert rows(tmp_path / 'out' / '20161211135000.nc') == 599
+
+
+def test_writer_that_can_not_append_rewrites_the_open_block(tmp_path, capsys):
+    input_path = copy_inputs(tmp_path / 'input', FIRST)
+
+    # the NcML writer can not describe string variables, such as the ISO 8601 time coordinate
+    w = watcher(tmp_path, input_path, output_format='NcML', output_block_size=2, output={'time_format': 'numeric'})
+    w.start()
+    copy_inputs(input_path, SECOND)
+    poll(w)
+
+    Builder(config_file=path.join(tmp_path, 'station.yaml'), input_path=str(input_path),
+            output_path=str(tmp_path / 'all'), output_format='NcML').build()
+    assert 'Failed to write' not in capsys.readouterr().out
+    assert sorted(os.listdir(str(tmp_path / 'out'))) == ['.lidaco-manifest.json', '20161211135000.ncml']
+    assert (tmp_path / 'out' / '20161211135000.ncml').read_text() == (tmp_path / 'all' / '20161211135000.ncml').read_text()
+    assert w.manifest.blocks[str(tmp_path / 'out' / '20161211135000.ncml')]['inputs'] == \
+        [str(input_path / FIRST[0]), str(input_path / SECOND[0])]
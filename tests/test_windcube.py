@@ -0,0 +1,52 @@
+from datetime import datetime
+from os import path
+
+import pandas as pd
+import pytest
+
+from lidaco.readers.Windcubev1 import Windcubev1
+from lidaco.readers.Windcubev2 import Windcubev2
+
+from .helpers import KASSEL
+
+STA_FILE = path.join(KASSEL, 'data', 'WP1', 'sta', 'WLS7-164_2016_11_24__00_00_00.sta')
+
+
+def sta_timestamps():
+    # the first column of the records, decoded row by row
+    with open(STA_FILE, encoding='latin-1') as f:
+        lines = f.read().splitlines()[42:]
+    return [datetime.strptime(line.split('\t')[0], Windcubev2.time_formats['sta']) for line in lines if line]
+
+
+def test_load_file_timestamps():
+    df = Windcubev2().load_file(STA_FILE)
+    assert list(df[df.columns[0]]) == sta_timestamps()
+
+
+def test_get_timestamp():
+    timestamps = sta_timestamps()
+    assert Windcubev2.get_timestamp(STA_FILE) == timestamps[0]
+    assert Windcubev2.get_timestamp(STA_FILE, -1) == timestamps[-1]
+
+
+@pytest.mark.parametrize('reader_class, filetype, strings', [
+    (Windcubev2, 'sta', ['2016/11/24 00:10', '2016/11/24 00:20']),
+    (Windcubev2, 'rtd', ['2016/11/24 00:00:01.25', '2016/11/24 00:00:02.5']),
+    (Windcubev1, 'sta', ['24/11/2016 00:10:00', '24/11/2016 00:20:00']),
+    (Windcubev1, 'rtd', ['24/11/2016 00:00:01.25', '24/11/2016 00:00:02.50']),
+])
+def test_parse_time(reader_class, filetype, strings):
+    reader = reader_class()
+    reader.parameters = {'filetype': filetype}
+
+    expected = [datetime.strptime(s, reader_class.time_formats[filetype]) for s in strings]
+    assert list(reader.parse_time(pd.Series(strings))) == expected
+
+
+def test_parse_time_rejects_other_formats():
+    reader = Windcubev2()
+    reader.parameters = {'filetype': 'sta'}
+
+    with pytest.raises(ValueError):
+        reader.parse_time(pd.Series(['24/11/2016 00:10']))
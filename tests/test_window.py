@@ -0,0 +1,62 @@
+from os import path
+
+import numpy as np
+import pytest
+
+from lidaco.core.Builder import Builder
+from lidaco.core.Config import Config
+from lidaco.readers.AQ500 import AQ500
+
+from .helpers import KASSEL, kassel_config, output_files, read_dataset
+
+INPUT_PATH = path.join(KASSEL, 'data', 'WP5')
+FILES = ['161122_result.txt', '161123_result.txt']
+
+
+def reader(**window):
+    result = AQ500()
+    result.set_configs(Config(INPUT_PATH, configs={'parameters': {'input': window}}))
+    return result
+
+
+def times(output_path):
+    # the ISO 8601 strings of the time variables, without their 'Z'
+    strings = np.concatenate([read_dataset(path.join(str(output_path), f))['time'] for f in output_files(output_path)])
+    return np.char.rstrip(strings.astype(str), 'Z').astype('datetime64[ns]')
+
+
+def test_in_window():
+    timestamps = np.array(['2016-11-22T00:50', '2016-11-22T01:00', '2016-11-22T01:10', '2016-11-22T02:00'],
+                          dtype='datetime64[ns]')
+    assert reader().in_window(timestamps).all()
+    assert list(reader(start='2016-11-22 01:00').in_window(timestamps)) == [False, True, True, True]
+    assert list(reader(end='2016-11-22 02:00').in_window(timestamps)) == [True, True, True, False]
+    assert list(reader(start='2016-11-22 01:00', end='2016-11-22 01:10').in_window(timestamps)) == \
+        [False, True, False, False]
+
+
+def test_bad_time_window(capsys):
+    with pytest.raises(SystemExit):
+        reader(start='yesterday').time_window()
+    assert 'Bad time window start "yesterday"' in capsys.readouterr().out
+
+
+def test_select_window():
+    assert reader().select_window(FILES, INPUT_PATH) == FILES
+    assert reader(start='2016-11-23').select_window(FILES, INPUT_PATH) == FILES[1:]
+    assert reader(end='2016-11-23').select_window(FILES, INPUT_PATH) == FILES[:1]
+    # the file starting before the window has records in it
+    assert reader(start='2016-11-22 12:00').select_window(FILES, INPUT_PATH) == FILES
+    assert reader(start='2016-11-25').select_window(FILES, INPUT_PATH) == []
+
+
+def test_builder_time_window(tmp_path):
+    Builder(config_file=kassel_config('WP5_10min'), input_path=INPUT_PATH, output_path=str(tmp_path / 'all')).build()
+    Builder(config_file=kassel_config('WP5_10min'), input_path=INPUT_PATH, output_path=str(tmp_path / 'window'),
+            start='2016-11-22 12:00', end='2016-11-23 06:00').build()
+
+    everything = times(tmp_path / 'all')
+    expected = everything[(everything >= np.datetime64('2016-11-22T12:00')) &
+                          (everything < np.datetime64('2016-11-23T06:00'))]
+    assert len(expected) > 0
+    assert np.array_equal(times(tmp_path / 'window'), expected)
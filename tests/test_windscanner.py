@@ -0,0 +1,60 @@
+from os import path
+
+import numpy as np
+
+from lidaco.core.Builder import Builder
+from lidaco.readers.Windscanner import Windscanner
+
+from .helpers import WINDSCANNER, copy_inputs, read_dataset
+
+WIND_FILE = path.join(WINDSCANNER, '20161211135000_wind.txt')
+SYSTEM_FILE = path.join(WINDSCANNER, '20161211135000_system.txt')
+
+
+def reference(file_path, usecols=None):
+    # the rows decoded cell by cell
+    with open(file_path) as f:
+        rows = [row.strip().split(';') for row in f.read().splitlines()]
+    return [[float(cells[i]) for i in (usecols or range(len(cells)))] for cells in rows]
+
+
+def test_parse_rows_equals_cell_by_cell_parsing():
+    rows, columns = Windscanner.read_rows(WIND_FILE)
+
+    assert (columns == columns[0]).all()
+    assert np.array_equal(Windscanner.parse_rows(rows), np.array(reference(WIND_FILE)))
+    assert np.array_equal(Windscanner.parse_rows(rows, usecols=(4, 8)), np.array(reference(WIND_FILE))[:, [4, 8]])
+
+
+def test_malformed_cells_become_nan():
+    data = Windscanner.parse_rows(['1;2;3', '4;x;6'])
+    assert np.array_equal(data, [[1, 2, 3], [4, np.nan, 6]], equal_nan=True)
+
+
+def test_load_files_drops_corrupt_rows(tmp_path, capsys):
+    copy_inputs(tmp_path, ['20161211135000_wind.txt', '20161211135000_system.txt'])
+    wind_file = tmp_path / '20161211135000_wind.txt'
+    lines = wind_file.read_text().splitlines()
+    wind_file.write_text('\n'.join(lines[:10] + [lines[10][:20]] + lines[11:]) + '\n')
+
+    wind_data, system_data = Windscanner().load_files(str(wind_file), str(tmp_path / '20161211135000_system.txt'))
+    expected = np.delete(np.array(reference(WIND_FILE)), 10, axis=0)
+
+    assert 'corrupt' in capsys.readouterr().out
+    assert np.array_equal(wind_data, expected)
+    assert system_data.shape[0] == wind_data.shape[0]
+    assert np.array_equal(system_data[:, [7, 8]], np.delete(np.array(reference(SYSTEM_FILE, (7, 8))), 10, axis=0))
+
+
+def test_read_to(tmp_path):
+    Builder(config_file=path.join(WINDSCANNER, 'config.yaml'), input_path=WINDSCANNER,
+            output_path=str(tmp_path)).build()
+
+    output = read_dataset(tmp_path / '20161211135000.nc')
+    wind = np.array(reference(WIND_FILE))
+
+    assert output['time'][0] == '2016-12-11T13:39:59Z'
+    assert np.array_equal(output['range'], wind[0, 8::4].astype('f4'))
+    assert np.array_equal(output['VEL'], wind[:, 9::4].astype('f4'))
+    assert np.array_equal(output['CNR'], wind[:, 10::4].astype('f4'))
+    assert np.array_equal(output['WIDTH'], wind[:, 11::4].astype('f4'))
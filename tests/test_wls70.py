@@ -0,0 +1,70 @@
+from datetime import datetime
+from os import path
+import math
+
+import numpy as np
+
+from lidaco.core.Builder import Builder
+from lidaco.readers.WLS70 import WLS70
+
+from .helpers import KASSEL, kassel_config, read_dataset
+
+INPUT_PATH = path.join(KASSEL, 'data', 'WP6')
+TXT_FILE = path.join(INPUT_PATH, 'WLS70-001_2016_11_26__00_00_00_N0.txt')
+
+
+def to_float(field):
+    try:
+        return float(field)
+    except ValueError:
+        return math.nan
+
+
+def reference(file_path):
+    # the fields decoded one by one, 17 per record
+    with open(file_path) as f:
+        fields = [to_float(line.strip()) for line in f.read().splitlines()[39:-1]]
+    return np.array(fields[:len(fields) // 17 * 17]).reshape(-1, 17)
+
+
+def record_time(record):
+    return datetime(*record[1:7].astype(int))
+
+
+def test_load_records_equals_field_by_field_parsing():
+    expected = reference(TXT_FILE)
+    records, timestamps = WLS70.load_records(TXT_FILE)
+
+    assert np.array_equal(records, expected, equal_nan=True)
+    assert list(timestamps.astype('datetime64[us]').astype(datetime)) == [record_time(r) for r in expected]
+
+
+def test_fields_that_are_not_numbers_become_nan(tmp_path):
+    with open(TXT_FILE) as f:
+        lines = f.read().splitlines()
+    lines[39 + 10] = 'n/a'
+    file_path = tmp_path / 'WLS70-001_2016_11_26__00_00_00_N0.txt'
+    file_path.write_text('\n'.join(lines) + '\n')
+
+    records, timestamps = WLS70.load_records(str(file_path))
+    assert math.isnan(records[0, 10])
+    assert np.array_equal(np.delete(records, 10, axis=1), np.delete(reference(TXT_FILE), 10, axis=1), equal_nan=True)
+
+
+def test_get_timestamp():
+    records = reference(TXT_FILE)
+    assert WLS70.get_timestamp(TXT_FILE) == record_time(records[0])
+    assert WLS70.get_timestamp(TXT_FILE, -1) == record_time(records[-1])
+
+
+def test_read_to(tmp_path):
+    Builder(config_file=kassel_config('WP6'), input_path=INPUT_PATH, output_path=str(tmp_path)).build()
+
+    records = np.concatenate([reference(TXT_FILE), reference(TXT_FILE.replace('_26__', '_27__'))])
+    gates = len(np.unique(records[:, 9]))
+    output = read_dataset(tmp_path / 'WLS70-001_2016_11_26__00_00_.nc')
+
+    assert np.array_equal(output['range'], np.unique(records[:, 9]))
+    for name, column in (('T_internal', 7), ('CNR', 10), ('VEL', 11), ('DIR', 12)):
+        expected = records[:, column].reshape(-1, gates).astype('f4')
+        assert np.array_equal(output[name], expected, equal_nan=True), name
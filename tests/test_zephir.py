@@ -0,0 +1,57 @@
+from datetime import datetime
+from os import path
+
+import pandas as pd
+import pytest
+
+from lidaco.readers.ZephIR300 import ZephIR300
+
+from .helpers import KASSEL
+
+CSV_FILE = path.join(KASSEL, 'data', 'WP4', '10min', 'Wind10_317@Y2016_M12_D13.ZPH.csv')
+
+
+def reference(value):
+    # the formats tried one by one for every row
+    for time_format in ZephIR300.time_formats:
+        try:
+            return datetime.strptime(value.strip(), time_format)
+        except ValueError:
+            pass
+
+
+def sample_times():
+    with open(CSV_FILE, encoding='latin-1') as f:
+        return [reference(line.split(';')[1]) for line in f.read().splitlines()[2:] if line]
+
+
+@pytest.mark.parametrize('strings', [
+    ['13.12.2016 00:00:00', '13.12.2016 00:10:00'],
+    ['13/12/2016 00:00:00', '13/12/2016 00:10:00'],
+    ['13.12.2016 00:00', '13.12.2016 00:10'],
+    # formats mixed in a column
+    ['13.12.2016 00:00:00', '13/12/2016 00:10:00', '13.12.2016 00:20', ' 13.12.2016 00:30:00 '],
+])
+def test_parse_time_equals_row_by_row_parsing(strings):
+    assert list(ZephIR300().parse_time(pd.Series(strings))) == [reference(s) for s in strings]
+
+
+def test_sniff_time_formats():
+    column = pd.Series(['13/12/2016 00:00:00'] * 30 + ['13.12.2016 00:00'] * 5)
+    assert ZephIR300.sniff_time_formats(column)[0] == '%d/%m/%Y %H:%M:%S'
+
+
+def test_unknown_time_format():
+    with pytest.raises(ValueError):
+        ZephIR300().parse_time(pd.Series(['13.12.2016 00:00:00', '2016-12-13T00:10']))
+
+
+def test_load_file_timestamps():
+    df, parameters = ZephIR300().load_file(CSV_FILE)
+    assert list(df['timestamp']) == sample_times()
+
+
+def test_get_timestamp():
+    times = sample_times()
+    assert ZephIR300.get_timestamp(CSV_FILE) == times[0]
+    assert ZephIR300.get_timestamp(CSV_FILE, -1) == times[-1]